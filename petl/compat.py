@@ -31,6 +31,7 @@ if PY2:
         import cPickle as pickle
     except ImportError:
         import pickle
+    from Queue import Queue, Full
     maxint = sys.maxint
     long = long
     xrange = xrange
@@ -56,6 +57,7 @@ else:
     from urllib.request import urlopen
     from io import StringIO, BytesIO
     import pickle
+    from queue import Queue, Full
     maxint = sys.maxsize
 
 try:
@@ -16,6 +16,10 @@ display_limit = 5
 display_index_header = False
 display_vrepr = text_type
 sort_buffersize = 100000
+hash_buffersize = 100000
+infer_sample = 1000
+write_buffersize = 2**20
+spill_codec = None  # e.g., petl.io.sources.ZstdSource
 failonerror=False # False, True, 'inline'
 """
 Controls what happens when unhandled exceptions are raised in a
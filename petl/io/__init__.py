@@ -4,10 +4,10 @@ from petl.io.base import fromcolumns
 
 from petl.io.sources import FileSource, GzipSource, BZ2Source, ZipSource, \
     StdinSource, StdoutSource, URLSource, StringSource, PopenSource, \
-    MemorySource
+    MemorySource, BGZFSource, ZstdSource, LZ4Source
 
 from petl.io.csv import fromcsv, fromtsv, tocsv, appendcsv, totsv, appendtsv, \
-    teecsv, teetsv
+    teecsv, teetsv, csvindex
 
 from petl.io.pickle import frompickle, topickle, appendpickle, teepickle
 
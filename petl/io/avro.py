@@ -261,6 +261,18 @@ class AvroView(Table):
             for row in self._read_rows_from(avro_reader, header):
                 yield row
 
+    def _nrows(self):
+        # count rows from the record counts in the block headers, without
+        # decoding any records
+        import fastavro
+        with self.source.open('rb') as source_file:
+            count = sum(block.num_records
+                        for block in fastavro.block_reader(source_file))
+        count = max(count - self.skip, 0)
+        if self.limit is not None:
+            count = min(count, self.limit)
+        return count
+
     def _open_reader(self, source_file):
         '''This could raise a error when the file is corrupt or is not avro'''
         # delay the import of fastavro for not breaking when unused
@@ -2,9 +2,17 @@
 from __future__ import division, print_function, absolute_import
 
 
+import io
+import os
 import locale
 import codecs
-from petl.compat import izip_longest
+import threading
+from collections import deque
+from contextlib import contextmanager
+from petl.compat import izip_longest, Queue
+
+
+import petl.config as config
 
 from petl.util.base import Table
 
@@ -16,6 +24,228 @@ def getcodec(encoding):
     return codec
 
 
+# size of the first block read from the end of a file by iterbackwards
+_tailblocksize = 2**16
+
+
+def iterbackwards(f, size, blocksize=None):
+    # yield (offset, data) pairs, where data are the bytes of the seekable
+    # binary file `f` from offset to `size`, reading blocks of doubling size
+    # further back from the end each time, until the start of the file
+    if blocksize is None:
+        blocksize = _tailblocksize
+    offset = size
+    data = b''
+    while True:
+        n = min(blocksize, offset)
+        offset -= n
+        f.seek(offset)
+        data = f.read(n) + data
+        yield offset, data
+        if offset == 0:
+            break
+        blocksize *= 2
+
+
+def linestart(data):
+    # return the index following the first line terminator in data, i.e.,
+    # the start of the first complete line, or None if there is none
+    i = data.find(b'\n')
+    j = data.find(b'\r', 0, len(data) if i < 0 else i)
+    if j >= 0:
+        return j + 2 if data[j + 1:j + 2] == b'\n' else j + 1
+    if i >= 0:
+        return i + 1
+    return None
+
+
+class _RawWriter(io.RawIOBase):
+    # raw binary stream which writes through to a file object
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.inner.write(bytes(b))
+        return len(b)
+
+
+class _BackgroundRawWriter(_RawWriter):
+    # raw binary stream which hands data to a thread which writes it to a
+    # file object, so that any compression and I/O overlap with producing
+    # the data
+
+    def __init__(self, inner, maxblocks=4):
+        super(_BackgroundRawWriter, self).__init__(inner)
+        self.queue = Queue(maxblocks)
+        self.error = None
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            b = self.queue.get()
+            if b is None:
+                return
+            # after an error, keep taking data so the writer doesn't block
+            if self.error is None:
+                try:
+                    self.inner.write(b)
+                except BaseException as e:
+                    self.error = e
+
+    def _check(self):
+        if self.error is not None:
+            raise self.error
+
+    def write(self, b):
+        self._check()
+        self.queue.put(bytes(b))
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            self.queue.put(None)
+            self.thread.join()
+            super(_BackgroundRawWriter, self).close()
+            self._check()
+
+
+@contextmanager
+def writebuffer(buf, buffersize=None, background=False):
+    """Context manager returning a binary file object which writes through
+    to the file object `buf` in blocks of `buffersize` bytes (by default
+    `petl.config.write_buffersize`). If `background` is True, the blocks are
+    written to `buf` by a separate thread. Data are flushed on exit."""
+
+    if buffersize is None:
+        buffersize = config.write_buffersize
+    if background:
+        raw = _BackgroundRawWriter(buf)
+    else:
+        raw = _RawWriter(buf)
+    f = io.BufferedWriter(raw, buffer_size=buffersize)
+    try:
+        yield f
+    except BaseException:
+        # write out what has been written so far, as an unbuffered file
+        # would have, without masking the original error
+        try:
+            f.close()
+        except Exception:
+            pass
+        raise
+    f.close()
+
+
+def threadpool(workers):
+    """Return a thread pool of `workers` threads (by default, the number of
+    CPUs), or None if there would be only one, and the number of tasks to
+    keep in hand to keep the pool busy."""
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 2:
+        return None, 1
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(workers), workers * 2
+
+
+class Done(object):
+    """Stands in for a future holding `result`, in the absence of a thread
+    pool."""
+
+    def __init__(self, result):
+        self._result = result
+
+    def result(self):
+        return self._result
+
+    def cancel(self):
+        pass
+
+
+class BlockWriter(io.RawIOBase):
+    """Raw binary stream which splits the data written into blocks of
+    `blocksize` bytes, compresses each independently via the function
+    `compress` in a pool of `workers` threads (see :func:`threadpool`), and
+    writes them in order to the binary file `fileobj`. Suits formats in
+    which compressed blocks can be concatenated, e.g., gzip members or LZ4
+    frames."""
+
+    def __init__(self, fileobj, compress, blocksize, workers=None):
+        self.fileobj = fileobj
+        self.compress = compress
+        self.blocksize = blocksize
+        self.pool, self.ahead = threadpool(workers)
+        self.pending = deque()
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def _submit(self, data):
+        if self.pool is not None:
+            future = self.pool.submit(self.compress, data)
+        else:
+            future = Done(self.compress(data))
+        self.pending.append((future, len(data)))
+        while len(self.pending) > self.ahead:
+            self._writeblock()
+
+    def _writeblock(self):
+        future, n = self.pending.popleft()
+        block = future.result()
+        self.fileobj.write(block)
+        self._written(len(block), n)
+
+    def _written(self, csize, n):
+        # called after writing a block of `csize` bytes holding `n` bytes of
+        # data
+        pass
+
+    def _finish(self):
+        # called after writing all blocks
+        pass
+
+    def write(self, b):
+        b = memoryview(b)
+        n = len(b)
+        i = 0
+        if self.data:
+            i = min(self.blocksize - len(self.data), n)
+            self.data += b[:i]
+            if len(self.data) < self.blocksize:
+                return n
+            self._submit(bytes(self.data))
+            self.data = bytearray()
+        while n - i >= self.blocksize:
+            self._submit(b[i:i + self.blocksize].tobytes())
+            i += self.blocksize
+        self.data += b[i:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            try:
+                if self.data:
+                    self._submit(bytes(self.data))
+                    self.data = bytearray()
+                while self.pending:
+                    self._writeblock()
+                self._finish()
+            finally:
+                for future, _ in self.pending:
+                    future.cancel()
+                if self.pool is not None:
+                    self.pool.shutdown()
+        super(BlockWriter, self).close()
+
+
 def fromcolumns(cols, header=None, missing=None):
     """View a sequence of columns as a table, e.g.::
 
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, print_function, division
+
+
+import io
+import os
+import struct
+import zlib
+from bisect import bisect_right
+from collections import deque
+from functools import partial
+
+
+from petl.io.base import threadpool, Done, BlockWriter
+
+
+# A BGZF file (see the SAM/BAM format specification) is a series of gzip
+# members ("blocks") of at most 64 KiB, each with a 'BC' extra subfield
+# holding the size of the block, followed by an empty block marking the end
+# of the file. It can be read by any gzip reader, but as blocks are
+# compressed independently, they can be compressed and decompressed in
+# parallel, and reading can start from the start of any block.
+
+
+# ID1 ID2 CM FLG MTIME XFL OS XLEN SI1 SI2 SLEN BSIZE
+_header = struct.Struct('<BBBBIBBHBBHH')
+_trailer = struct.Struct('<II')  # CRC32 ISIZE
+
+# most data which fits in a block even if it does not compress
+_blockdata = 0xff00
+
+_eof = bytes(bytearray.fromhex('1f8b08040000000000ff0600424302001b00'
+                               '03000000000000000000'))
+
+
+def _compressblock(data, compresslevel):
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    cdata = compressor.compress(data) + compressor.flush()
+    bsize = _header.size + len(cdata) + _trailer.size
+    return (_header.pack(31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, bsize - 1) +
+            cdata + _trailer.pack(zlib.crc32(data) & 0xffffffff, len(data)))
+
+
+def _decompressblock(block):
+    xlen = struct.unpack_from('<H', block, 10)[0]
+    data = zlib.decompress(block[12 + xlen:-_trailer.size], -15)
+    crc, isize = _trailer.unpack_from(block, len(block) - _trailer.size)
+    if len(data) != isize or zlib.crc32(data) & 0xffffffff != crc:
+        raise IOError('corrupt BGZF block')
+    return data
+
+
+def _blocksize(head, extra):
+    # return the size of the block given its first 12 bytes and extra field,
+    # or None if it is not a BGZF block
+    if len(head) < 12 or head[:4] != b'\x1f\x8b\x08\x04':
+        return None
+    i = 0
+    while i + 4 <= len(extra):
+        slen = struct.unpack_from('<H', extra, i + 2)[0]
+        if extra[i:i + 2] == b'BC' and slen == 2:
+            return struct.unpack_from('<H', extra, i + 4)[0] + 1
+        i += 4 + slen
+    return None
+
+
+def isbgzf(head):
+    """Return whether the given leading bytes of a file (at least 18) are the
+    start of a BGZF block."""
+
+    xlen = struct.unpack_from('<H', head, 10)[0] if len(head) >= 12 else 0
+    return _blocksize(head[:12], head[12:12 + xlen]) is not None
+
+
+def _readblock(f):
+    # read a whole block from the binary file `f`, or return None at the end
+    # of the file
+    head = f.read(12)
+    if not head:
+        return None
+    xlen = struct.unpack_from('<H', head, 10)[0] if len(head) == 12 else 0
+    extra = f.read(xlen)
+    bsize = _blocksize(head, extra)
+    if bsize is None:
+        raise IOError('not a BGZF block')
+    rest = f.read(bsize - 12 - xlen)
+    if len(rest) != bsize - 12 - xlen:
+        raise IOError('truncated BGZF block')
+    return head + extra + rest
+
+
+def scanblocks(f):
+    """Return a list of the (compressed, uncompressed) offsets of the start of
+    each block in the seekable binary BGZF file `f`, followed by the sizes
+    of the file, reading just the block headers and trailers."""
+
+    offsets = list()
+    coffset = uoffset = 0
+    f.seek(0)
+    while True:
+        head = f.read(12)
+        if not head:
+            break
+        xlen = struct.unpack_from('<H', head, 10)[0] if len(head) == 12 else 0
+        bsize = _blocksize(head, f.read(xlen))
+        if bsize is None:
+            raise IOError('not a BGZF block')
+        f.seek(coffset + bsize - 4)
+        isize = struct.unpack('<I', f.read(4))[0]
+        offsets.append((coffset, uoffset))
+        coffset += bsize
+        uoffset += isize
+    offsets.append((coffset, uoffset))
+    return offsets
+
+
+def indexpath(filename):
+    return filename + '.gzi'
+
+
+def writeindex(filename, offsets):
+    """Write the block offsets of a BGZF file beside it, in the ``.gzi``
+    format used by bgzip, i.e., the number of blocks after the first, then
+    the compressed and uncompressed offset of each, as little-endian 64-bit
+    integers."""
+
+    entries = offsets[1:-1]
+    path = indexpath(filename)
+    with io.open(path, 'wb') as f:
+        f.write(struct.pack('<Q', len(entries)))
+        for coffset, uoffset in entries:
+            f.write(struct.pack('<QQ', coffset, uoffset))
+    return path
+
+
+def loadindex(filename):
+    """Return the block offsets of a BGZF file from the index beside it, as
+    :func:`scanblocks`, or None if there is no index, or it is older than
+    the file."""
+
+    path = indexpath(filename)
+    try:
+        if os.stat(path).st_mtime_ns < os.stat(filename).st_mtime_ns:
+            return None
+        with io.open(path, 'rb') as f:
+            n = struct.unpack('<Q', f.read(8))[0]
+            data = f.read(16 * n)
+        with io.open(filename, 'rb') as f:
+            csize = f.seek(0, io.SEEK_END)
+            offsets = [(0, 0)] + [struct.unpack_from('<QQ', data, 16 * i)
+                                  for i in range(n)]
+            # find the size of the data from the last block
+            coffset, uoffset = offsets[-1]
+            while coffset < csize:
+                f.seek(coffset)
+                head = f.read(12)
+                xlen = struct.unpack_from('<H', head, 10)[0]
+                bsize = _blocksize(head, f.read(xlen))
+                if bsize is None:
+                    return None
+                f.seek(coffset + bsize - 4)
+                coffset += bsize
+                uoffset += struct.unpack('<I', f.read(4))[0]
+                offsets.append((coffset, uoffset))
+            if coffset != csize:
+                return None
+    except (IOError, OSError, struct.error):
+        return None
+    return offsets
+
+
+class BGZFReader(io.RawIOBase):
+    """Raw binary stream of the data in the BGZF file `fileobj`, decompressing
+    blocks ahead of reading in a pool of `workers` threads. If `fileobj` is
+    seekable, so is the stream, given the `offsets` of the blocks as returned
+    by :func:`scanblocks`, or otherwise found by scanning when first
+    needed."""
+
+    def __init__(self, fileobj, offsets=None, workers=None):
+        self.fileobj = fileobj
+        self.offsets = offsets
+        self.pool, self.ahead = threadpool(workers)
+        self.pos = 0
+        self.blocks = self._iterblocks()
+        self.data = b''
+        self.datapos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.fileobj.seekable()
+
+    def _iterblocks(self):
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < self.ahead:
+                    block = _readblock(self.fileobj)
+                    if block is None:
+                        break
+                    if self.pool is not None:
+                        pending.append(self.pool.submit(_decompressblock,
+                                                        block))
+                    else:
+                        pending.append(Done(_decompressblock(block)))
+                if not pending:
+                    return
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def readinto(self, b):
+        while self.datapos >= len(self.data):
+            data = next(self.blocks, None)
+            if data is None:
+                return 0
+            self.data, self.datapos = data, 0
+        n = min(len(b), len(self.data) - self.datapos)
+        b[:n] = self.data[self.datapos:self.datapos + n]
+        self.datapos += n
+        self.pos += n
+        return n
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if not self.seekable():
+            raise io.UnsupportedOperation('seek')
+        if self.offsets is None:
+            self.offsets = scanblocks(self.fileobj)
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.offsets[-1][1]
+        # start from the last block starting at or before the offset
+        i = bisect_right([u for _, u in self.offsets], max(offset, 0)) - 1
+        coffset, uoffset = self.offsets[max(i, 0)]
+        self.blocks.close()
+        self.fileobj.seek(coffset)
+        self.blocks = self._iterblocks()
+        self.data, self.datapos = b'', 0
+        self.pos = uoffset
+        # skip to the offset within the block
+        skip = offset - uoffset
+        while skip > 0:
+            data = next(self.blocks, None)
+            if data is None:
+                break
+            n = min(skip, len(data))
+            self.data, self.datapos = data, n
+            self.pos += n
+            skip -= n
+        # as for files, the position may be beyond the end of the data
+        self.pos += skip
+        return self.pos
+
+    def close(self):
+        if not self.closed:
+            self.blocks.close()
+            if self.pool is not None:
+                self.pool.shutdown()
+        super(BGZFReader, self).close()
+
+
+class BGZFWriter(BlockWriter):
+    """Raw binary stream which writes data to the binary file `fileobj` in
+    BGZF format, compressing blocks in a pool of `workers` threads. The
+    (compressed, uncompressed) offsets of the blocks written are collected
+    in `offsets`, which may be given the offsets of blocks already in the
+    file, when appending."""
+
+    def __init__(self, fileobj, workers=None, compresslevel=6, offsets=None):
+        super(BGZFWriter, self).__init__(
+            fileobj, partial(_compressblock, compresslevel=compresslevel),
+            _blockdata, workers)
+        if offsets:
+            self.offsets = list(offsets[:-1])
+            self.coffset, self.uoffset = offsets[-1]
+        else:
+            self.offsets = list()
+            self.coffset = self.uoffset = 0
+
+    def _written(self, csize, n):
+        self.offsets.append((self.coffset, self.uoffset))
+        self.coffset += csize
+        self.uoffset += n
+
+    def _finish(self):
+        self.fileobj.write(_eof)
+        self._written(len(_eof), 0)
+        self.offsets.append((self.coffset, self.uoffset))
+
@@ -11,14 +11,15 @@ from petl.util.base import Table
 from petl.io.sources import read_source_from_arg, write_source_from_arg
 if PY2:
     from petl.io.csv_py2 import fromcsv_impl, tocsv_impl, appendcsv_impl, \
-        teecsv_impl
+        teecsv_impl, csvindex_impl
 else:
     from petl.io.csv_py3 import fromcsv_impl, tocsv_impl, appendcsv_impl, \
-        teecsv_impl
+        teecsv_impl, csvindex_impl
 
 
-def fromcsv(source=None, encoding=None, errors='strict', header=None, 
-            **csvargs):
+def fromcsv(source=None, encoding=None, errors='strict', header=None,
+            workers=None, usecols=None, types=None, failonerror=None,
+            errorvalue=None, **csvargs):
     """
     Extract a table from a delimited file. E.g.::
 
@@ -54,16 +55,90 @@ def fromcsv(source=None, encoding=None, errors='strict', header=None,
     Note that all data values are strings, and any intended numeric values will
     need to be converted, see also :func:`petl.transform.conversions.convert`.
 
+    If `workers` is greater than 1 and the source is a local, uncompressed
+    or BGZF (``.bgz``) file, the file is split into byte ranges which are
+    parsed in a pool of that many processes, and rows are returned in file
+    order. Ranges are aligned to the first newline outside of a quoted
+    field, judged by the parity of preceding quote characters. If a range
+    turns out not to end on a record boundary (e.g., due to quote
+    characters within unquoted fields), the rest of the file is parsed
+    sequentially from the start of that range. Parallel parsing requires
+    Python 3, and an encoding in which newline and quote characters are
+    encoded as single ASCII bytes, e.g., UTF-8; otherwise `workers` is
+    ignored.
+
+    If an up to date index built by :func:`petl.io.csv.csvindex` with the
+    same `encoding` and dialect is found beside the file, it is used to
+    seek directly to the rows selected by
+    :func:`petl.transform.basics.rowslice` and
+    :func:`petl.transform.basics.tail`, and to split the file between
+    `workers` on known record boundaries.
+
+    Otherwise, if the source is a local, uncompressed or BGZF file, rows
+    selected by :func:`petl.transform.basics.tail` are found by reading
+    blocks backwards from the end of the file, rather than by parsing the
+    whole file. This requires Python 3, no `escapechar`, and an encoding in
+    which newline and quote characters are encoded as single ASCII bytes.
+
+    If `usecols` is given, as a field name or index or a list of them, only
+    those fields are extracted, in the order given, as if by
+    :func:`petl.transform.basics.cut` but without first building complete
+    rows. The same applies where the table is passed directly to
+    :func:`petl.transform.basics.cut` or
+    :func:`petl.transform.basics.cutout`. E.g.::
+
+        >>> table3 = etl.fromcsv('example.csv', usecols=['bar'])
+        >>> table3
+        +-----+
+        | bar |
+        +=====+
+        | '1' |
+        +-----+
+        | '2' |
+        +-----+
+        | '2' |
+        +-----+
+
+    Values may be converted as they are read, rather than via a separate
+    :func:`petl.transform.conversions.convert` step, by providing `types`
+    as a dict mapping fields to converters, as accepted by
+    :func:`petl.transform.conversions.convert`, or as 'infer' to choose for
+    each field the first of :func:`int`, :func:`float`, an ISO date or
+    datetime parser or a true/false parser which accepts all non-empty
+    values in the first `petl.config.infer_sample` rows (1000 by default).
+    The `failonerror` and `errorvalue` arguments are as for
+    :func:`petl.transform.conversions.convert`, so, e.g., empty values in
+    an inferred numeric field become `errorvalue`. E.g.::
+
+        >>> table4 = etl.fromcsv('example.csv', types={'bar': int})
+        >>> table4
+        +-----+-----+
+        | foo | bar |
+        +=====+=====+
+        | 'a' |   1 |
+        +-----+-----+
+        | 'b' |   2 |
+        +-----+-----+
+        | 'c' |   2 |
+        +-----+-----+
+
+    Where `usecols` is also given, `types` applies to the selected fields.
+
     """
 
     source = read_source_from_arg(source)
     csvargs.setdefault('dialect', 'excel')
+    if usecols is not None and not isinstance(usecols, (list, tuple)):
+        usecols = (usecols,)
     return fromcsv_impl(source=source, encoding=encoding, errors=errors, 
-                        header=header, **csvargs)
+                        header=header, workers=workers, usecols=usecols,
+                        types=types, failonerror=failonerror,
+                        errorvalue=errorvalue, **csvargs)
 
 
-def fromtsv(source=None, encoding=None, errors='strict', header=None, 
-            **csvargs):
+def fromtsv(source=None, encoding=None, errors='strict', header=None,
+            workers=None, usecols=None, types=None, failonerror=None,
+            errorvalue=None, **csvargs):
     """
     Convenience function, as :func:`petl.io.csv.fromcsv` but with different
     default dialect (tab delimited).
@@ -71,11 +146,54 @@ def fromtsv(source=None, encoding=None, errors='strict', header=None,
     """
 
     csvargs.setdefault('dialect', 'excel-tab')
-    return fromcsv(source, encoding=encoding, errors=errors, header=header, **csvargs)
+    return fromcsv(source, encoding=encoding, errors=errors, header=header,
+                   workers=workers, usecols=usecols, types=types,
+                   failonerror=failonerror, errorvalue=errorvalue, **csvargs)
+
+
+def csvindex(source, step=1024, encoding=None, errors='strict', **csvargs):
+    """
+    Build an index of the byte offset of every `step`-th record in a
+    delimited file, stored beside the file with the extension
+    ``.csvidx``, and return the path of the index. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar']] + [['x%s' % i, i] for i in range(100)]
+        >>> etl.tocsv(table1, 'example.csv')
+        >>> etl.csvindex('example.csv', step=10)
+        'example.csv.csvidx'
+        >>> table2 = etl.fromcsv('example.csv')
+        >>> table2.rowslice(90, 92)
+        +-------+------+
+        | foo   | bar  |
+        +=======+======+
+        | 'x90' | '90' |
+        +-------+------+
+        | 'x91' | '91' |
+        +-------+------+
+
+    Tables extracted from the file via :func:`petl.io.csv.fromcsv` with the
+    same `encoding` and dialect use the index automatically, so selecting
+    rows from far into the file via :func:`petl.transform.basics.rowslice`
+    or :func:`petl.transform.basics.tail` parses at most `step` records
+    before the first row returned. The index records the size and
+    modification time of the file, and is ignored once the file changes.
+
+    The `source` must be a local, uncompressed or BGZF file (see
+    :class:`petl.io.sources.BGZFSource`), with newline (``\\n`` or
+    ``\\r\\n``) line terminators, in an encoding in which newline and
+    quote characters are ASCII (e.g., UTF-8). Other keyword
+    arguments are passed to :func:`csv.reader`. Requires Python 3.
+
+    """
+
+    source = read_source_from_arg(source)
+    csvargs.setdefault('dialect', 'excel')
+    return csvindex_impl(source, step, encoding, errors, **csvargs)
 
 
 def tocsv(table, source=None, encoding=None, errors='strict', write_header=True,
-          **csvargs):
+          buffersize=None, background=False, **csvargs):
     """
     Write the table to a CSV file. E.g.::
 
@@ -101,19 +219,28 @@ def tocsv(table, source=None, encoding=None, errors='strict', write_header=True,
     Note that if a file already exists at the given location, it will be
     overwritten.
 
+    Output is written to the file in blocks of `buffersize` bytes, by
+    default `petl.config.write_buffersize` (1 MiB). If `background` is
+    True, the blocks are compressed (e.g., for a ``.gz`` file) and written
+    to the file by a separate thread, overlapping with formatting the CSV
+    output; any error writing the file is raised once it is noticed.
+    Requires Python 3, otherwise `buffersize` and `background` are ignored.
+
     """
 
     source = write_source_from_arg(source)
     csvargs.setdefault('dialect', 'excel')
     tocsv_impl(table, source=source, encoding=encoding, errors=errors,
-               write_header=write_header, **csvargs)
+               write_header=write_header, buffersize=buffersize,
+               background=background, **csvargs)
 
 
 Table.tocsv = tocsv
 
 
 def appendcsv(table, source=None, encoding=None, errors='strict',
-              write_header=False, **csvargs):
+              write_header=False, buffersize=None, background=False,
+              **csvargs):
     """
     Append data rows to an existing CSV file. As :func:`petl.io.csv.tocsv`
     but the file is opened in append mode and the table header is not written by
@@ -128,14 +255,15 @@ def appendcsv(table, source=None, encoding=None, errors='strict',
     source = write_source_from_arg(source, mode='ab')
     csvargs.setdefault('dialect', 'excel')
     appendcsv_impl(table, source=source, encoding=encoding, errors=errors,
-                   write_header=write_header, **csvargs)
+                   write_header=write_header, buffersize=buffersize,
+                   background=background, **csvargs)
 
 
 Table.appendcsv = appendcsv
 
 
 def totsv(table, source=None, encoding=None, errors='strict',
-          write_header=True, **csvargs):
+          write_header=True, buffersize=None, background=False, **csvargs):
     """
     Convenience function, as :func:`petl.io.csv.tocsv` but with different
     default dialect (tab delimited).
@@ -144,14 +272,16 @@ def totsv(table, source=None, encoding=None, errors='strict',
 
     csvargs.setdefault('dialect', 'excel-tab')
     return tocsv(table, source=source, encoding=encoding, errors=errors,
-                 write_header=write_header, **csvargs)
+                 write_header=write_header, buffersize=buffersize,
+                 background=background, **csvargs)
 
 
 Table.totsv = totsv
 
 
 def appendtsv(table, source=None, encoding=None, errors='strict',
-              write_header=False, **csvargs):
+              write_header=False, buffersize=None, background=False,
+              **csvargs):
     """
     Convenience function, as :func:`petl.io.csv.appendcsv` but with different
     default dialect (tab delimited).
@@ -160,23 +290,29 @@ def appendtsv(table, source=None, encoding=None, errors='strict',
 
     csvargs.setdefault('dialect', 'excel-tab')
     return appendcsv(table, source=source, encoding=encoding, errors=errors,
-                     write_header=write_header, **csvargs)
+                     write_header=write_header, buffersize=buffersize,
+                     background=background, **csvargs)
 
 
 Table.appendtsv = appendtsv
 
 
 def teecsv(table, source=None, encoding=None, errors='strict', write_header=True,
-           **csvargs):
+           buffersize=None, background=False, **csvargs):
     """
     Returns a table that writes rows to a CSV file as they are iterated over.
 
+    The `buffersize` and `background` arguments are as for
+    :func:`petl.io.csv.tocsv`. All rows returned so far are written to the
+    file when iteration stops.
+
     """
 
     source = write_source_from_arg(source)
     csvargs.setdefault('dialect', 'excel')
     return teecsv_impl(table, source=source, encoding=encoding,
                        errors=errors, write_header=write_header,
+                       buffersize=buffersize, background=background,
                        **csvargs)
 
 
@@ -184,7 +320,7 @@ Table.teecsv = teecsv
 
 
 def teetsv(table, source=None, encoding=None, errors='strict', write_header=True,
-           **csvargs):
+           buffersize=None, background=False, **csvargs):
     """
     Convenience function, as :func:`petl.io.csv.teecsv` but with different
     default dialect (tab delimited).
@@ -193,7 +329,8 @@ def teetsv(table, source=None, encoding=None, errors='strict', write_header=True
 
     csvargs.setdefault('dialect', 'excel-tab')
     return teecsv(table, source=source, encoding=encoding, errors=errors,
-                  write_header=write_header, **csvargs)
+                  write_header=write_header, buffersize=buffersize,
+                  background=background, **csvargs)
 
 
 Table.teetsv = teetsv
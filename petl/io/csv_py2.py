@@ -8,7 +8,10 @@ import cStringIO
 
 
 # internal dependencies
-from petl.util.base import Table, data
+import petl.config as config
+from petl.util.base import Table, data, asindices
+from petl.transform.basics import itercutrows
+from petl.transform.conversions import iterconvertrows
 from petl.io.base import getcodec
 
 
@@ -16,16 +19,38 @@ def fromcsv_impl(source, **kwargs):
     return CSVView(source, **kwargs)
 
 
+def csvindex_impl(source, step, encoding, errors, **csvargs):
+    raise NotImplementedError('csvindex requires Python 3')
+
+
 class CSVView(Table):
 
-    def __init__(self, source=None, encoding=None, errors='strict', header=None, **csvargs):
+    def __init__(self, source=None, encoding=None, errors='strict', header=None,
+                 workers=None, usecols=None, types=None, failonerror=None,
+                 errorvalue=None, **csvargs):
+            # N.B., workers is ignored, parallel parsing requires Python 3
             self.source = source
             self.encoding = encoding
             self.errors = errors
             self.csvargs = csvargs
             self.header = header
+            self.usecols = usecols
+            self.types = types
+            self.failonerror = (config.failonerror if failonerror is None
+                                else failonerror)
+            self.errorvalue = errorvalue
 
     def __iter__(self):
+        rows = self._iterrecords()
+        if self.usecols is not None:
+            usecols = tuple(self.usecols)
+            rows = itercutrows(rows, lambda hdr: asindices(hdr, usecols))
+        if self.types is not None:
+            rows = iterconvertrows(rows, self.types, self.failonerror,
+                                   self.errorvalue)
+        return rows
+
+    def _iterrecords(self):
         if self.header is not None:
           yield tuple(self.header)
 
@@ -57,7 +82,9 @@ def appendcsv_impl(table, source, **kwargs):
     _writecsv(table, source=source, mode='ab', **kwargs)
 
 
-def _writecsv(table, source, mode, write_header, encoding, errors, **csvargs):
+def _writecsv(table, source, mode, write_header, encoding, errors,
+              buffersize=None, background=False, **csvargs):
+    # N.B., buffersize and background are ignored, they require Python 3
     rows = table if write_header else data(table)
     with source.open(mode) as buf:
 
@@ -84,7 +111,9 @@ def teecsv_impl(table, source, **kwargs):
 
 class TeeCSVView(Table):
     def __init__(self, table, source=None, encoding=None,
-                 errors='strict', write_header=True, **csvargs):
+                 errors='strict', write_header=True, buffersize=None,
+                 background=False, **csvargs):
+        # N.B., buffersize and background are ignored, they require Python 3
         self.table = table
         self.source = source
         self.encoding = encoding
@@ -1,10 +1,25 @@
 # -*- coding: utf-8 -*-
 import io
+import os
 import csv
+import json
+import codecs
+import locale
 import logging
+import uuid
+from bisect import bisect_right
+from collections import deque
+from functools import partial
+from itertools import islice
 
 
-from petl.util.base import Table, data
+import petl.config as config
+from petl.errors import ArgumentError
+from petl.util.base import Table, data, asindices, rowgetter
+from petl.transform.basics import itercutrows
+from petl.transform.conversions import iterconvertrows, inferconverters
+from petl.io.base import iterbackwards, linestart, writebuffer
+from petl.io.sources import FileSource, BGZFSource
 
 
 logger = logging.getLogger(__name__)
@@ -19,26 +34,596 @@ def fromcsv_impl(source, **kwargs):
 
 class CSVView(Table):
 
-    def __init__(self, source, encoding, errors, header, **csvargs):
+    def __init__(self, source, encoding, errors, header, workers=None,
+                 usecols=None, types=None, failonerror=None, errorvalue=None,
+                 **csvargs):
             self.source = source
             self.encoding = encoding
             self.errors = errors
             self.csvargs = csvargs
             self.header = header
+            self.workers = workers
+            self.usecols = usecols
+            self.types = types
+            self.failonerror = (config.failonerror if failonerror is None
+                                else failonerror)
+            self.errorvalue = errorvalue
+            self._hdrcache = None
 
     def __iter__(self):
+        if self.usecols is None and self.types is None:
+            return self._iterrecords()
+        return self._cutconvert(self._iterrecords(raw=True), self.types)
+
+    def _cutconvert(self, rows, types):
+        # select and convert fields as requested via usecols and types
+        if self.usecols is not None:
+            rows = itercutrows(rows, self._selectusecols)
+        if types is not None:
+            rows = iterconvertrows(rows, types, self.failonerror,
+                                   self.errorvalue)
+        return rows
+
+    def _iterrecords(self, raw=False):
+        # N.B., if `raw`, rows may be yielded as lists, as parsed
         if self.header is not None:
-          yield tuple(self.header)
+            yield tuple(self.header)
+        if self.workers and self.workers > 1 and self._splittable():
+            index = self._index()
+            rows = iterparallelcsv(self.source, self.encoding,
+                                   self.errors, self.csvargs, self.workers,
+                                   offsets=index and index['offsets'])
+        else:
+            rows = self._iterrows(raw)
+        for row in rows:
+            yield row
+
+    def _iterrows(self, raw=False):
         with self.source.open('rb') as buf:
             csvfile = io.TextIOWrapper(buf, encoding=self.encoding,
                                        errors=self.errors, newline='')
             try:
                 reader = csv.reader(csvfile, **self.csvargs)
-                for row in reader:
-                    yield tuple(row)
+                for row in (reader if raw else map(tuple, reader)):
+                    yield row
             finally:
                 csvfile.detach()
 
+    def _selectusecols(self, hdr):
+        return asindices(hdr, tuple(self.usecols))
+
+    def _itercut(self, select, missing):
+        """Return an iterator over the header and the data rows holding just
+        the fields whose indices are returned by `select`, given the header,
+        or None if the rows can't be cut while parsing."""
+        if self.usecols is not None:
+            return None
+        rows = self._iterrecords(raw=True)
+        if self.types is not None:
+            rows = iterconvertrows(rows, self.types, self.failonerror,
+                                   self.errorvalue, raw=True)
+        return itercutrows(rows, select, missing)
+
+    def _header(self):
+        if self.header is not None:
+            hdr = tuple(self.header)
+        else:
+            hdr = self._firstrecord()
+        if hdr is not None and self.usecols is not None:
+            hdr = rowgetter(*self._selectusecols(hdr))(hdr)
+        return hdr
+
+    def _firstrecord(self):
+        # read just the first record, and remember it for as long as the
+        # file is unchanged
+        key = self._statkey()
+        if key is not None and self._hdrcache is not None \
+                and self._hdrcache[0] == key:
+            return self._hdrcache[1]
+        rows = self._iterrows()
+        try:
+            hdr = next(rows, None)
+        finally:
+            rows.close()
+        if key is not None and hdr is not None:
+            self._hdrcache = (key, hdr)
+        return hdr
+
+    def _statkey(self):
+        if not _randomaccess(self.source):
+            return None
+        try:
+            stat = os.stat(self.source.filename)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _nrows(self):
+        if self.types is not None and self.failonerror and \
+                self.failonerror != 'inline':
+            # conversion errors must be raised, so values have to be seen
+            return None
+        index = self._index()
+        if index is not None:
+            nrecords = index['nrecords']
+        else:
+            # count records in the raw bytes, parsing only the lines which
+            # may be part of a quoted value
+            if not _scannable(self.encoding, self.csvargs):
+                return None
+            try:
+                with self.source.open('rb') as buf:
+                    nrecords = _countrecords(buf, self.csvargs)
+            except csv.Error:
+                # leave it to the reader to report the error
+                return None
+        if self.header is None:
+            nrecords -= 1
+        return max(nrecords, 0)
+
+    def _splittable(self):
+        # parallel parsing needs random access to the file, and an encoding
+        # in which newline and quote characters are single bytes
+        if not _randomaccess(self.source):
+            return False
+        return _asciinewlines(self.encoding, self.csvargs)
+
+    def _index(self):
+        # load the sidecar index built by csvindex, if there is one and it
+        # is up to date
+        if not _randomaccess(self.source):
+            return None
+        return _loadindex(self.source.filename, self.encoding, self.csvargs)
+
+    def _iterfrom(self, start):
+        """Return an iterator over the header and the data rows from index
+        `start` (which may be negative, counting from the end), or None if
+        the rows can't be reached without reading from the beginning."""
+        index = self._index()
+        if index is not None:
+            it = self._iterfromindex(index, start)
+        elif start < 0 and self._tailable():
+            it = self._itertail(-start)
+        else:
+            return None
+        types = self.types
+        if types == 'infer':
+            # infer from the same rows as when reading from the beginning
+            rows = self._cutconvert(self._iterrecords(raw=True), None)
+            try:
+                next(rows, None)
+                types = inferconverters(rows)
+            finally:
+                rows.close()
+        return self._cutconvert(it, types)
+
+    def _tailable(self):
+        # reading backwards needs random access to the file, and records
+        # which can only continue over a line break within a quoted value
+        if not _randomaccess(self.source):
+            return False
+        return (_dialect(self.csvargs).escapechar is None and
+                _scannable(self.encoding, self.csvargs))
+
+    def _itertail(self, n):
+        source = self.source
+        if self.header is not None:
+            yield tuple(self.header)
+        first = 0 if self.header is not None else 1
+        with source.open('rb') as buf:
+            size = buf.seek(0, io.SEEK_END)
+            for offset, chunk in iterbackwards(buf, size):
+                if offset == 0:
+                    rows = list(_iterrange(source, 0, self.encoding,
+                                           self.errors, self.csvargs))
+                    for row in rows[:first]:
+                        yield row
+                    rows = rows[first:]
+                    break
+                i = linestart(chunk)
+                if i is None:
+                    continue
+                rows = _tailrows(chunk[i:], self.encoding, self.errors,
+                                 self.csvargs)
+                if rows is not None and len(rows) >= n:
+                    if first:
+                        for row in islice(_iterrange(source, 0,
+                                                     self.encoding,
+                                                     self.errors,
+                                                     self.csvargs), 1):
+                            yield row
+                    break
+        for row in rows[-n:]:
+            yield row
+
+    def _iterfromindex(self, index, start):
+        source = self.source
+        nrecords = index['nrecords']
+        first = 0 if self.header is not None else 1
+        if start < 0:
+            record = max(nrecords + start, first)
+        else:
+            record = start + first
+        if self.header is not None:
+            yield tuple(self.header)
+        else:
+            for row in islice(_iterrange(source, 0, self.encoding,
+                                         self.errors, self.csvargs), 1):
+                yield row
+        if record < nrecords:
+            step = index['step']
+            block = record // step
+            rows = _iterrange(source, index['offsets'][block],
+                              self.encoding, self.errors, self.csvargs)
+            for row in islice(rows, record - block * step, None):
+                yield row
+
+
+def _randomaccess(source):
+    # whether the source is a local file whose data can be read from any
+    # offset without reading from the start
+    if type(source) is FileSource:
+        return not source.kwargs
+    return type(source) is BGZFSource and source.seekable()
+
+
+def _dialect(csvargs):
+    return csv.reader(io.StringIO(''), **csvargs).dialect
+
+
+def _encoding(encoding):
+    return codecs.lookup(encoding or locale.getpreferredencoding(False)).name
+
+
+def _asciinewlines(encoding, csvargs):
+    # whether the file can be split on newline bytes
+    try:
+        encoding = _encoding(encoding)
+    except LookupError:
+        return False
+    dialect = _dialect(csvargs)
+    chars = ['\n', dialect.quotechar or '"']
+    return all(c.encode(encoding) == c.encode('ascii') for c in chars)
+
+
+_dialectattrs = ('delimiter', 'doublequote', 'escapechar', 'quotechar',
+                 'quoting', 'skipinitialspace', 'strict')
+
+
+def _indexkey(encoding, csvargs):
+    dialect = _dialect(csvargs)
+    return {'encoding': _encoding(encoding),
+            'dialect': dict((a, getattr(dialect, a)) for a in _dialectattrs)}
+
+
+def _indexpath(filename):
+    return filename + '.csvidx'
+
+
+def csvindex_impl(source, step, encoding, errors, **csvargs):
+    if not _randomaccess(source):
+        raise ArgumentError('csvindex requires a local, uncompressed or BGZF '
+                            'file')
+    if not _asciinewlines(encoding, csvargs):
+        raise ArgumentError('csvindex requires an encoding in which newline '
+                            'and quote characters are ASCII, found %r'
+                            % encoding)
+    filename = source.filename
+    stat = os.stat(filename)
+    offsets = list()
+    nrecords = 0
+    with source.open('rb') as buf:
+        for offset in _iterrecordoffsets(buf, encoding, errors, csvargs):
+            if nrecords % step == 0:
+                offsets.append(offset)
+            nrecords += 1
+    index = _indexkey(encoding, csvargs)
+    index.update(version=1, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                 step=step, nrecords=nrecords, offsets=offsets)
+    path = _indexpath(filename)
+    tmppath = path + '.tmp'
+    with io.open(tmppath, 'w', encoding='ascii') as f:
+        json.dump(index, f)
+    os.replace(tmppath, path)
+    return path
+
+
+def _tailrows(data, encoding, errors, csvargs):
+    # parse the records in data, which starts at the start of a line, and
+    # return those following the first record boundary on which parsing from
+    # outside and from inside a quoted value agree, as records from there on
+    # are the same whichever was the case, or None if there is no such
+    # boundary
+    lines = list(io.TextIOWrapper(io.BytesIO(data), encoding=encoding,
+                                  errors=errors, newline=''))
+    try:
+        ends, rows = _parselines(lines, csvargs)
+    except csv.Error:
+        return None
+    dialect = _dialect(csvargs)
+    quote = dialect.quotechar
+    if dialect.quoting == csv.QUOTE_NONE or \
+            not any(quote in line for line in lines):
+        # a quoted value can't run on to the end of the file
+        return rows
+    try:
+        quotedends, _ = _parselines([quote + lines[0]] + lines[1:], csvargs)
+    except csv.Error:
+        return rows
+    common = set(ends).intersection(quotedends)
+    if not common:
+        return None
+    return rows[ends.index(min(common)) + 1:]
+
+
+def _parselines(lines, csvargs):
+    # parse records from a list of lines, also returning the number of lines
+    # consumed at the end of each record
+    consumed = [0]
+
+    def feed():
+        for line in lines:
+            consumed[0] += 1
+            yield line
+
+    ends = list()
+    rows = list()
+    for row in csv.reader(feed(), **csvargs):
+        ends.append(consumed[0])
+        rows.append(tuple(row))
+    return ends, rows
+
+
+def _iterrecordoffsets(buf, encoding, errors, csvargs):
+    # yield the byte offset at which each record starts, relying on the
+    # reader consuming exactly the lines of each record it returns
+    encoding = _encoding(encoding)
+    consumed = [0]
+
+    def lines():
+        for line in buf:
+            consumed[0] += len(line)
+            yield line.decode(encoding, errors)
+
+    start = 0
+    for _ in csv.reader(lines(), **csvargs):
+        yield start
+        start = consumed[0]
+
+
+def _loadindex(filename, encoding, csvargs):
+    path = _indexpath(filename)
+    try:
+        with io.open(path, 'r', encoding='ascii') as f:
+            index = json.load(f)
+        stat = os.stat(filename)
+    except (IOError, OSError, ValueError):
+        return None
+    if (index.get('version') != 1 or
+            index['size'] != stat.st_size or
+            index['mtime_ns'] != stat.st_mtime_ns):
+        debug('ignoring out of date index %s', path)
+        return None
+    key = _indexkey(encoding, csvargs)
+    if any(index[k] != v for k, v in key.items()):
+        debug('ignoring index %s built with different options', path)
+        return None
+    return index
+
+
+def _scannable(encoding, csvargs):
+    # whether records can be found in the raw bytes, i.e., whether the
+    # characters with a special meaning are single ASCII bytes
+    dialect = _dialect(csvargs)
+    chars = ['\r', '\n', dialect.delimiter, dialect.quotechar or '"',
+             dialect.escapechar or '\\']
+    try:
+        encoding = _encoding(encoding)
+        return all(c.encode(encoding) == c.encode('ascii') for c in chars)
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _countrecords(buf, csvargs):
+    # count the records in a binary file: lines without quote or escape
+    # characters which start a record are only counted, other lines are
+    # parsed, so that line breaks within quoted values are recognised; the
+    # special characters are ASCII, so decoding as latin-1 is safe and cheap
+    dialect = _dialect(csvargs)
+    quote = dialect.quotechar if dialect.quoting != csv.QUOTE_NONE else None
+    escape = dialect.escapechar
+    counts = [0, 0]  # records parsed, lines counted
+
+    def lines(f):
+        parsed = -1
+        for line in f:
+            if (counts[0] > parsed and
+                    (quote is None or quote not in line) and
+                    (escape is None or escape not in line)):
+                counts[1] += 1
+            else:
+                parsed = counts[0]
+                yield line
+
+    f = io.TextIOWrapper(buf, encoding='latin-1', newline='')
+    try:
+        for _ in csv.reader(lines(f), **csvargs):
+            counts[0] += 1
+    finally:
+        f.detach()
+    return counts[0] + counts[1]
+
+
+# size of the byte ranges parsed by each task when parsing in parallel
+_rangesize = 2**24
+
+
+def iterparallelcsv(source, encoding, errors, csvargs, workers,
+                    offsets=None):
+    """Parse a CSV file in byte ranges in a pool of `workers` processes,
+    yielding rows in file order. The `source` must allow random access, see
+    _randomaccess. If given, `offsets` are known record boundaries, e.g.,
+    from an index built by csvindex."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    blocks = ustarts = None
+    if type(source) is BGZFSource:
+        # find the blocks once, rather than in each task
+        blocks = source._blockoffsets()
+        ustarts = [u for _, u in blocks]
+        size = blocks[-1][1]
+    else:
+        with source.open('rb') as f:
+            size = f.seek(0, io.SEEK_END)
+    dialect = _dialect(csvargs)
+    if dialect.quoting == csv.QUOTE_NONE:
+        quote = None
+    else:
+        quote = (dialect.quotechar or '"').encode('ascii')
+    marker = uuid.uuid4().hex
+    tasksource = partial(_tasksource, source, blocks, ustarts)
+
+    with ProcessPoolExecutor(workers) as pool:
+        if offsets:
+            # ranges start on known record boundaries
+            starts = [0]
+            for offset in offsets:
+                if offset - starts[-1] >= _rangesize:
+                    starts.append(offset)
+            parities = None
+        else:
+            starts = list(range(0, size, _rangesize)) or [0]
+            # quote parity at the start of each range, used to find the
+            # first newline outside of a quoted field
+            counts = pool.map(_countquotes,
+                              [tasksource(start, start + _rangesize)
+                               for start in starts],
+                              starts, [_rangesize] * len(starts),
+                              [quote] * len(starts))
+            parities = [0]
+            for n in counts:
+                parities.append((parities[-1] + n) % 2)
+
+        ends = starts[1:] + [size]
+        tasks = ((tasksource(starts[i], ends[i]), starts[i],
+                  parities and parities[i], ends[i],
+                  parities and parities[i + 1], size, quote, encoding,
+                  errors, csvargs, marker if parities else None)
+                 for i in range(len(starts)))
+        # bounded buffer of ranges in flight, to keep rows in order
+        pending = deque()
+        try:
+            while True:
+                for task in tasks:
+                    pending.append(pool.submit(_parserange, *task))
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    return
+                rows, start, ok = pending.popleft().result()
+                if not ok:
+                    # the range didn't end on a record boundary (e.g.,
+                    # unbalanced quotes), parse the rest of the file in
+                    # sequence from the last known boundary
+                    for future in pending:
+                        future.cancel()
+                    pending.clear()
+                    debug('falling back to sequential parsing at offset %s',
+                          start)
+                    for row in _iterrange(source, start, encoding, errors,
+                                          csvargs):
+                        yield row
+                    return
+                for row in rows:
+                    yield row
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _tasksource(source, blocks, ustarts, start, end):
+    # return the source for a task reading from `start` to about `end`; for
+    # BGZF, each process decompresses in a single thread, and is given the
+    # offsets of just the blocks it may seek to, i.e., those from the block
+    # holding `start` to the block holding `end`, then the end of the file,
+    # where `ustarts` are the uncompressed offsets of the `blocks`
+    if blocks is None:
+        return source
+    i = max(bisect_right(ustarts, start) - 1, 0)
+    j = min(bisect_right(ustarts, end), len(blocks) - 1)
+    tasksource = BGZFSource(source.filename, workers=1)
+    tasksource._offsets = blocks[i:j] + blocks[-1:]
+    return tasksource
+
+
+def _countquotes(source, start, n, quote):
+    if quote is None:
+        return 0
+    with source.open('rb') as f:
+        f.seek(start)
+        return f.read(n).count(quote)
+
+
+def _findboundary(f, pos, parity, size, quote, blocksize=2**16):
+    # find the position following the first newline at or after `pos` which
+    # is preceded by an even number of quotes, given the parity at `pos`
+    if pos == 0 or pos >= size:
+        return min(pos, size)
+    f.seek(pos)
+    while True:
+        block = f.read(blocksize)
+        if not block:
+            return size
+        i = 0
+        while True:
+            j = block.find(b'\n', i)
+            if j < 0:
+                if quote is not None:
+                    parity = (parity + block.count(quote, i)) % 2
+                break
+            if quote is not None:
+                parity = (parity + block.count(quote, i, j)) % 2
+            if not parity:
+                return pos + j + 1
+            i = j + 1
+        pos += len(block)
+
+
+def _parserange(source, start, startparity, end, endparity, size, quote,
+                 encoding, errors, csvargs, marker):
+    # N.B., without a marker, start and end are known record boundaries
+    with source.open('rb') as f:
+        if marker is not None:
+            start = _findboundary(f, start, startparity, size, quote)
+            end = _findboundary(f, end, endparity, size, quote)
+        if start >= end:
+            return [], start, True
+        f.seek(start)
+        text = f.read(end - start).decode(encoding or
+                                          locale.getpreferredencoding(False),
+                                          errors)
+    check = marker is not None and end < size
+    if check:
+        # if the range ends on a record boundary, the marker is read as a
+        # row by itself, otherwise it is absorbed into the last field
+        text += marker + '\n'
+    rows = [tuple(row) for row in
+            csv.reader(io.StringIO(text, newline=''), **csvargs)]
+    if check:
+        if not rows or rows[-1] != (marker,):
+            return None, start, False
+        rows.pop()
+    return rows, start, True
+
+
+def _iterrange(source, start, encoding, errors, csvargs):
+    with source.open('rb') as buf:
+        buf.seek(start)
+        csvfile = io.TextIOWrapper(buf, encoding=encoding, errors=errors,
+                                   newline='')
+        for row in csv.reader(csvfile, **csvargs):
+            yield tuple(row)
+
 
 def tocsv_impl(table, source, **kwargs):
     _writecsv(table, source=source, mode='wb', **kwargs)
@@ -48,16 +633,21 @@ def appendcsv_impl(table, source, **kwargs):
     _writecsv(table, source=source, mode='ab', **kwargs)
 
 
-def _writecsv(table, source, mode, write_header, encoding, errors, **csvargs):
+# number of rows passed to the writer at a time by teecsv
+_writebatchsize = 1024
+
+
+def _writecsv(table, source, mode, write_header, encoding, errors,
+              buffersize=None, background=False, **csvargs):
     rows = table if write_header else data(table)
-    with source.open(mode) as buf:
+    with source.open(mode) as buf, \
+            writebuffer(buf, buffersize, background) as wbuf:
         # wrap buffer for text IO
-        csvfile = io.TextIOWrapper(buf, encoding=encoding, errors=errors,
+        csvfile = io.TextIOWrapper(wbuf, encoding=encoding, errors=errors,
                                    newline='')
         try:
             writer = csv.writer(csvfile, **csvargs)
-            for row in rows:
-                writer.writerow(row)
+            writer.writerows(rows)
             csvfile.flush()
         finally:
             csvfile.detach()
@@ -70,18 +660,22 @@ def teecsv_impl(table, source, **kwargs):
 class TeeCSVView(Table):
 
     def __init__(self, table, source=None, encoding=None,
-                 errors='strict', write_header=True, **csvargs):
+                 errors='strict', write_header=True, buffersize=None,
+                 background=False, **csvargs):
         self.table = table
         self.source = source
         self.write_header = write_header
         self.encoding = encoding
         self.errors = errors
+        self.buffersize = buffersize
+        self.background = background
         self.csvargs = csvargs
 
     def __iter__(self):
-        with self.source.open('wb') as buf:
+        with self.source.open('wb') as buf, \
+                writebuffer(buf, self.buffersize, self.background) as wbuf:
             # wrap buffer for text IO
-            csvfile = io.TextIOWrapper(buf, encoding=self.encoding,
+            csvfile = io.TextIOWrapper(wbuf, encoding=self.encoding,
                                        errors=self.errors, newline='')
             try:
                 writer = csv.writer(csvfile, **self.csvargs)
@@ -90,9 +684,19 @@ class TeeCSVView(Table):
                 if self.write_header:
                     writer.writerow(hdr)
                 yield tuple(hdr)
-                for row in it:
-                    writer.writerow(row)
-                    yield tuple(row)
+                # rows are written in batches, but always including all rows
+                # yielded so far, even if iteration stops early
+                batch = list()
+                try:
+                    for row in it:
+                        row = tuple(row)
+                        batch.append(row)
+                        yield row
+                        if len(batch) >= _writebatchsize:
+                            writer.writerows(batch)
+                            batch = list()
+                finally:
+                    writer.writerows(batch)
                 csvfile.flush()
             finally:
                 csvfile.detach()
@@ -4,6 +4,7 @@ from __future__ import absolute_import, print_function, division
 
 # standard library dependencies
 import logging
+from contextlib import contextmanager
 from petl.compat import next, text_type, string_types
 
 
@@ -79,6 +80,16 @@ def fromdb(dbo, query, *args, **kwargs):
         * http://initd.org/psycopg/docs/usage.html#server-side-cursors
         * http://mysql-python.sourceforge.net/MySQLdb.html#using-and-extending
 
+    If `query` is a ``SELECT`` statement, :func:`petl.util.counting.nrows`
+    counts rows by having the database run ``SELECT COUNT(*)`` over it,
+    rather than by fetching the whole result set. If the database rejects
+    that, rows are counted by fetching them instead. The count is run
+    within a savepoint where `dbo` is a connection, cursor or SQLAlchemy
+    session or connection, so that a transaction in progress survives its
+    failure. Where `dbo` is a function returning a cursor, a failed count
+    aborts any transaction in progress on databases such as PostgreSQL, so
+    falling back only works with autocommit connections.
+
     """
 
     # convenience for working with sqlite3
@@ -140,6 +151,72 @@ class DbView(Table):
 
         return _iter(self.dbo, self.query, *self.args, **self.kwargs)
 
+    def _nrows(self):
+        # have the database count the rows of SELECT queries
+        if not isinstance(self.query, string_types):
+            return None
+        query = self.query.strip().rstrip(';')
+        if query[:6].upper() != 'SELECT':
+            return None
+        query = 'SELECT COUNT(*) FROM (%s) petl_nrows' % query
+        try:
+            with _savepoint(self.dbo):
+                rows = iter(DbView(self.dbo, query, *self.args,
+                                   **self.kwargs))
+                try:
+                    next(rows)  # header
+                    return next(rows)[0]
+                finally:
+                    rows.close()
+        except Exception as e:
+            # not every database accepts any query as a subquery, e.g., SQL
+            # Server rejects ORDER BY there, and the types of database errors
+            # depend on the driver, so leave the rows to be counted by
+            # iterating
+            debug('counting rows of %r failed: %s', self.query, e)
+            return None
+
+
+@contextmanager
+def _savepoint(dbo):
+    # run the body within a savepoint, where the database object allows, and
+    # roll back to it if the body fails, so that a transaction in progress
+    # can continue, e.g., on PostgreSQL, where any error otherwise aborts the
+    # transaction; N.B., SQLAlchemy engines run each query on a connection
+    # of its own, and the connection used by a function returning a cursor
+    # is unknown, so a failed query may still abort a transaction there
+    if _is_dbapi_connection(dbo):
+        def execute(statement):
+            cursor = dbo.cursor()
+            try:
+                cursor.execute(statement)
+            finally:
+                cursor.close()
+    elif _is_dbapi_cursor(dbo):
+        execute = dbo.execute
+    elif not _is_sqlalchemy_engine(dbo) and (_is_sqlalchemy_session(dbo) or
+                                             _is_sqlalchemy_connection(dbo)):
+        with dbo.begin_nested():
+            yield
+        return
+    else:
+        execute = None
+    if execute is not None:
+        try:
+            execute('SAVEPOINT petl_savepoint')
+        except Exception as e:
+            # e.g., not supported, or not within a transaction
+            debug('savepoint failed: %s', e)
+            execute = None
+    try:
+        yield
+    except Exception:
+        if execute is not None:
+            execute('ROLLBACK TO SAVEPOINT petl_savepoint')
+        raise
+    if execute is not None:
+        execute('RELEASE SAVEPOINT petl_savepoint')
+
 
 def _iter_dbapi_mkcurs(mkcurs, query, *args, **kwargs):
     cursor = mkcurs()
@@ -3,16 +3,22 @@ from __future__ import absolute_import, print_function, division
 
 # standard library dependencies
 import io
+import re
 import json
 import inspect
+import threading
+from collections import deque
 from json.encoder import JSONEncoder
 from os import unlink
 from tempfile import NamedTemporaryFile
 
 from petl.compat import PY2
 from petl.compat import pickle
+from petl.compat import string_types
+from petl.compat import Queue, Full
 from petl.io.sources import read_source_from_arg, write_source_from_arg
 # internal dependencies
+import petl.config as config
 from petl.util.base import data, Table, dicts as _dicts, iterpeek
 
 
@@ -72,10 +78,53 @@ def fromjson(source, *args, **kwargs):
         | 'Deloise' | [['three of a kind', '5S']]               |
         +-----------+-------------------------------------------+
 
+    With `lines` set, each line is decoded by `decoder`, which may be any
+    function taking a string and returning an object, e.g., ``orjson.loads``.
+    If `decoder` is ``'auto'``, :mod:`orjson` is used if installed, falling
+    back to :func:`json.loads`, which is the default. Blank lines are
+    skipped.
+
+    Setting argument `workers` to a number greater than 1 will decode JSON
+    lines in parallel, in a pool of that many processes. The file is read in
+    blocks of whole lines (in a background thread, so that decompression of
+    e.g. gzip sources overlaps with decoding), each block is decoded by a
+    worker, and rows are returned in the order of the file. The `decoder`
+    must be picklable, e.g., a module-level function.
+
     If your JSON file does not fit this structure, you will need to parse it
     via :func:`json.load` and select the array to treat as the data, see also
     :func:`petl.io.json.fromdicts`.
 
+    Setting argument `stream` to `True` will decode the array incrementally,
+    one member at a time, so memory use is bounded by the size of the
+    largest member rather than the whole file. The array to read is
+    selected by `path`, a dot-separated sequence of object keys, where
+    ``item`` steps into the members of an array, e.g.::
+
+        >>> data = '''
+        ... {"total": 2,
+        ...  "items": [{"foo": "a", "bar": 1},
+        ...            {"foo": "b", "bar": 2}]}
+        ... '''
+        >>> with open('example.file5.json', 'w') as f:
+        ...     f.write(data)
+        ...
+        85
+        >>> table3 = etl.fromjson('example.file5.json', stream=True,
+        ...                       path='items.item')
+        >>> table3
+        +-----+-----+
+        | foo | bar |
+        +=====+=====+
+        | 'a' |   1 |
+        +-----+-----+
+        | 'b' |   2 |
+        +-----+-----+
+
+    By default `path` is ``'item'``, i.e., the members of a top-level array.
+    Any other keyword arguments are passed to the :class:`json.JSONDecoder`
+    (or to `cls`, if given) used to decode each member.
+
     .. versionchanged:: 1.1.0
 
     If no `header` is specified, fields will be discovered by sampling keys
@@ -99,18 +148,41 @@ class JsonView(Table):
         self.header = kwargs.pop('header', None)
         self.sample = kwargs.pop('sample', 1000)
         self.lines = kwargs.pop('lines', False)
+        self.stream = kwargs.pop('stream', False)
+        self.path = kwargs.pop('path', 'item')
+        self.decoder = kwargs.pop('decoder', None)
+        self.workers = kwargs.pop('workers', None)
         self.args = args
         self.kwargs = kwargs
 
     def __iter__(self):
         with self.source.open('rb') as f:
+            if self.lines and self.workers and self.workers > 1:
+                # decode from the binary stream
+                rows = iterjlinesparallel(f, self.header, self.missing,
+                                          _jsondecoder(self.decoder),
+                                          self.workers)
+                try:
+                    for row in rows:
+                        yield row
+                finally:
+                    rows.close()
+                return
             if not PY2:
                 # wrap buffer for text IO
                 f = io.TextIOWrapper(f, encoding='utf-8', newline='',
                                      write_through=True)
             try:
                 if self.lines:
-                    for row in iterjlines(f, self.header, self.missing):
+                    for row in iterjlines(f, self.header, self.missing,
+                                          _jsondecoder(self.decoder)):
+                        yield row
+                elif self.stream:
+                    kwargs = dict(self.kwargs)
+                    cls = kwargs.pop('cls', None) or json.JSONDecoder
+                    dicts = iterjsonpath(f, self.path, cls(**kwargs))
+                    for row in iterdicts(dicts, self.header, self.sample,
+                                         self.missing):
                         yield row
                 else:
                     dicts = json.load(f, *self.args, **self.kwargs)
@@ -122,7 +194,8 @@ class JsonView(Table):
                     f.detach()
 
 
-def fromdicts(dicts, header=None, sample=1000, missing=None):
+def fromdicts(dicts, header=None, sample=1000, missing=None, buffersize=None,
+              tempdir=None):
     """
     View a sequence of Python :class:`dict` as a table. E.g.::
 
@@ -164,6 +237,13 @@ def fromdicts(dicts, header=None, sample=1000, missing=None):
     inspected to discovery dictionary keys. Note that the order in which
     dictionary keys are discovered may not be stable,
 
+    When `dicts` is a generator, up to `buffersize` rows (by default
+    `petl.config.sort_buffersize`) are cached in memory; further rows are
+    written in blocks to a temporary file in `tempdir`. If `sample` is None
+    and no `header` is given, the header is discovered in a single pass over
+    the generator, widening as new keys are found, so the generator is
+    consumed in full before the header is returned.
+
     See also :func:`petl.io.json.fromjson`.
 
     .. versionchanged:: 1.1.0
@@ -187,94 +267,451 @@ def fromdicts(dicts, header=None, sample=1000, missing=None):
     instead of `itertools.tee` due to high memory usage.
 
     """
-    view = DictsGeneratorView if inspect.isgenerator(dicts) else DictsView
-    return view(dicts, header=header, sample=sample, missing=missing)
+    if inspect.isgenerator(dicts):
+        return DictsGeneratorView(dicts, header=header, sample=sample,
+                                  missing=missing, buffersize=buffersize,
+                                  tempdir=tempdir)
+    return DictsView(dicts, header=header, sample=sample, missing=missing)
 
 
 class DictsView(Table):
 
     def __init__(self, dicts, header=None, sample=1000, missing=None):
         self.dicts = dicts
-        self._header = header
+        self._fields = header
         self.sample = sample
         self.missing = missing
 
     def __iter__(self):
-        return iterdicts(self.dicts, self._header, self.sample, self.missing)
+        return iterdicts(self.dicts, self._fields, self.sample, self.missing)
+
+    def _header(self):
+        if self._fields is None:
+            return None
+        return tuple(self._fields)
 
 
 class DictsGeneratorView(DictsView):
 
-    def __init__(self, dicts, header=None, sample=1000, missing=None):
+    def __init__(self, dicts, header=None, sample=1000, missing=None,
+                 buffersize=None, tempdir=None):
         super(DictsGeneratorView, self).__init__(dicts, header, sample, missing)
-        self._filecache = None
-        self._cached = 0
+        if buffersize is None:
+            buffersize = config.sort_buffersize
+        self._cache = _RowCache(buffersize, tempdir)
 
     def __iter__(self):
-        if not self._header:
+        if not self._fields:
             self._determine_header()
-        yield self._header
-
-        if not self._filecache:
-            if PY2:
-                self._filecache = NamedTemporaryFile(delete=False, mode='wb+', bufsize=0)
-            else:
-                self._filecache = NamedTemporaryFile(delete=False, mode='wb+', buffering=0)
-
-        position = 0
-        it = iter(self.dicts)
-        while True:
-            if position < self._cached:
-                self._filecache.seek(position)
-                row = pickle.load(self._filecache)
-                position = self._filecache.tell()
+        yield self._fields
+
+        n = len(self._fields)
+        missing = self.missing
+        reader = _RowCacheReader(self._cache)
+        try:
+            position = 0
+            while True:
+                if position < len(self._cache):
+                    row = reader.get(position)
+                    if len(row) < n:
+                        # cached before the header was widened
+                        row += (missing,) * (n - len(row))
+                else:
+                    try:
+                        o = next(self.dicts)
+                    except StopIteration:
+                        break
+                    row = tuple(o.get(f, missing) for f in self._fields)
+                    self._cache.append(row)
+                position += 1
                 yield row
-                continue
-            try:
-                o = next(it)
-            except StopIteration:
-                break
-            row = tuple(o.get(f, self.missing) for f in self._header)
-            self._filecache.seek(self._cached)
-            pickle.dump(row, self._filecache, protocol=-1)
-            self._cached = position = self._filecache.tell()
-            yield row
+        finally:
+            reader.close()
+
+    def _header(self):
+        if not self._fields:
+            self._determine_header()
+        return self._fields
 
     def _determine_header(self):
         it = iter(self.dicts)
         header = list()
-        peek, it = iterpeek(it, self.sample)
+        if self.sample is None:
+            # single pass, caching rows with the keys known so far
+            keys = set()
+            for o in it:
+                for k in o:
+                    if k not in keys:
+                        keys.add(k)
+                        header.append(k)
+                self._cache.append(tuple(o.get(f, self.missing)
+                                         for f in header))
+        else:
+            peek, it = iterpeek(it, self.sample)
+            if isinstance(peek, dict):
+                peek = [peek]
+            for o in peek:
+                if hasattr(o, 'keys'):
+                    header += [k for k in o.keys() if k not in header]
         self.dicts = it
-        if isinstance(peek, dict):
-            peek = [peek]
-        for o in peek:
-            if hasattr(o, 'keys'):
-                header += [k for k in o.keys() if k not in header]
-        self._header = tuple(header)
+        self._fields = tuple(header)
         return it
 
-    def __del__(self):
-        if self._filecache:
-            self._filecache.close()
-            unlink(self._filecache.name)
 
+class _RowCache(object):
+    # rows are held in memory up to buffersize, then pickled to a temporary
+    # file in blocks of blocksize rows, one frame per block
+
+    blocksize = 1000
 
-def iterjlines(f, header, missing):
-    it = iter(f)
+    def __init__(self, buffersize, tempdir=None):
+        self.buffersize = buffersize
+        self.tempdir = tempdir
+        self.head = list()
+        self.block = list()
+        self.frames = 0
+        self.file = None
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, row):
+        if self.buffersize is None or len(self.head) < self.buffersize:
+            self.head.append(row)
+        else:
+            self.block.append(row)
+            if len(self.block) >= self.blocksize:
+                self.flush()
+        self.count += 1
+
+    def flush(self):
+        if self.file is None:
+            self.file = NamedTemporaryFile(dir=self.tempdir, delete=False,
+                                           mode='wb')
+        pickle.dump(self.block, self.file, protocol=-1)
+        self.file.flush()
+        self.frames += 1
+        self.block = list()
+
+    def __del__(self):
+        if self.file is not None:
+            self.file.close()
+            unlink(self.file.name)
+
+
+class _RowCacheReader(object):
+    # reads rows back from a cache in order, keeping one block in memory
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.file = None
+        self.frame = -1
+        self.rows = None
+
+    def get(self, i):
+        cache = self.cache
+        if i < len(cache.head):
+            return cache.head[i]
+        frame, offset = divmod(i - len(cache.head), cache.blocksize)
+        if frame < cache.frames:
+            if self.file is None:
+                self.file = open(cache.file.name, 'rb')
+            while self.frame < frame:
+                self.rows = pickle.load(self.file)
+                self.frame += 1
+            return self.rows[offset]
+        return cache.block[offset]
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def _jsondecoder(decoder):
+    if decoder is None:
+        return json.loads
+    elif isinstance(decoder, string_types) and decoder == 'auto':
+        try:
+            import orjson
+        except ImportError:
+            return json.loads
+        return orjson.loads
+    return decoder
+
+
+def iterjlines(f, header, missing, decoder=json.loads):
+    it = (line for line in f if line.strip())
 
     if header is None:
         header = list()
         peek, it = iterpeek(it, 1)
-        json_obj = json.loads(peek)
+        json_obj = decoder(peek)
         if hasattr(json_obj, 'keys'):
             header += [k for k in json_obj.keys() if k not in header]
     yield tuple(header)
 
     for o in it:
-        json_obj = json.loads(o)
+        json_obj = decoder(o)
         yield tuple(json_obj[f] if f in json_obj else missing for f in header)
 
 
+def _decodejlines(block, decoder):
+    # split the bytes rather than the text, as str.splitlines also splits
+    # on characters such as U+2028 which may appear within JSON strings;
+    # then decode each line, as decoders are given text as in iterjlines
+    return [decoder(line.decode('utf-8')) for line in block.splitlines()
+            if line.strip()]
+
+
+def _readjlineblocks(f, blocks, stop, blocksize):
+    # runs in a background thread, putting blocks of whole lines on the
+    # queue, followed by None, or by an exception raised while reading
+    try:
+        rest = b''
+        while not stop.is_set():
+            chunk = f.read(blocksize)
+            if not chunk:
+                if rest.strip():
+                    _putblock(blocks, rest, stop)
+                break
+            i = chunk.rfind(b'\n')
+            if i < 0:
+                rest += chunk
+            else:
+                _putblock(blocks, rest + chunk[:i + 1], stop)
+                rest = chunk[i + 1:]
+        _putblock(blocks, None, stop)
+    except Exception as e:
+        _putblock(blocks, e, stop)
+
+
+def _putblock(blocks, item, stop):
+    while not stop.is_set():
+        try:
+            blocks.put(item, timeout=0.1)
+            return
+        except Full:
+            pass
+
+
+def iterjlinesparallel(f, header, missing, decoder, workers,
+                       blocksize=2**20):
+    decoded = _iterjlinesparallel(f, decoder, workers, blocksize)
+    try:
+        it = decoded
+        if header is None:
+            header = list()
+            peek, it = iterpeek(it, 1)
+            if hasattr(peek, 'keys'):
+                header += [k for k in peek.keys()]
+        yield tuple(header)
+
+        for json_obj in it:
+            yield tuple(json_obj[f] if f in json_obj else missing
+                        for f in header)
+    finally:
+        decoded.close()
+
+
+def _iterjlinesparallel(f, decoder, workers, blocksize):
+    from concurrent.futures import ProcessPoolExecutor
+    blocks = Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    reader = threading.Thread(target=_readjlineblocks,
+                              args=(f, blocks, stop, blocksize))
+    reader.daemon = True
+    reader.start()
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            done = False
+            try:
+                while True:
+                    # keep enough blocks in flight to occupy all workers
+                    while not done and len(pending) < workers * 2:
+                        block = blocks.get()
+                        if block is None:
+                            done = True
+                        elif isinstance(block, Exception):
+                            raise block
+                        else:
+                            pending.append(pool.submit(_decodejlines, block,
+                                                       decoder))
+                    if not pending:
+                        break
+                    for json_obj in pending.popleft().result():
+                        yield json_obj
+            finally:
+                # don't wait for blocks no longer needed
+                for future in pending:
+                    future.cancel()
+    finally:
+        stop.set()
+        reader.join()
+
+
+def iterjsonpath(f, path, decoder=None):
+    """Decode the values found at `path` in the JSON document read from the
+    text file `f`, one at a time."""
+    reader = _JsonStreamReader(f, decoder or json.JSONDecoder())
+    steps = path.split('.') if path else []
+    for o in reader.iterpath(steps):
+        yield o
+    reader.skipspace()
+    if reader.peek():
+        raise ValueError('extra data after JSON document at offset %s'
+                         % reader.offset())
+
+
+_jsonspace = re.compile(r'[ \t\n\r]*')
+_jsonstruct = re.compile(r'[\[\]{}"]')
+_jsonstring = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_jsonnumbertail = re.compile(r'[0-9.eE+-]*')
+
+
+class _JsonStreamReader(object):
+    # incremental reader over a buffer of text, filled from the file as
+    # needed; values are decoded via the decoder's raw_decode method
+
+    chunksize = 2**16
+
+    def __init__(self, f, decoder):
+        self.f = f
+        self.decoder = decoder
+        self.buf = ''
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+
+    def offset(self):
+        return self.consumed + self.pos
+
+    def fill(self, n=None):
+        # discard consumed text, then read at least as much again as is
+        # buffered, so that repeated attempts to decode a large value cost
+        # linear time overall
+        if self.pos:
+            self.consumed += self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(max(n or self.chunksize, len(self.buf)))
+        if chunk:
+            self.buf += chunk
+        else:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        while self.pos >= len(self.buf):
+            if not self.fill():
+                return ''
+        return self.buf[self.pos]
+
+    def skipspace(self):
+        while True:
+            self.pos = _jsonspace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return
+
+    def expect(self, ch):
+        self.skipspace()
+        if self.peek() != ch:
+            raise ValueError('expected %r at offset %s, found %r'
+                             % (ch, self.offset(), self.peek()))
+        self.pos += 1
+
+    def decode(self):
+        self.skipspace()
+        while True:
+            try:
+                o, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof or not self.fill():
+                    raise
+                continue
+            # a number running up to the end of the buffer may continue,
+            # including where decoding stopped short at a '.', 'e' or 'E'
+            # which is followed by the rest of the number in the next chunk
+            if _jsonnumbertail.match(self.buf, end).end() < len(self.buf) \
+                    or self.eof or not self.fill():
+                self.pos = end
+                return o
+
+    def skip(self):
+        # step over a value without decoding it
+        self.skipspace()
+        if self.peek() not in '[{':
+            self.decode()
+            return
+        depth = 0
+        while True:
+            m = _jsonstruct.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise ValueError('unexpected end of JSON document')
+                continue
+            ch = m.group()
+            if ch == '"':
+                s = _jsonstring.match(self.buf, m.start())
+                if s is None:
+                    self.pos = m.start()
+                    if not self.fill():
+                        raise ValueError('unterminated string in JSON '
+                                         'document')
+                    continue
+                self.pos = s.end()
+            else:
+                self.pos = m.end()
+                depth += 1 if ch in '[{' else -1
+                if depth == 0:
+                    return
+
+    def iterpath(self, steps):
+        if not steps:
+            yield self.decode()
+        elif steps[0] == 'item':
+            self.expect('[')
+            self.skipspace()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            while True:
+                for o in self.iterpath(steps[1:]):
+                    yield o
+                self.skipspace()
+                ch = self.peek()
+                self.pos += 1
+                if ch == ']':
+                    return
+                elif ch != ',':
+                    raise ValueError('expected \',\' or \']\' at offset %s,'
+                                     ' found %r' % (self.offset() - 1, ch))
+        else:
+            self.expect('{')
+            self.skipspace()
+            if self.peek() == '}':
+                self.pos += 1
+                return
+            while True:
+                key = self.decode()
+                self.expect(':')
+                if key == steps[0]:
+                    for o in self.iterpath(steps[1:]):
+                        yield o
+                else:
+                    self.skip()
+                self.skipspace()
+                ch = self.peek()
+                self.pos += 1
+                if ch == '}':
+                    return
+                elif ch != ',':
+                    raise ValueError('expected \',\' or \'}\' at offset %s,'
+                                     ' found %r' % (self.offset() - 1, ch))
+
+
 def iterdicts(dicts, header, sample, missing):
     it = iter(dicts)
 
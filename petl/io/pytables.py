@@ -102,6 +102,18 @@ class HDF5View(Table):
         return iterhdf5(self.source, self.where, self.name, self.condition,
                         self.condvars, self.start, self.stop, self.step)
 
+    def _nrows(self):
+        if self.condition is not None:
+            return None
+        return _counthdf5(self.source, self.where, self.name, self.start,
+                          self.stop, self.step)
+
+
+def _counthdf5(source, where, name, start, stop, step):
+    # count rows from the table metadata
+    with _get_hdf5_table(source, where, name) as h5tbl:
+        return len(range(*slice(start, stop, step).indices(h5tbl.nrows)))
+
 
 @contextmanager
 def _get_hdf5_table(source, where, name, mode='r'):
@@ -268,6 +280,10 @@ class HDF5SortedView(Table):
         return iterhdf5sorted(self.source, self.where, self.name, self.sortby,
                               self.checkCSI, self.start, self.stop, self.step)
 
+    def _nrows(self):
+        return _counthdf5(self.source, self.where, self.name, self.start,
+                          self.stop, self.step)
+
 
 def iterhdf5sorted(source, where, name, sortby, checkCSI, start, stop, step):
 
@@ -9,12 +9,15 @@ import sys
 import bz2
 import zipfile
 from contextlib import contextmanager
+from functools import partial
 import subprocess
 import logging
 
 
 from petl.errors import ArgumentError
 from petl.compat import urlopen, StringIO, BytesIO, string_types, PY2
+from petl.io import bgzf
+from petl.io.base import BlockWriter
 
 
 logger = logging.getLogger(__name__)
@@ -55,6 +58,244 @@ class GzipSource(object):
             source.close()
 
 
+def _binarymode(mode, kind):
+    # only binary modes are supported, as for gzip.open(), 'r', 'w' and 'a'
+    # are taken to be binary
+    m = mode.replace('b', '')
+    if m not in ('r', 'w', 'a'):
+        raise ArgumentError('unsupported mode for %s file: %r' % (kind, mode))
+    return m
+
+
+def _openbinary(filename, mode, remote=False):
+    # open a local file or URL in binary mode, or wrap a file object (e.g.,
+    # passed on by CompressedSource) so that it is left open
+    if remote:
+        if mode != 'r':
+            raise ArgumentError('source is read-only')
+        return urlopen(filename)
+    if isinstance(filename, string_types):
+        return io.open(filename, mode + 'b')
+    return Uncloseable(filename)
+
+
+class BGZFSource(object):
+    """Source for files in BGZF format, i.e., gzip files made up of
+    independently compressed blocks, as written by bgzip. Blocks are
+    compressed and decompressed in a pool of `workers` threads (by default,
+    the number of CPUs), and the output can be read by any gzip reader.
+
+    If `index` is True, when writing to a file an index of the offsets of
+    the blocks is written beside it, with the extension ``.gzi`` as used by
+    bgzip; any existing index, which would no longer be up to date, is
+    otherwise removed. Where the file is local, the data can be read from
+    any offset without decompressing from the start, using the index if
+    there is one, or else by first scanning the block headers. This
+    allows, e.g., reading a delimited file in parallel via the `workers`
+    argument to :func:`petl.io.csv.fromcsv`, or using an index built by
+    :func:`petl.io.csv.csvindex`. Files which are not in BGZF format are
+    read as ordinary gzip files. Requires Python 3.
+
+    File names ending with ``.bgz`` are handled by this class with the
+    default arguments, i.e., without writing an index. To write one, pass
+    an instance as the `source`, e.g.::
+
+        >>> import petl as etl
+        >>> from petl.io.sources import BGZFSource
+        >>> table = [['foo', 'bar'], ['a', 1], ['b', 2]]
+        >>> etl.tocsv(table, BGZFSource('example.csv.bgz', index=True))
+        >>> etl.fromcsv('example.csv.bgz')
+        +-----+-----+
+        | foo | bar |
+        +=====+=====+
+        | 'a' | '1' |
+        +-----+-----+
+        | 'b' | '2' |
+        +-----+-----+
+
+    """
+
+    def __init__(self, filename, workers=None, compresslevel=6, index=False):
+        self.filename = filename
+        self.workers = workers
+        self.compresslevel = compresslevel
+        self.index = index
+
+    # block offsets to read with, e.g., just those needed by a task reading
+    # part of the file, see petl.io.csv_py3.iterparallelcsv
+    _offsets = None
+
+    def _local(self):
+        return isinstance(self.filename, string_types)
+
+    def _blockoffsets(self):
+        # return the offsets of all blocks, from the index if there is one,
+        # otherwise by scanning the file
+        offsets = bgzf.loadindex(self.filename)
+        if offsets is None:
+            with io.open(self.filename, 'rb') as f:
+                offsets = bgzf.scanblocks(f)
+        return offsets
+
+    def seekable(self):
+        """Return whether the data can be read from any offset without
+        decompressing from the start."""
+        if not self._local():
+            return False
+        try:
+            with io.open(self.filename, 'rb') as f:
+                return bgzf.isbgzf(f.read(18))
+        except (IOError, OSError):
+            return False
+
+    @contextmanager
+    def open(self, mode='r'):
+        mode = _binarymode(mode, 'BGZF')
+        filehandle = _openbinary(self.filename, mode)
+        try:
+            if mode == 'r':
+                with self._openread(filehandle) as source:
+                    yield source
+            else:
+                with self._openwrite(filehandle, mode) as source:
+                    yield source
+        finally:
+            filehandle.close()
+
+    @contextmanager
+    def _openread(self, filehandle):
+        if not hasattr(filehandle, 'peek'):
+            filehandle = io.BufferedReader(filehandle)
+        if not bgzf.isbgzf(filehandle.peek(18)[:18]):
+            source = gzip.GzipFile(fileobj=filehandle, mode='rb')
+        else:
+            offsets = self._offsets
+            if offsets is None and self._local():
+                offsets = bgzf.loadindex(self.filename)
+            source = io.BufferedReader(bgzf.BGZFReader(filehandle, offsets,
+                                                       self.workers))
+        try:
+            yield source
+        finally:
+            source.close()
+
+    @contextmanager
+    def _openwrite(self, filehandle, mode):
+        offsets = None
+        index = self.index and self._local()
+        if mode == 'a' and index:
+            # continue the index of the blocks already written
+            offsets = bgzf.loadindex(self.filename)
+            if offsets is None:
+                with io.open(self.filename, 'rb') as f:
+                    try:
+                        offsets = bgzf.scanblocks(f)
+                    except IOError:
+                        # not a BGZF file, so the index would be no use
+                        index = False
+        source = bgzf.BGZFWriter(filehandle, self.workers, self.compresslevel,
+                                 offsets)
+        try:
+            yield source
+        finally:
+            source.close()
+        if index:
+            bgzf.writeindex(self.filename, source.offsets)
+        elif self._local() and os.path.exists(bgzf.indexpath(self.filename)):
+            os.remove(bgzf.indexpath(self.filename))
+
+
+class ZstdSource(object):
+    """Source for files compressed in the Zstandard format, via the
+    `zstandard` package. Data are compressed at level `compresslevel` by
+    `workers` threads (by default, the number of CPUs), using the
+    multi-threaded mode of the zstd library. Appending to a file adds a
+    frame, and all frames are read back as one stream. Other keyword
+    arguments are passed to :class:`zstandard.ZstdCompressor`.
+
+    """
+
+    def __init__(self, filename, compresslevel=3, workers=None, remote=False,
+                 **kwargs):
+        self.filename = filename
+        self.compresslevel = compresslevel
+        self.workers = workers
+        self.remote = remote
+        self.kwargs = kwargs
+
+    @contextmanager
+    def open(self, mode='r'):
+        import zstandard
+        mode = _binarymode(mode, 'Zstandard')
+        filehandle = _openbinary(self.filename, mode, self.remote)
+        try:
+            if mode == 'r':
+                # N.B., buffered for readline(), which the zstandard reader
+                # doesn't support
+                dctx = zstandard.ZstdDecompressor()
+                source = io.BufferedReader(dctx.stream_reader(
+                    filehandle, read_across_frames=True, closefd=False))
+            else:
+                # N.B., for zstd, a negative number of threads means one per
+                # CPU, and 0 means compressing in the calling thread
+                if self.workers is None:
+                    threads = -1
+                elif self.workers < 2:
+                    threads = 0
+                else:
+                    threads = self.workers
+                cctx = zstandard.ZstdCompressor(level=self.compresslevel,
+                                                threads=threads, **self.kwargs)
+                source = cctx.stream_writer(filehandle, closefd=False)
+            try:
+                yield source
+            finally:
+                source.close()
+        finally:
+            filehandle.close()
+
+
+class LZ4Source(object):
+    """Source for files compressed in the LZ4 frame format, via the `lz4`
+    package. When writing, data are split into blocks of `blocksize` bytes
+    which are compressed at level `compresslevel` as separate frames by
+    `workers` threads (by default, the number of CPUs); any LZ4 reader reads
+    the frames back as one stream, as it does after appending to a file.
+    Other keyword arguments are passed to :func:`lz4.frame.compress`.
+
+    """
+
+    def __init__(self, filename, compresslevel=0, workers=None,
+                 blocksize=2**20, remote=False, **kwargs):
+        self.filename = filename
+        self.compresslevel = compresslevel
+        self.workers = workers
+        self.blocksize = blocksize
+        self.remote = remote
+        self.kwargs = kwargs
+
+    @contextmanager
+    def open(self, mode='r'):
+        import lz4.frame
+        mode = _binarymode(mode, 'LZ4')
+        filehandle = _openbinary(self.filename, mode, self.remote)
+        try:
+            if mode == 'r':
+                source = lz4.frame.LZ4FrameFile(filehandle, mode='rb')
+            else:
+                compress = partial(lz4.frame.compress,
+                                   compression_level=self.compresslevel,
+                                   **self.kwargs)
+                source = BlockWriter(filehandle, compress, self.blocksize,
+                                     self.workers)
+            try:
+                yield source
+            finally:
+                source.close()
+        finally:
+            filehandle.close()
+
+
 class BZ2Source(object):
 
     def __init__(self, filename, remote=False, **kwargs):
@@ -409,8 +650,13 @@ def get_writer(protocol):
 # Setup default sources
 
 register_codec('.gz', GzipSource)
-register_codec('.bgz', GzipSource)
+if PY2:
+    register_codec('.bgz', GzipSource)
+else:
+    register_codec('.bgz', BGZFSource)
 register_codec('.bz2', BZ2Source)
+register_codec('.zst', ZstdSource)
+register_codec('.lz4', LZ4Source)
 
 register_reader('ftp', URLSource)
 register_reader('http', URLSource)
@@ -4,13 +4,15 @@ from __future__ import absolute_import, print_function, division
 
 # standard library dependencies
 import io
+import os
 from petl.compat import next, PY2, text_type
 
 
 # internal dependencies
 from petl.util.base import Table, asdict
-from petl.io.base import getcodec
-from petl.io.sources import read_source_from_arg, write_source_from_arg
+from petl.io.base import getcodec, iterbackwards, linestart
+from petl.io.sources import read_source_from_arg, write_source_from_arg, \
+    FileSource
 
 
 def fromtext(source=None, encoding=None, errors='strict', strip=None,
@@ -90,16 +92,65 @@ class TextView(Table):
             try:
                 if self.header is not None:
                     yield tuple(self.header)
-                if self.strip is False:
-                    for line in f:
-                        yield (line,)
-                else:
-                    for line in f:
-                        yield (line.strip(self.strip),)
+                for line in f:
+                    yield self._row(line)
             finally:
                 if not PY2:
                     f.detach()
 
+    def _row(self, line):
+        if self.strip is False:
+            return (line,)
+        return (line.strip(self.strip),)
+
+    def _iterfrom(self, start):
+        """Return an iterator over the header and the last -`start` rows,
+        read from the end of the file, or None if the source doesn't
+        support this."""
+        if PY2 or start >= 0 or type(self.source) is not FileSource \
+                or self.source.kwargs:
+            return None
+        # line terminators must be recognisable as single bytes
+        name = getcodec(self.encoding).name
+        if any(c.encode(name) != c.encode('ascii') for c in '\r\n'):
+            return None
+        return self._itertail(-start)
+
+    def _itertail(self, n):
+        if self.header is not None:
+            yield tuple(self.header)
+        first = 0 if self.header is not None else 1
+        with io.open(self.source.filename, 'rb') as buf:
+            size = os.fstat(buf.fileno()).st_size
+            for offset, data in iterbackwards(buf, size):
+                if offset == 0:
+                    lines = self._decodelines(data)
+                    for line in lines[:first]:
+                        yield self._row(line)
+                    lines = lines[first:]
+                    break
+                i = linestart(data)
+                if i is not None:
+                    lines = self._decodelines(data[i:])
+                    if len(lines) >= n:
+                        if first:
+                            buf.seek(0)
+                            f = self._wrap(buf)
+                            try:
+                                yield self._row(next(f))
+                            finally:
+                                f.detach()
+                        break
+        for line in lines[-n:]:
+            yield self._row(line)
+
+    def _wrap(self, buf):
+        return io.TextIOWrapper(buf, encoding=self.encoding,
+                                errors=self.errors, newline='')
+
+    def _decodelines(self, data):
+        return list(self._wrap(io.BytesIO(data)))
+
 
 def totext(table, source=None, encoding=None, errors='strict', template=None,
            prologue=None, epilogue=None):
@@ -11,10 +11,12 @@ except ImportError:
 
 from operator import attrgetter
 import itertools
+import re
 from petl.compat import string_types, text_type
 
 
 # internal dependencies
+from petl.errors import ArgumentError
 from petl.util.base import Table, fieldnames, iterpeek
 from petl.io.sources import read_source_from_arg
 from petl.io.text import totext
@@ -124,8 +126,28 @@ def fromxml(source, *args, **kwargs):
     If `lxml <http://lxml.de/>`_ is installed, full XPath expressions can be
     used.
 
-    Note that the implementation is currently **not** streaming, i.e.,
-    the whole document is loaded into memory.
+    By default the whole document is loaded into memory. If `stream` is
+    True, the document is parsed incrementally via
+    :func:`xml.etree.ElementTree.iterparse` instead, and each row element is
+    discarded once its values have been extracted, so memory use is bounded
+    by the size of a row element. In this mode the row path must be a
+    simple path of element names, ``*``, ``.`` and ``//`` steps (without
+    predicates), and the `parser` argument is not used; value paths are
+    unrestricted. E.g.::
+
+        >>> table5 = etl.fromxml('example.file3.xml', './/row',
+        ...                      {'foo': 'foo', 'bar': ('baz/bar', 'v')},
+        ...                      stream=True)
+        >>> table5
+        +------------+-----+
+        | bar        | foo |
+        +============+=====+
+        | ('1', '3') | 'a' |
+        +------------+-----+
+        | '2'        | 'b' |
+        +------------+-----+
+        | '2'        | 'c' |
+        +------------+-----+
 
     If multiple elements match a given field, all values are reported as a
     tuple.
@@ -170,61 +192,188 @@ class XmlView(Table):
             assert False, 'bad parameters'
         self.missing = kwargs.get('missing', None)
         self.user_parser = kwargs.get('parser', None)
+        self.stream = kwargs.get('stream', False)
+        if self.stream:
+            # fail early if the row path can't be matched incrementally
+            _compile_row_path(self.rmatch)
 
     def __iter__(self):
+        with self.source.open('rb') as xmlf:
+            if self.stream:
+                rowelms = _iterparse_rows(xmlf, self.rmatch)
+            else:
+                parser2 = _create_xml_parser(self.user_parser)
+                tree = etree.parse(xmlf, parser=parser2)
+                if not hasattr(tree, 'iterfind'):
+                    # Python 2.6 compatibility
+                    tree.iterfind = tree.findall
+                rowelms = tree.iterfind(self.rmatch)
+            for row in self._iterrows(rowelms):
+                yield row
+
+    def _iterrows(self, rowelms):
         vmatch = self.vmatch
         vdict = self.vdict
 
-        with self.source.open('rb') as xmlf:
-            parser2 = _create_xml_parser(self.user_parser)
-            tree = etree.parse(xmlf, parser=parser2)
-            if not hasattr(tree, 'iterfind'):
-                # Python 2.6 compatibility
-                tree.iterfind = tree.findall
-
-            if vmatch is not None:
-                # simple case, all value paths are the same
-                for rowelm in tree.iterfind(self.rmatch):
-                    if self.attr is None:
-                        getv = attrgetter('text')
-                    else:
-                        getv = lambda e: e.get(self.attr)
-                    if isinstance(vmatch, string_types):
-                        # match only one path
-                        velms = rowelm.findall(vmatch)
-                    else:
-                        # match multiple paths
-                        velms = itertools.chain(*[rowelm.findall(enm)
-                                                  for enm in vmatch])
-                    yield tuple(getv(velm)
-                                for velm in velms)
+        if vmatch is not None:
+            # simple case, all value paths are the same
+            for rowelm in rowelms:
+                if self.attr is None:
+                    getv = attrgetter('text')
+                else:
+                    getv = lambda e: e.get(self.attr)
+                if isinstance(vmatch, string_types):
+                    # match only one path
+                    velms = rowelm.findall(vmatch)
+                else:
+                    # match multiple paths
+                    velms = itertools.chain(*[rowelm.findall(enm)
+                                              for enm in vmatch])
+                yield tuple(getv(velm)
+                            for velm in velms)
 
-            else:
-                # difficult case, deal with different paths for each field
-
-                # determine output header
-                flds = tuple(sorted(map(text_type, vdict.keys())))
-                yield flds
-
-                # setup value getters
-                vmatches = dict()
-                vgetters = dict()
-                for f in flds:
-                    vmatch = self.vdict[f]
-                    if isinstance(vmatch, string_types):
-                        # match element path
-                        vmatches[f] = vmatch
-                        vgetters[f] = element_text_getter(self.missing)
-                    else:
-                        # match element path and attribute name
-                        vmatches[f] = vmatch[0]
-                        attr = vmatch[1]
-                        vgetters[f] = attribute_text_getter(attr, self.missing)
-
-                # determine data rows
-                for rowelm in tree.iterfind(self.rmatch):
-                    yield tuple(vgetters[f](rowelm.findall(vmatches[f]))
-                                for f in flds)
+        else:
+            # difficult case, deal with different paths for each field
+
+            # determine output header
+            flds = tuple(sorted(map(text_type, vdict.keys())))
+            yield flds
+
+            # setup value getters
+            vmatches = dict()
+            vgetters = dict()
+            for f in flds:
+                vmatch = self.vdict[f]
+                if isinstance(vmatch, string_types):
+                    # match element path
+                    vmatches[f] = vmatch
+                    vgetters[f] = element_text_getter(self.missing)
+                else:
+                    # match element path and attribute name
+                    vmatches[f] = vmatch[0]
+                    attr = vmatch[1]
+                    vgetters[f] = attribute_text_getter(attr, self.missing)
+
+            # determine data rows
+            extract = _compile_extractor([vmatches[f] for f in flds],
+                                         [vgetters[f] for f in flds])
+            for rowelm in rowelms:
+                yield extract(rowelm)
+
+
+def _compile_extractor(paths, getters):
+    # build a function extracting a row of values from a row element in one
+    # walk over its descendants, routing each element matching a simple
+    # path of child tags to the output slot(s) for that path; any other
+    # paths are matched via findall
+    trie = dict()
+    others = list()
+    for i, path in enumerate(paths):
+        steps = re.split(r'/(?![^{]*})', path)
+        if steps[0] == '.':
+            steps = steps[1:]
+        if steps and all(_simple_step(step) for step in steps):
+            node = [None, trie]
+            for step in steps:
+                node = node[1].setdefault(step, [list(), dict()])
+            node[0].append(i)
+        else:
+            others.append((i, path))
+    n = len(paths)
+
+    def extract(rowelm):
+        found = [[] for _ in range(n)]
+        if trie:
+            _route_children(rowelm, trie, found)
+        for i, path in others:
+            found[i] = rowelm.findall(path)
+        return tuple(getv(v) for getv, v in zip(getters, found))
+
+    return extract
+
+
+def _simple_step(step):
+    # a plain, possibly namespace qualified, tag name
+    if step.startswith('{'):
+        if step.startswith('{*}'):
+            return False
+        step = step.split('}', 1)[-1]
+    return (step not in ('', '.', '..') and
+            not any(c in step for c in '*[]()@:|'))
+
+
+def _route_children(elm, trie, found):
+    for child in elm:
+        node = trie.get(child.tag)
+        if node is not None:
+            for i in node[0]:
+                found[i].append(child)
+            if node[1]:
+                _route_children(child, node[1], found)
+
+
+def _compile_row_path(path):
+    # translate a simple element path into a regex matching the tags of an
+    # element and its ancestors below the root, each preceded by a NUL
+    if path.startswith('/'):
+        path = '.' + path
+    pattern = ''
+    # N.B., don't split on slashes within namespace URIs
+    for step in re.split(r'/(?![^{]*})', path):
+        if step == '.':
+            continue
+        elif step == '':
+            pattern += '(?:\x00[^\x00]+)*'
+        elif step == '*':
+            pattern += '\x00[^\x00]+'
+        elif step.startswith('{*}'):
+            pattern += '\x00(?:{[^}]*})?' + re.escape(step[3:])
+        elif '[' in step or step == '..' or '(' in step:
+            raise ArgumentError('row path %r not supported when streaming, '
+                                'found step %r' % (path, step))
+        else:
+            pattern += '\x00' + re.escape(step)
+    return re.compile(pattern + '$').match
+
+
+def _iterparse(xmlf, events):
+    try:
+        # lxml, don't resolve entities by default, see _create_xml_parser
+        return etree.iterparse(xmlf, events=events, resolve_entities=False)
+    except TypeError:
+        return etree.iterparse(xmlf, events=events)
+
+
+def _iterparse_rows(xmlf, rmatch):
+    match = _compile_row_path(rmatch)
+    # open elements, with their tag paths and whether they are rows
+    stack = list()
+    # rows within the outermost open row, in document order
+    pending = list()
+    inrow = 0
+    for event, elm in _iterparse(xmlf, ('start', 'end')):
+        if event == 'start':
+            path = stack[-1][1] + '\x00' + elm.tag if stack else ''
+            isrow = match(path) is not None
+            if isrow:
+                pending.append(elm)
+                inrow += 1
+            stack.append((elm, path, isrow))
+        else:
+            _, path, isrow = stack.pop()
+            if isrow:
+                inrow -= 1
+            if inrow:
+                # part of an enclosing row, keep until that is complete
+                continue
+            if isrow:
+                for rowelm in pending:
+                    yield rowelm
+                del pending[:]
+            if stack:
+                # discard the element, no longer needed
+                elm.clear()
+                stack[-1][0].remove(elm)
 
 
 def _create_xml_parser(user_parser):
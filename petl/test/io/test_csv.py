@@ -3,9 +3,12 @@ from __future__ import absolute_import, print_function, division
 
 
 from tempfile import NamedTemporaryFile
+import csv
 import gzip
 import os
 import logging
+
+import pytest
 from petl.compat import PY2
 
 
@@ -308,4 +311,405 @@ def test_fromcsv_header():
     actual = fromcsv(f.name, encoding='ascii', header=header)
     debug(actual)
     ieq(expect, actual)
-    ieq(expect, actual)  # verify can iterate twice
\ No newline at end of file
+    ieq(expect, actual)  # verify can iterate twice
+
+
+def test_fromcsv_header_probe():
+    from petl import header, cut
+
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.write(b'foo,bar\na,1\nb,2\n')
+    f.close()
+
+    tbl = fromcsv(f.name, encoding='ascii')
+    eq_(('foo', 'bar'), header(tbl))
+    eq_(('foo', 'bar'), header(tbl))
+
+    # the cached header is discarded when the file changes
+    with open(f.name, 'wb') as o:
+        o.write(b'foo,bar,baz\na,1,True\n')
+    eq_(('foo', 'bar', 'baz'), header(tbl))
+    eq_(('baz', 'foo'), header(cut(tbl, 'baz', 'foo')))
+
+    tbl = fromcsv(f.name, encoding='ascii', header=['x', 'y', 'z'])
+    eq_(('x', 'y', 'z'), header(tbl))
+
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.close()
+    with pytest.raises(StopIteration):
+        header(fromcsv(f.name))
+
+
+@pytest.mark.skipif(PY2, reason='record scanning requires Python 3')
+def test_fromcsv_nrows():
+    from petl import nrows, data
+    cases = [
+        (b'', {}),
+        (b'foo,bar\n', {}),
+        (b'foo,bar\na,1\n\nb,2', {}),
+        (b'foo,bar\r\na,"x\r\ny"\r\nb,"""q""\n"\r\n', {}),
+        (b'foo,bar\ra,1\rb,2\r', {}),
+        (b'foo,bar\na,x"y\nb,"z"w\n"c', {}),
+        (b'foo,bar\na, "x\ny"\n', {'skipinitialspace': True}),
+        (b'foo\tbar\na\t"1\n2"\n', {'delimiter': '\t'}),
+        (b'foo,bar\na,"1\n2"\n', {'quoting': csv.QUOTE_NONE}),
+        (b'foo,bar\na,"x""\ny"\n', {'doublequote': False}),
+        (b'foo,bar\na,x\\\ny\n', {'escapechar': '\\'}),
+        (b'foo,bar\ra,"1\r2"\r', {}),
+    ]
+    for content, csvargs in cases:
+        f = NamedTemporaryFile(mode='wb', delete=False)
+        f.write(content)
+        f.close()
+        tbl = fromcsv(f.name, encoding='ascii', **csvargs)
+        expect = len(list(data(tbl)))
+        eq_(expect, nrows(tbl))
+        tbl = fromcsv(f.name, encoding='ascii', header=['x', 'y'], **csvargs)
+        eq_(expect + (1 if content else 0), nrows(tbl))
+
+
+def _check_fromcsv_workers(data, rangesizes=(1, 5, 16, 2**24), **kwargs):
+    import petl.io.csv_py3 as csv_py3
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.write(data)
+    f.close()
+
+    expect = fromcsv(f.name, **kwargs)
+    rangesize = csv_py3._rangesize
+    try:
+        for csv_py3._rangesize in rangesizes:
+            actual = fromcsv(f.name, workers=2, **kwargs)
+            ieq(expect, actual)
+    finally:
+        csv_py3._rangesize = rangesize
+
+
+@pytest.mark.skipif(PY2, reason='parallel parsing requires Python 3')
+def test_fromcsv_workers():
+    rows = [b'foo,bar'] + [('%s,"x%s"' % (i, i * 7)).encode('ascii')
+                           for i in range(100)]
+    _check_fromcsv_workers(b'\n'.join(rows) + b'\n')
+    _check_fromcsv_workers(b'\r\n'.join(rows))
+    _check_fromcsv_workers(u'foo,bar\né,"ü, ß"\nz,1'.encode('utf-8'),
+                           encoding='utf-8')
+    _check_fromcsv_workers(b'foo\tbar\na\t1\nb\t2\n', dialect='excel-tab')
+
+
+@pytest.mark.skipif(PY2, reason='parallel parsing requires Python 3')
+def test_fromcsv_workers_quoted_newlines():
+    data = (b'foo,bar\n'
+            b'a,"multi\nline\n, value"\n'
+            b'b,"say ""hi""\nthere"\n'
+            b'c,plain\n'
+            b'"d\n\n",x\n')
+    _check_fromcsv_workers(data)
+    # stray quotes in unquoted fields upset the quote parity
+    data = (b'foo,bar\n'
+            b'a,5" screen\n'
+            b'b,"x\ny"\n'
+            b'c,1\n'
+            b'd,"p\nq"\n'
+            b'e,2\n')
+    _check_fromcsv_workers(data)
+
+
+@pytest.mark.skipif(PY2, reason='csvindex requires Python 3')
+def test_csvindex():
+    from petl.io.csv import csvindex
+    from petl.transform.basics import rowslice, tail
+
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.write(b'foo,bar\r\n')
+    for i in range(100):
+        if i % 7 == 0:
+            f.write(('x%s,"multi\nline %s"\r\n' % (i, i)).encode('ascii'))
+        else:
+            f.write(('x%s,%s\r\n' % (i, i)).encode('ascii'))
+    f.close()
+
+    sliceargs = [(5,), (10, 20), (10, 20, 3), (95, 200), (99, 100),
+                 (100, 110), (30, 10)]
+    tails = [1, 5, 99, 100, 150]
+
+    def materialize(table):
+        return ([list(rowslice(table, *args)) for args in sliceargs] +
+                [list(tail(table, n)) for n in tails])
+
+    # expectations without an index
+    expect = [materialize(fromcsv(f.name, header=header))
+              for header in (None, ['a', 'b'])]
+
+    path = csvindex(f.name, step=8)
+    assert os.path.exists(path)
+    assert fromcsv(f.name)._iterfrom(0) is not None
+    actual = [materialize(fromcsv(f.name, header=header))
+              for header in (None, ['a', 'b'])]
+    eq_(expect, actual)
+    # a negative stop is rejected, as without an index
+    with pytest.raises(ValueError):
+        list(rowslice(fromcsv(f.name), 2, -1))
+
+    # index is not used with different options, or once the file changes
+    assert fromcsv(f.name, delimiter=';')._iterfrom(0) is None
+    with open(f.name, 'ab') as o:
+        o.write(b'x100,100\r\n')
+    assert fromcsv(f.name)._iterfrom(0) is None
+    ieq(tail(fromcsv(f.name), 1), [('foo', 'bar'), ('x100', '100')])
+    os.remove(path)
+
+
+@pytest.mark.skipif(PY2, reason='parallel parsing requires Python 3')
+def test_fromcsv_workers_index():
+    import petl.io.csv_py3 as csv_py3
+    from petl.io.csv import csvindex
+    rows = [b'foo,bar'] + [('%s,"x\n%s"' % (i, i * 7)).encode('ascii')
+                           for i in range(100)]
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.write(b'\n'.join(rows) + b'\n')
+    f.close()
+    path = csvindex(f.name, step=3)
+    expect = fromcsv(f.name)
+    rangesize = csv_py3._rangesize
+    try:
+        for csv_py3._rangesize in 1, 50, 2**24:
+            ieq(expect, fromcsv(f.name, workers=2))
+    finally:
+        csv_py3._rangesize = rangesize
+    os.remove(path)
+
+
+@pytest.mark.skipif(PY2, reason='BGZF requires Python 3')
+def test_fromcsv_bgzf():
+    import petl.io.csv_py3 as csv_py3
+    from petl.io import bgzf
+    from petl.io.csv import csvindex
+    from petl.transform.basics import rowslice, tail
+
+    tbl = [('foo', 'bar')] + [('x%s' % i, 'multi\nline %s' % i if i % 7 == 0
+                               else str(i)) for i in range(100)]
+    fn = NamedTemporaryFile().name + '.bgz'
+    blockdata = bgzf._blockdata
+    rangesize = csv_py3._rangesize
+    try:
+        bgzf._blockdata = 64
+        tocsv(tbl, fn)
+        ieq(tbl, fromcsv(fn))
+        ieq(tail(tbl, 5), tail(fromcsv(fn), 5))
+        for csv_py3._rangesize in 1, 50, 2**24:
+            ieq(tbl, fromcsv(fn, workers=2))
+        path = csvindex(fn, step=8)
+        assert fromcsv(fn)._iterfrom(0) is not None
+        ieq(rowslice(tbl, 40, 50), rowslice(fromcsv(fn), 40, 50))
+        ieq(tail(tbl, 15), tail(fromcsv(fn), 15))
+        for csv_py3._rangesize in 1, 50:
+            ieq(tbl, fromcsv(fn, workers=2))
+        os.remove(path)
+    finally:
+        bgzf._blockdata = blockdata
+        csv_py3._rangesize = rangesize
+
+
+@pytest.mark.skipif(PY2, reason='BGZF requires Python 3')
+def test_fromcsv_bgzf_workers_scan():
+    import petl.io.csv_py3 as csv_py3
+    from petl.io import bgzf
+    from petl.io.sources import BGZFSource
+
+    tbl = [('foo', 'bar')] + [('x%s' % i, str(i)) for i in range(500)]
+    fn = NamedTemporaryFile().name + '.bgz'
+    blockdata = bgzf._blockdata
+    rangesize = csv_py3._rangesize
+    scanblocks = bgzf.scanblocks
+    # scans are logged to a file, so as to count those in worker processes
+    log = NamedTemporaryFile(delete=False)
+    log.close()
+
+    def countscans(f):
+        with open(log.name, 'ab') as o:
+            o.write(b'.')
+        return scanblocks(f)
+
+    def scans():
+        with open(log.name, 'rb') as f:
+            return len(f.read())
+
+    try:
+        bgzf._blockdata = 64
+        tocsv(tbl, fn)
+        bgzf.scanblocks = countscans
+        csv_py3._rangesize = 100
+        # without an index, blocks are scanned just once
+        ieq(tbl, fromcsv(fn, workers=2))
+        eq_(1, scans())
+        # each task is given only the blocks around its range
+        blocks = BGZFSource(fn)._blockoffsets()
+        ustarts = [u for _, u in blocks]
+        task = csv_py3._tasksource(BGZFSource(fn), blocks, ustarts, 300, 400)
+        assert 3 <= len(task._offsets) < len(blocks) // 10
+        eq_(blocks[-1], task._offsets[-1])
+        with task.open('rb') as f:
+            f.seek(300)
+            actual = f.read()
+        eq_(2, scans())
+        with gzip.open(fn, 'rb') as f:
+            eq_(f.read()[300:], actual)
+    finally:
+        bgzf.scanblocks = scanblocks
+        bgzf._blockdata = blockdata
+        csv_py3._rangesize = rangesize
+        os.remove(log.name)
+
+
+@pytest.mark.skipif(PY2, reason='reading backwards requires Python 3')
+def test_fromcsv_tail():
+    import petl.io.base as iobase
+    from petl import tail, wrap
+    cases = [
+        (b'foo,bar\na,1\nb,2\nc,3\n', {}),
+        (b'foo,bar\r\na,"x\r\ny"\r\nb,"""q"",\n"\r\nc,3', {}),
+        (b'foo,bar\ra,"1\r2"\rb,2\r', {}),
+        (b'foo,bar\na,"x\n""y\n"\nb,"\nz"\nc,"3"\n', {}),
+        (b'foo,bar\na, "x\ny"\nb,2\n', {'skipinitialspace': True}),
+        (b'foo\tbar\na\t"1\n2"\nb\t3\n', {'delimiter': '\t'}),
+        (b'foo,bar\na,"1\n2"\nb,3\n', {'quoting': csv.QUOTE_NONE}),
+        (b'foo,bar\n', {}),
+        (b'', {}),
+    ]
+    blocksize = iobase._tailblocksize
+    try:
+        for content, csvargs in cases:
+            f = NamedTemporaryFile(mode='wb', delete=False)
+            f.write(content)
+            f.close()
+            for hdr in None, ['x', 'y']:
+                if not content and hdr is None:
+                    continue
+                tbl = fromcsv(f.name, encoding='ascii', header=hdr, **csvargs)
+                expect = wrap(list(tbl))
+                for iobase._tailblocksize in 1, 3, 2**16:
+                    for n in 1, 2, 10:
+                        ieq(tail(expect, n), tail(tbl, n))
+    finally:
+        iobase._tailblocksize = blocksize
+
+
+def test_fromcsv_usecols():
+    from petl import cut, cutout, tail, header
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.write(b'foo,bar,baz\na,1,x\nb,2\nc,3,z\n')
+    f.close()
+
+    expect = (('baz', 'foo'),
+              ('x', 'a'),
+              (None, 'b'),
+              ('z', 'c'))
+    actual = fromcsv(f.name, encoding='ascii', usecols=['baz', 'foo'])
+    ieq(expect, actual)
+    ieq(expect, actual)  # verify can iterate twice
+    eq_(expect[0], header(actual))
+    ieq((expect[0], expect[-1]), tail(actual, 1))
+    ieq(expect, cut(fromcsv(f.name, encoding='ascii'), 2, 0))
+
+    expect = (('bar',), ('1',), ('2',), ('3',))
+    ieq(expect, fromcsv(f.name, encoding='ascii', usecols='bar'))
+    ieq(expect, cutout(fromcsv(f.name, encoding='ascii'), 'foo', 'baz'))
+    ieq(expect, cut(fromcsv(f.name, encoding='ascii', usecols=(1, 2)), 0))
+    ieq((('x',), ('foo',), ('a',)),
+        cut(fromcsv(f.name, encoding='ascii', usecols=['z', 'x'],
+                    header=['x', 'y', 'z']), 'x').head(2))
+
+
+def test_fromcsv_types():
+    import datetime
+    from petl import convert, cut, tail, nrows
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.write(b'foo,bar,baz\na,1,2.5\nb,x\nc,3,\nd,4,1e3\n')
+    f.close()
+
+    types = {'bar': int, 'baz': float}
+    expect = convert(fromcsv(f.name, encoding='ascii'), types)
+    actual = fromcsv(f.name, encoding='ascii', types=types)
+    ieq(expect, actual)
+    ieq(expect, actual)  # verify can iterate twice
+    ieq(tail(expect, 2), tail(actual, 2))
+    ieq(cut(expect, 'baz'), cut(actual, 'baz'))
+    ieq(convert(fromcsv(f.name, encoding='ascii'), 'bar', float),
+        fromcsv(f.name, encoding='ascii', types={'bar': float}))
+    ieq(convert(fromcsv(f.name, encoding='ascii'), types, errorvalue='?'),
+        fromcsv(f.name, encoding='ascii', types=types, errorvalue='?'))
+    actual = fromcsv(f.name, encoding='ascii', types=types,
+                     failonerror='inline')
+    rows = list(actual)
+    assert isinstance(rows[2][1], ValueError)
+    assert isinstance(rows[3][2], ValueError)
+    eq_((u'd', 4, 1000.0), rows[4])
+    actual = fromcsv(f.name, encoding='ascii', types=types, failonerror=True)
+    eq_(None, actual._nrows())
+    with pytest.raises(ValueError):
+        nrows(actual)
+
+    # all fields with the same converter
+    ieq(convert(fromcsv(f.name, encoding='ascii', usecols=['bar', 'baz']),
+                ('bar', 'baz'), float),
+        fromcsv(f.name, encoding='ascii', usecols=['bar', 'baz'],
+                types={'bar': float, 'baz': float}))
+
+    f = NamedTemporaryFile(mode='wb', delete=False)
+    f.write(b'foo,bar,baz,quux,spam\n'
+            b'1,2.5,2020-01-02,true,x\n'
+            b',3,2020-01-03,false,1\n')
+    f.close()
+    expect = (('foo', 'bar', 'baz', 'quux', 'spam'),
+              (1, 2.5, datetime.date(2020, 1, 2), True, 'x'),
+              (None, 3.0, datetime.date(2020, 1, 3), False, '1'))
+    actual = fromcsv(f.name, encoding='ascii', types='infer')
+    ieq(expect, actual)
+    ieq((expect[0], expect[-1]), tail(actual, 1))
+    ieq(((u'spam', u'foo'), ('x', 1), ('1', None)),
+        fromcsv(f.name, encoding='ascii', types='infer',
+                usecols=['spam', 'foo']))
+
+
+@pytest.mark.skipif(PY2, reason='buffered writing requires Python 3')
+def test_tocsv_buffered():
+    from petl.io.sources import MemorySource
+    table = [('foo', 'bar')] + [('x%s' % i, i) for i in range(100)]
+    expect = b''.join(('%s,%s\n' % row).encode('ascii') for row in table)
+    f = NamedTemporaryFile(delete=False)
+    fn = f.name + '.gz'
+    f.close()
+    for background in False, True:
+        for buffersize in 1, 7, None:
+            tocsv(table[:50], fn, encoding='ascii', lineterminator='\n',
+                  buffersize=buffersize, background=background)
+            appendcsv(table[50:], fn, encoding='ascii', lineterminator='\n',
+                      write_header=True, buffersize=buffersize,
+                      background=background)
+            with gzip.open(fn, 'rb') as o:
+                eq_(expect, o.read())
+            ms = MemorySource()
+            tocsv(table, ms, encoding='ascii', lineterminator='\n',
+                  buffersize=buffersize, background=background)
+            eq_(expect, ms.getvalue())
+
+
+@pytest.mark.skipif(PY2, reason='buffered writing requires Python 3')
+def test_tocsv_background_error():
+    from contextlib import contextmanager
+
+    class FailingSource(object):
+
+        @contextmanager
+        def open(self, mode='wb'):
+
+            class Failing(object):
+                def write(self, b):
+                    raise IOError('disk full')
+
+            yield Failing()
+
+    table = [('foo', 'bar')] + [('x%s' % i, i) for i in range(1000)]
+    for background in False, True:
+        with pytest.raises(IOError):
+            tocsv(table, FailingSource(), encoding='ascii', buffersize=16,
+                  background=background)
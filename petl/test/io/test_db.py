@@ -82,6 +82,59 @@ def test_fromdb_mkcursor():
     eq_(('b', 2), next(i1))
 
 
+def test_fromdb_nrows():
+
+    connection = sqlite3.connect(':memory:')
+    c = connection.cursor()
+    c.execute('create table foobar (foo, bar)')
+    for row in (('a', 1), ('b', 2), ('c', 2.0)):
+        c.execute('insert into foobar values (?, ?)', row)
+    connection.commit()
+    c.close()
+    queries = list()
+    aborted = [False]
+
+    class Cursor(object):
+        # reject counting queries, as some databases do, and refuse any
+        # other query in the transaction until rolled back, as PostgreSQL
+        # does
+        def __init__(self, cursor):
+            self.cursor = cursor
+
+        def execute(self, query, *args, **kwargs):
+            queries.append(query)
+            if query.startswith('ROLLBACK'):
+                aborted[0] = False
+            elif aborted[0]:
+                raise sqlite3.OperationalError('transaction aborted')
+            elif 'petl_nrows' in query:
+                aborted[0] = True
+                raise sqlite3.OperationalError('not supported')
+            return self.cursor.execute(query, *args, **kwargs)
+
+        def __getattr__(self, item):
+            return getattr(self.cursor, item)
+
+    class Connection(object):
+        def cursor(self):
+            return Cursor(connection.cursor())
+
+    eq_(3, fromdb(connection, 'select * from foobar').nrows())
+    eq_(3, fromdb(Connection(), 'select * from foobar;').nrows())
+    eq_(['SAVEPOINT petl_savepoint',
+         'SELECT COUNT(*) FROM (select * from foobar) petl_nrows',
+         'ROLLBACK TO SAVEPOINT petl_savepoint',
+         'select * from foobar;'], queries)
+    eq_(3, fromdb(Cursor(connection.cursor()),
+                  'select * from foobar').nrows())
+
+    # the count doesn't commit a transaction in progress
+    connection.execute("insert into foobar values ('d', 3)")
+    eq_(4, fromdb(connection, 'select * from foobar').nrows())
+    connection.rollback()
+    eq_(3, fromdb(connection, 'select * from foobar').nrows())
+
+
 def test_fromdb_withargs():
 
     # initial data
@@ -7,7 +7,7 @@ import json
 
 import pytest
 
-from petl.test.helpers import ieq
+from petl.test.helpers import ieq, eq_
 from petl import fromjson, fromdicts, tojson, tojsonarrays
 
 
@@ -65,6 +65,82 @@ def test_fromjson_3():
     ieq(expect, actual)  # verify can iterate twice
 
 
+def test_fromjson_stream():
+
+    f = NamedTemporaryFile(delete=False, mode='w')
+    data = '[{"foo": "a", "bar": 1}, ' \
+           '{"foo": "b"}, ' \
+           '{"foo": "c", "bar": 2, "baz": true}]'
+    f.write(data)
+    f.close()
+
+    actual = fromjson(f.name, stream=True)
+    expect = (('foo', 'bar', 'baz'),
+              ('a', 1, None),
+              ('b', None, None),
+              ('c', 2, True))
+    ieq(expect, actual)
+    ieq(expect, actual)  # verify can iterate twice
+
+
+def test_fromjson_stream_path():
+
+    f = NamedTemporaryFile(delete=False, mode='w')
+    data = '{"meta": {"note": "]}\\"{", "n": [1, [2, {}]]},\n' \
+           ' "items": [{"foo": "a", "bar": 1.5e3},\n' \
+           '           {"foo": "b", "bar": 123456789}],\n' \
+           ' "other": [{"foo": "x"}]}'
+    f.write(data)
+    f.close()
+
+    from petl.io.json import _JsonStreamReader
+    chunksize = _JsonStreamReader.chunksize
+    try:
+        # exercise refilling the buffer mid-value
+        for _JsonStreamReader.chunksize in 1, 7, chunksize:
+            actual = fromjson(f.name, stream=True, path='items.item',
+                              header=['foo', 'bar'])
+            expect = (('foo', 'bar'),
+                      ('a', 1500.0),
+                      ('b', 123456789))
+            ieq(expect, actual)
+    finally:
+        _JsonStreamReader.chunksize = chunksize
+
+
+def test_fromjson_stream_numbers():
+    import io
+    from petl.io.json import _JsonStreamReader
+    data = ('{"meta": "pad", "ratio": 1.25, "big": -2E+10, "small": 5e-3,\n'
+            ' "items": [1.5, 22, -0.5e-3, 7, 1E2], "after": 3.75}')
+    chunksize = _JsonStreamReader.chunksize
+    try:
+        # numbers, both skipped and selected, straddling every chunk boundary
+        for _JsonStreamReader.chunksize in range(1, 12):
+            for pad in range(8):
+                text = data.replace('pad', 'x' * pad)
+                reader = _JsonStreamReader(io.StringIO(text),
+                                           json.JSONDecoder())
+                eq_(json.loads(text)['items'],
+                    list(reader.iterpath(['items', 'item'])))
+                reader = _JsonStreamReader(io.StringIO(text),
+                                           json.JSONDecoder())
+                eq_([3.75], list(reader.iterpath(['after'])))
+    finally:
+        _JsonStreamReader.chunksize = chunksize
+
+
+def test_fromjson_stream_invalid():
+
+    f = NamedTemporaryFile(delete=False, mode='w')
+    f.write('[{"foo": "a"} {"foo": "b"}]')
+    f.close()
+
+    actual = fromjson(f.name, stream=True)
+    with pytest.raises(ValueError):
+        actual.nrows()
+
+
 def test_fromdicts_1():
 
     data = [{'foo': 'a', 'bar': 1},
@@ -284,3 +360,41 @@ def test_fromdicts_generator_missing():
               ('b', 2, "x"),
               ('c', "x", 2))
     ieq(expect, actual)
+
+
+def test_fromdicts_generator_spill():
+    from petl.io.json import _RowCache
+    blocksize = _RowCache.blocksize
+    _RowCache.blocksize = 3
+    try:
+        def generator():
+            for i in range(20):
+                yield OrderedDict([('n', i), ('foo', 100*i)])
+
+        expect = [('n', 'foo')] + [(i, 100*i) for i in range(20)]
+        for buffersize in 0, 4, 100:
+            actual = fromdicts(generator(), buffersize=buffersize)
+            # interleave two passes while the cache is being filled
+            it1 = iter(actual)
+            it2 = iter(actual)
+            for _ in range(11):
+                next(it1)
+            assert list(it2) == expect
+            assert list(it1) == expect[11:]
+            ieq(expect, actual)
+    finally:
+        _RowCache.blocksize = blocksize
+
+
+def test_fromdicts_generator_widen():
+    def generator():
+        yield OrderedDict([('foo', 'a'), ('bar', 1)])
+        yield OrderedDict([('foo', 'b'), ('bar', 2)])
+        yield OrderedDict([('foo', 'c'), ('baz', 2)])
+    actual = fromdicts(generator(), sample=None, missing='x', buffersize=1)
+    expect = (('foo', 'bar', 'baz'),
+              ('a', 1, 'x'),
+              ('b', 2, 'x'),
+              ('c', 'x', 2))
+    ieq(expect, actual)
+    ieq(expect, actual)
@@ -4,7 +4,8 @@ from __future__ import absolute_import, print_function, division
 from tempfile import NamedTemporaryFile
 import json
 
-from petl import fromjson, tojson
+from petl.compat import text_type
+from petl import fromjson, tojson, fromdicts
 from petl.test.helpers import ieq
 
 
@@ -52,6 +53,74 @@ def test_fromjson_2():
     ieq(expect, actual)  # verify can iterate twice
 
 
+def test_fromjson_decoder():
+    f = NamedTemporaryFile(delete=False, mode='w')
+    data = '{"foo": "bar1", "baz": 1}\n' \
+           '\n' \
+           '{"foo": "bar2", "baz": 2}\n'
+    f.write(data)
+    f.close()
+
+    expect = (('foo', 'baz'),
+              ('bar1', 1),
+              ('bar2', 2))
+    for decoder in None, 'auto', json.loads:
+        actual = fromjson(f.name, lines=True, decoder=decoder)
+        ieq(expect, actual)
+
+
+def test_fromjson_workers():
+    f = NamedTemporaryFile(delete=False, mode='w', suffix='.jsonl.gz')
+    f.close()
+    rows = [{'foo': 'bar%s' % i, 'baz': i} for i in range(1000)]
+    # also exercises decompression in the reader thread
+    tojson(fromdicts(rows), f.name, lines=True)
+
+    actual = fromjson(f.name, lines=True, workers=2)
+    expect = [('foo', 'baz')] + [('bar%s' % i, i) for i in range(1000)]
+    ieq(expect, actual)
+    ieq(expect[:3], actual.head(2))  # verify can stop early
+
+
+def _strloads(line):
+    # module-level, so it can be pickled for the worker processes
+    if not isinstance(line, text_type):
+        raise TypeError('expected str, got %s' % type(line).__name__)
+    return json.loads(line)
+
+
+def test_fromjson_workers_decoder():
+    f = NamedTemporaryFile(delete=False, mode='wb')
+    f.write(u'{"foo": "a\u2028b", "bar": 1}\n'
+            u'{"foo": "\u00e9", "bar": 2}\n'.encode('utf-8'))
+    f.close()
+
+    expect = (('foo', 'bar'),
+              (u'a\u2028b', 1),
+              (u'\u00e9', 2))
+    for workers in None, 2:
+        actual = fromjson(f.name, lines=True, decoder=_strloads,
+                          workers=workers)
+        ieq(expect, actual)
+
+
+def test_iterjlinesparallel_blocks():
+    from io import BytesIO
+    from petl.io.json import iterjlinesparallel
+    data = b'{"foo": "a", "bar": 1}\n' \
+           b'{"foo": "b", "bar": 2}\n' \
+           b'\n' \
+           b'{"foo": "c"}'
+    expect = (('foo', 'bar'),
+              ('a', 1),
+              ('b', 2),
+              ('c', None))
+    for blocksize in 1, 7, 100:
+        actual = iterjlinesparallel(BytesIO(data), None, None, json.loads,
+                                    workers=2, blocksize=blocksize)
+        ieq(expect, list(actual))
+
+
 def test_tojson_1():
     table = (('foo', 'bar'),
              ('a', 1),
@@ -4,15 +4,18 @@ from __future__ import absolute_import, print_function, division
 
 import gzip
 import bz2
+import os
 import zipfile
 from tempfile import NamedTemporaryFile
+
+import pytest
 from petl.compat import PY2
 
 
 from petl.test.helpers import ieq, eq_
 import petl as etl
 from petl.io.sources import MemorySource, PopenSource, ZipSource, \
-    StdoutSource, GzipSource, BZ2Source
+    StdoutSource, GzipSource, BZ2Source, BGZFSource
 
 
 def test_memorysource():
@@ -137,6 +140,107 @@ def test_gzipsource():
     ieq(tbl, tbl2)
 
 
+@pytest.mark.skipif(PY2, reason='BGZF requires Python 3')
+def test_bgzfsource():
+    from petl.io import bgzf
+
+    # setup
+    tbl = [('foo', 'bar')] + [('x%s' % i, str(i)) for i in range(200)]
+    fn = NamedTemporaryFile().name + '.bgz'
+    expect = b''.join(('%s,%s\n' % row).encode('ascii') for row in tbl)
+
+    blockdata = bgzf._blockdata
+    try:
+        # small blocks, to exercise reading and seeking across blocks
+        bgzf._blockdata = 100
+        for workers in 1, 3:
+            # write explicit, readable as plain gzip
+            etl.tocsv(tbl, BGZFSource(fn, workers=workers, index=True),
+                      lineterminator='\n')
+            eq_(expect, gzip.open(fn).read())
+            assert os.path.exists(bgzf.indexpath(fn))
+            with open(fn, 'rb') as f:
+                offsets = bgzf.scanblocks(f)
+            assert len(offsets) > 10
+            eq_(offsets, bgzf.loadindex(fn))
+
+            # read explicit and implicit
+            ieq(tbl, etl.fromcsv(BGZFSource(fn, workers=workers)))
+            ieq(tbl, etl.fromcsv(fn))
+
+            # seek, with and without an index
+            source = BGZFSource(fn, workers=workers)
+            assert source.seekable()
+            for hasindex in True, False:
+                if not hasindex:
+                    os.remove(bgzf.indexpath(fn))
+                with source.open('rb') as f:
+                    for offset in (0, 99, 100, 101, 1234, len(expect) - 1,
+                                   len(expect), len(expect) + 5, 555):
+                        eq_(offset, f.seek(offset))
+                        eq_(expect[offset:offset + 150], f.read(150))
+                    eq_(len(expect) - 10, f.seek(-10, os.SEEK_END))
+                    eq_(expect[-10:], f.read())
+
+        # append continues the index
+        etl.tocsv(tbl, BGZFSource(fn, index=True), lineterminator='\n')
+        etl.appendcsv(tbl, BGZFSource(fn, index=True), lineterminator='\n')
+        eq_(expect + expect[8:], gzip.open(fn).read())
+        with open(fn, 'rb') as f:
+            eq_(bgzf.scanblocks(f), bgzf.loadindex(fn))
+
+        # by default, no index is written, and an out of date one removed
+        etl.appendcsv(tbl, fn, lineterminator='\n')
+        assert not os.path.exists(bgzf.indexpath(fn))
+        etl.tocsv(tbl, fn, lineterminator='\n')
+        assert not os.path.exists(bgzf.indexpath(fn))
+        eq_(expect, gzip.open(fn).read())
+    finally:
+        bgzf._blockdata = blockdata
+
+    # plain gzip files are read, but not seekable
+    etl.tocsv(tbl, GzipSource(fn), lineterminator='\n')
+    assert not BGZFSource(fn).seekable()
+    ieq(tbl, etl.fromcsv(fn))
+
+
+def _check_framedsource(source_class, suffix, **kwargs):
+    tbl = [('foo', 'bar')] + [('x%s' % i, str(i)) for i in range(200)]
+    fn = NamedTemporaryFile().name + suffix
+
+    for workers in 1, 3:
+        etl.tocsv(tbl, source_class(fn, workers=workers, **kwargs))
+        ieq(tbl, etl.fromcsv(source_class(fn)))
+    # implicit, and appending another frame
+    etl.appendcsv(tbl, fn)
+    ieq(tbl + tbl[1:], etl.fromcsv(fn))
+    etl.topickle(tbl, fn)
+    ieq(tbl, etl.frompickle(fn))
+
+
+def test_zstdsource():
+    try:
+        # pylint: disable=unused-import
+        import zstandard  # noqa: F401
+    except ImportError as e:
+        pytest.skip('SKIP zstandard tests: %s' % e)
+    else:
+        from petl.io.sources import ZstdSource
+        _check_framedsource(ZstdSource, '.zst', compresslevel=1)
+
+
+def test_lz4source():
+    try:
+        # pylint: disable=unused-import
+        import lz4.frame  # noqa: F401
+    except ImportError as e:
+        pytest.skip('SKIP lz4 tests: %s' % e)
+    else:
+        from petl.io.sources import LZ4Source
+        # small blocks, so the file is written as many frames
+        _check_framedsource(LZ4Source, '.lz4', blocksize=100)
+
+
 def test_bzip2source():
 
     # setup
@@ -6,8 +6,9 @@ from tempfile import NamedTemporaryFile
 import sqlite3
 
 
-from petl.test.helpers import ieq
+from petl.test.helpers import ieq, eq_
 from petl.io.db import fromdb, todb, appenddb
+from petl.util.counting import nrows
 
 
 def test_fromsqlite3():
@@ -90,6 +91,22 @@ def test_fromsqlite3_withargs():
     ieq(expect, actual)  # verify can iterate twice
 
 
+def test_fromsqlite3_nrows():
+
+    connection = sqlite3.connect(':memory:')
+    c = connection.cursor()
+    c.execute('CREATE TABLE foobar (foo, bar)')
+    for row in (('a', 1), ('b', 2), ('c', 2.0)):
+        c.execute('INSERT INTO foobar VALUES (?, ?)', row)
+    connection.commit()
+    c.close()
+
+    eq_(3, nrows(fromdb(connection, 'SELECT * FROM foobar;')))
+    eq_(2, nrows(fromdb(connection, 'select * from foobar where bar > ?',
+                        (1,))))
+    eq_(0, nrows(fromdb(connection, 'SELECT * FROM foobar WHERE bar > 9')))
+
+
 def test_tosqlite3_appendsqlite3():
 
     # exercise function
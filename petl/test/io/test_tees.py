@@ -253,3 +253,16 @@ def test_teehtml_unicode():
          .fromxml(f1.name, './/tr', ('th', 'td'), encoding='utf-8')
          .convertnumbers()))
     ieq(etl.wrap(t1).selectgt('bar', 1), etl.frompickle(f2.name))
+
+
+def test_teecsv_stop():
+
+    t1 = [('foo', 'bar')] + [('x%s' % i, str(i)) for i in range(3000)]
+
+    f1 = NamedTemporaryFile(delete=False)
+    for background in False, True:
+        for n in 3, 2000:
+            ieq(etl.head(t1, n),
+                etl.wrap(t1).teecsv(f1.name, encoding='ascii',
+                                    background=background).head(n))
+            ieq(etl.head(t1, n), etl.fromcsv(f1.name, encoding='ascii'))
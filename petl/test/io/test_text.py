@@ -174,3 +174,24 @@ def test_totext_gz():
         eq_(expect, actual)
     finally:
         o.close()
+
+
+def test_fromtext_tail():
+    import petl.io.base as iobase
+    from petl import tail, wrap
+    blocksize = iobase._tailblocksize
+    try:
+        for lt in b'\r', b'\n', b'\r\n':
+            f = NamedTemporaryFile(mode='wb', delete=False)
+            f.write(lt.join([b'foo', b' a ', b'', b'b', b'c']) + lt)
+            f.close()
+            for hdr in None, ['x']:
+                for strip in None, False:
+                    tbl = fromtext(f.name, encoding='ascii', header=hdr,
+                                   strip=strip)
+                    expect = wrap(list(tbl))
+                    for iobase._tailblocksize in 1, 3, 2**16:
+                        for n in 1, 2, 10:
+                            ieq(tail(expect, n), tail(tbl, n))
+    finally:
+        iobase._tailblocksize = blocksize
@@ -3,10 +3,12 @@ from __future__ import absolute_import, print_function, division
 
 import sys
 from collections import OrderedDict
+from io import BytesIO
 from tempfile import NamedTemporaryFile
 
 import pytest
 
+from petl.errors import ArgumentError
 from petl.test.helpers import ieq
 from petl.util import nrows, look
 from petl.io.xml import fromxml, toxml
@@ -195,6 +197,82 @@ def test_fromxml_6():
     ieq(expect, actual)  # verify can iterate twice
 
 
+def test_fromxml_stream():
+
+    data = """<t:table xmlns:t='http://example.com/t'>
+        <head><t:tr><td>foo</td><td>bar</td></t:tr></head>
+        <body>
+        <t:tr><td>a</td><td>1</td></t:tr>
+        <other><t:tr><td>b</td><td>2</td></t:tr></other>
+        <t:tr><td>c</td><td>3</td><t:tr><td>d</td><td>4</td></t:tr></t:tr>
+        </body>
+      </t:table>"""
+    f = NamedTemporaryFile(delete=False, mode='wt')
+    f.write(data)
+    f.close()
+
+    for rmatch in ('.//{http://example.com/t}tr',
+                   '*/{http://example.com/t}tr',
+                   'body//{*}tr',
+                   'body/*',
+                   '.'):
+        expect = fromxml(f.name, rmatch, './td')
+        actual = fromxml(f.name, rmatch, './td', stream=True)
+        ieq(expect, actual)
+        ieq(expect, actual)  # verify can iterate twice
+
+    expect = fromxml(f.name, './/{*}tr', {'foo': 'td', 'bar': './/td'})
+    actual = fromxml(f.name, './/{*}tr', {'foo': 'td', 'bar': './/td'},
+                     stream=True)
+    ieq(expect, actual)
+
+    with pytest.raises(ArgumentError):
+        fromxml(f.name, './/tr[1]', 'td', stream=True)
+
+
+def test_fromxml_stream_clears_rows():
+    from petl.io.xml import _iterparse_rows
+    data = b"<table>" + b"<row><v>x</v></row>" * 10 + b"</table>"
+    previous = None
+    for rowelm in _iterparse_rows(BytesIO(data), 'row'):
+        assert len(rowelm) == 1
+        if previous is not None:
+            # discarded once the next row is requested
+            assert len(previous) == 0
+        previous = rowelm
+
+
+def test_fromxml_vdict_paths():
+
+    data = """<table xmlns:n='http://example.com/n'>
+        <row>
+            <foo>a</foo><n:foo>x</n:foo>
+            <baz><bar v='1'/><bar v='3'/></baz><bar v='9'/>
+        </row>
+        <row>
+            <foo>b</foo><foo>c</foo><baz/>
+        </row>
+      </table>"""
+    f = NamedTemporaryFile(delete=False, mode='wt')
+    f.write(data)
+    f.close()
+
+    vdict = {'a': 'foo',
+             'b': './foo',
+             'c': '{http://example.com/n}foo',
+             'd': ('baz/bar', 'v'),
+             'e': ('.//bar', 'v'),
+             'f': ('bar', 'v'),
+             'g': '*'}
+    actual = fromxml(f.name, 'row', vdict, missing='-')
+    expect = (('a', 'b', 'c', 'd', 'e', 'f', 'g'),
+              ('a', 'a', 'x', ('1', '3'), ('1', '3', '9'), '9',
+               ('a', 'x', None, None)),
+              (('b', 'c'), ('b', 'c'), '-', '-', '-', '-',
+               ('b', 'c', None)))
+    ieq(expect, actual)
+
+
 def test_fromxml_url():
     # check internet connection
     try:
@@ -108,6 +108,32 @@ def test_cutout():
     ieq(expectation, cut3)
 
 
+def test_cut_pushdown():
+
+    class CuttableTable(object):
+
+        def __init__(self, rows):
+            self.rows = rows
+            self.cuts = 0
+
+        def __iter__(self):
+            return iter(self.rows)
+
+        def _itercut(self, select, missing):
+            self.cuts += 1
+            indices = select(self.rows[0])
+            return iter([tuple(row[i] if i < len(row) else missing
+                               for i in indices) for row in self.rows])
+
+    table = CuttableTable([('foo', 'bar', 'baz'),
+                           ('A', 1, 2),
+                           ('B', 2)])
+    ieq((('baz', 'foo'), (2, 'A'), ('x', 'B')),
+        cut(table, 'baz', 'foo', missing='x'))
+    ieq((('foo', 'baz'), ('A', 2), ('B', None)), cutout(table, 'bar'))
+    assert table.cuts == 2
+
+
 def test_cat():
 
     table1 = (('foo', 'bar'),
@@ -2,8 +2,9 @@ from __future__ import absolute_import, print_function, division
 
 
 from petl.test.helpers import ieq
+from petl.transform.sorts import sort
 from petl.transform.dedup import duplicates, unique, conflicts, distinct, \
-    isunique
+    isunique, hashduplicates, hashunique, hashconflicts, hashdistinct
 
 
 def test_duplicates():
@@ -263,3 +264,196 @@ def test_isunique():
     table = (('foo', 'bar'), ('a', 1), ('b',), ('b', 2), ('c', 3, True))
     assert not isunique(table, 'foo')
     assert isunique(table, 'bar')
+
+
+def _dedup_table():
+    return (('foo', 'bar', 'baz'),
+            ('A', 1, 2),
+            ('B', '2', '3.4'),
+            ('D', 'xyz', 9.0),
+            ('B', u'3', u'7.8', True),
+            ('B', '2', 42),
+            ('E', None),
+            ('D', 4, 12.3),
+            ('F', 7, 2.3),
+            ('B', '2', 42))
+
+
+def test_hashduplicates():
+
+    table = _dedup_table()
+    expectation = (('foo', 'bar', 'baz'),
+                   ('B', '2', '3.4'),
+                   ('D', 'xyz', 9.0),
+                   ('B', u'3', u'7.8', True),
+                   ('B', '2', 42),
+                   ('D', 4, 12.3),
+                   ('B', '2', 42))
+    for buffersize in None, 1:
+        result = hashduplicates(table, 'foo', buffersize=buffersize)
+        ieq(expectation, result)
+        ieq(expectation, result)
+
+    table = (('foo', 'bar'),
+             ('B', 2),
+             ('A', 1),
+             ('B', 2),
+             ('B', 3))
+    expectation = (('foo', 'bar'),
+                   ('B', 2),
+                   ('B', 2))
+    for buffersize in None, 1:
+        result = hashduplicates(table, buffersize=buffersize)
+        ieq(expectation, result)
+
+
+def test_hashduplicates_empty():
+    table = (('foo', 'bar'),)
+    ieq(table, hashduplicates(table, 'foo'))
+
+
+def test_hashunique():
+
+    table = _dedup_table()
+    expectation = (('foo', 'bar', 'baz'),
+                   ('A', 1, 2),
+                   ('E', None),
+                   ('F', 7, 2.3))
+    for buffersize in None, 1:
+        result = hashunique(table, 'foo', buffersize=buffersize)
+        ieq(expectation, result)
+        ieq(expectation, result)
+
+    # same rows as the sort-based implementation
+    for key in 'foo', ('foo', 'bar'):
+        ieq(unique(table, key), sort(hashunique(table, key), key))
+
+
+def test_hashconflicts():
+
+    table = (('foo', 'bar', 'baz'),
+             ('A', 1, 2.7),
+             ('B', 2, None),
+             ('D', 3, 9.4),
+             ('B', None, 7.8),
+             ('E', None),
+             ('D', 3, 12.3),
+             ('A', 2, None))
+    expectation = (('foo', 'bar', 'baz'),
+                   ('A', 1, 2.7),
+                   ('D', 3, 9.4),
+                   ('D', 3, 12.3),
+                   ('A', 2, None))
+    for buffersize in None, 1:
+        result = hashconflicts(table, 'foo', buffersize=buffersize)
+        ieq(expectation, result)
+        ieq(expectation, result)
+
+    expectation = (('foo', 'bar', 'baz'),
+                   ('A', 1, 2.7),
+                   ('A', 2, None))
+    result = hashconflicts(table, 'foo', exclude='baz')
+    ieq(expectation, result)
+    result = hashconflicts(table, 'foo', include='bar')
+    ieq(expectation, result)
+
+
+def test_hashconflicts_group():
+
+    # conflicts are found between any rows sharing a key, not just
+    # neighbouring rows
+    table = (('foo', 'bar'),
+             ('A', 1),
+             ('A', None),
+             ('A', 2))
+    ieq((('foo', 'bar'),), conflicts(table, 'foo', presorted=True))
+    ieq(table, hashconflicts(table, 'foo'))
+
+
+def test_hashdistinct():
+
+    table = (('foo', 'bar', 'baz'),
+             ('C', 1, 2),
+             ('A', 1, 2),
+             ('B', '2', '3.4'),
+             ('A', 1, 2),
+             ('B', '2', '3.4'),
+             ('D', 'xyz', 9.0))
+    expectation = (('foo', 'bar', 'baz'),
+                   ('C', 1, 2),
+                   ('A', 1, 2),
+                   ('B', '2', '3.4'),
+                   ('D', 'xyz', 9.0))
+    for buffersize in None, 1, 2:
+        result = hashdistinct(table, buffersize=buffersize)
+        ieq(expectation, result)
+        ieq(expectation, result)
+
+    expectation = (('foo', 'bar', 'baz', 'count'),
+                   ('C', 1, 2, 1),
+                   ('A', 1, 2, 2),
+                   ('B', '2', '3.4', 2),
+                   ('D', 'xyz', 9.0, 1))
+    for buffersize in None, 1, 2:
+        result = hashdistinct(table, count='count', buffersize=buffersize)
+        ieq(expectation, result)
+        ieq(expectation, result)
+
+
+def test_hashdistinct_key():
+
+    table = (('foo', 'bar'),
+             ('B', 2),
+             ('A', 1),
+             ('B', 3),
+             ('C', 4),
+             ('A', 5))
+    expectation = (('foo', 'bar'),
+                   ('B', 2),
+                   ('A', 1),
+                   ('C', 4))
+    for buffersize in None, 1:
+        result = hashdistinct(table, key='foo', buffersize=buffersize)
+        ieq(expectation, result)
+    ieq(distinct(table, key='foo'), sort(hashdistinct(table, key='foo'),
+                                         'foo'))
+
+
+def test_hashdistinct_empty():
+    table = (('foo', 'bar'),)
+    ieq(table, hashdistinct(table))
+    ieq((('foo', 'bar', 'n'),), hashdistinct(table, count='n'))
+
+
+def test_hashspill_partition_size():
+    from petl.transform.sorts import _iterhashspill
+
+    # many more keys than fit in the first round of partitions
+    records = [(seq, seq % 500, ('x%s' % (seq % 500),))
+               for seq in range(2000)]
+    sizes = list()
+
+    def process(reopen):
+        keys = set(k for _, k, _ in reopen())
+        sizes.append(len(keys))
+        for seq, k, row in reopen():
+            if k == seq:
+                yield seq, row
+
+    for buffersize in 3, 20, None:
+        del sizes[:]
+        result = list(_iterhashspill(iter(records), process,
+                                     buffersize=buffersize))
+        ieq([('x%s' % i,) for i in range(500)], result)
+        if buffersize is not None:
+            assert max(sizes) <= buffersize, sizes
+
+    # a single key can't be split further
+    records = [(seq, 'k', ('x',)) for seq in range(50)]
+    del sizes[:]
+    result = list(_iterhashspill(iter(records), process, buffersize=1))
+    ieq([], result)
+    assert max(sizes) == 1
+    ieq(distinct([('foo',)] + [(i % 7,) for i in range(100)]),
+        hashdistinct([('foo',)] + [(i % 7,) for i in range(100)],
+                     buffersize=1))
@@ -7,8 +7,12 @@ import operator
 from collections import OrderedDict
 from petl.test.helpers import ieq
 from petl.util import strjoin
+from petl.transform.sorts import sort
 from petl.transform.reductions import rowreduce, aggregate, \
-    mergeduplicates, Conflict, fold
+    mergeduplicates, Conflict, fold, groupselectfirst, groupselectlast, \
+    groupselectmin, groupselectmax, hashgroupselectfirst, \
+    hashgroupselectlast, hashgroupselectmin, hashgroupselectmax, \
+    hashmergeduplicates
 
 
 def test_rowreduce():
@@ -487,6 +491,87 @@ def test_mergeduplicates_compoundkey():
     ieq(expect, actual)
         
 
+def test_hashmergeduplicates():
+
+    table = (('foo', 'bar', 'baz'),
+             ('A', 1, 2),
+             ('B', '2', None),
+             ('D', 'xyz', 9.4),
+             ('B', None, u'7.8', True),
+             ('E', None, 42.),
+             ('D', 'xyz', 12.3),
+             ('A', 2, None))
+
+    expectation = (('foo', 'bar', 'baz'),
+                   ('A', Conflict([1, 2]), 2),
+                   ('B', '2', u'7.8'),
+                   ('D', 'xyz', Conflict([9.4, 12.3])),
+                   ('E', None, 42.))
+    for buffersize in None, 1:
+        result = hashmergeduplicates(table, 'foo', buffersize=buffersize)
+        ieq(expectation, result)
+        ieq(expectation, result)
+
+
+def test_hashmergeduplicates_compoundkey():
+    table = [['foo', 'bar', 'baz'],
+             ['c', 3, True],
+             ['a', 1, True],
+             ['a', 2, False],
+             ['a', 1, True],
+             ['a', 2, None],
+             ['c', 3, False]]
+    expect = mergeduplicates(table, key=('foo', 'bar'))
+    actual = sort(hashmergeduplicates(table, key=('foo', 'bar')),
+                  ('foo', 'bar'))
+    ieq(expect, actual)
+
+
+def test_hashmergeduplicates_empty():
+    table = (('foo', 'bar'),)
+    ieq(table, hashmergeduplicates(table, key='foo'))
+
+
+def test_hashgroupselect():
+
+    table = (('foo', 'bar', 'baz'),
+             ('C', 7, False),
+             ('A', 1, True),
+             ('B', 2, False),
+             ('C', 9, True),
+             ('A', 3, False),
+             ('C', 7, None),
+             ('B', None, True))
+
+    for buffersize in None, 1:
+        kwargs = dict(buffersize=buffersize)
+        for expect, actual in (
+                (groupselectfirst(table, 'foo'),
+                 hashgroupselectfirst(table, 'foo', **kwargs)),
+                (groupselectlast(table, 'foo'),
+                 hashgroupselectlast(table, 'foo', **kwargs)),
+                (groupselectmin(table, 'foo', 'bar'),
+                 hashgroupselectmin(table, 'foo', 'bar', **kwargs)),
+                (groupselectmax(table, 'foo', 'bar'),
+                 hashgroupselectmax(table, 'foo', 'bar', **kwargs))):
+            # output is in order of first appearance rather than sorted
+            ieq(expect, sort(actual, 'foo'))
+            ieq(expect, sort(actual, 'foo'))
+
+    actual = hashgroupselectlast(table, 'foo')
+    expect = (('foo', 'bar', 'baz'),
+              ('C', 7, None),
+              ('A', 3, False),
+              ('B', None, True))
+    ieq(expect, actual)
+
+
+def test_hashgroupselect_empty():
+    table = (('foo', 'bar'),)
+    ieq(table, hashgroupselectfirst(table, 'foo'))
+    ieq(table, hashgroupselectmax(table, 'foo', 'bar'))
+
+
 def test_fold():
 
     t1 = (('id', 'count'), (1, 3), (1, 5), (2, 4), (2, 8))
@@ -6,7 +6,7 @@ from datetime import datetime
 
 from petl.test.helpers import ieq
 from petl.transform.reshape import melt, recast, transpose, pivot, flatten, \
-    unflatten
+    unflatten, hashpivot, hashrecast
 from petl.transform.regex import split, capture
 
 
@@ -285,6 +285,73 @@ def test_recast_date():
     ieq(expectation, result)
 
 
+def test_hashrecast():
+
+    table1 = (('id', 'variable', 'value'),
+              (3, 'age', 16),
+              (1, 'gender', 'F'),
+              (2, 'gender', 'M'),
+              (2, 'age', 17),
+              (1, 'age', 12),
+              (3, 'gender', 'M'))
+    table2 = (('id', 'time', 'variable', 'value'),
+              (1, 11, 'weight', 66.4),
+              (1, 14, 'weight', 55.2),
+              (2, 12, 'weight', 53.2),
+              (2, 16, 'weight', 43.3),
+              (3, 12, 'weight', 34.5),
+              (3, 17, 'weight', 49.4))
+
+    for kwargs in (dict(),
+                   dict(key='id'),
+                   dict(key='id', variablefield={'variable': ['gender']})):
+        ieq(recast(table1, **kwargs), hashrecast(table1, **kwargs))
+    for kwargs in (dict(),
+                   dict(key='id'),
+                   dict(key='id', reducers={'weight': max})):
+        ieq(recast(table2, **kwargs), hashrecast(table2, **kwargs))
+
+
+def test_hashrecast_discover():
+
+    # variables are discovered from every row, not just a sample
+    table = (('id', 'variable', 'value'),
+             (1, 'age', 12),
+             (2, 'age', 17),
+             (1, 'gender', 'F'))
+    expect = (('id', 'age', 'gender'),
+              (1, 12, 'F'),
+              (2, 17, None))
+    ieq(expect, hashrecast(table))
+    ieq((('id', 'age'), (1, 12), (2, 17)), recast(table, samplesize=2))
+
+
+def test_hashrecast_spill():
+
+    table = (('id', 'variable', 'value'),
+             (3, 'age', 16),
+             (1, 'gender', 'F'),
+             (2, 'gender', 'M'),
+             (2, 'age', 17),
+             (1, 'age', 12),
+             (3, 'gender', 'M'),
+             (1, 'age', 13))
+    expect = (('id', 'age', 'gender'),
+              (1, [12, 13], 'F'),
+              (2, 17, 'M'),
+              (3, 16, 'M'))
+    actual = hashrecast(table, buffersize=1)
+    ieq(expect, actual)
+    ieq(expect, actual)
+
+
+def test_hashrecast_empty():
+    table = (('foo', 'variable', 'value'),)
+    expect = (('foo',),)
+    actual = hashrecast(table)
+    ieq(expect, actual)
+
+
 def test_melt_and_capture():
 
     table = (('id', 'parad0', 'parad1', 'parad2'),
@@ -351,6 +418,29 @@ def test_transpose_empty():
     ieq(expect2, table2)
 
 
+def test_transpose_spill():
+    table1 = [('id', 'colour', 'size')]
+    table1 += [(i, 'c%s' % i, i * 2) for i in range(10)]
+    expect = list(zip(*table1))
+    for buffersize in 1, 3, 5, 10, 11:
+        table2 = transpose(table1, buffersize=buffersize)
+        ieq(expect, table2)
+        ieq(expect, table2)
+
+
+def test_transpose_short_row():
+    table1 = (('id', 'colour'),
+              (1, 'blue'),
+              (2,))
+    table2 = transpose(table1)
+    try:
+        table2.nrows()
+    except IndexError:
+        pass
+    else:
+        assert False, 'expected IndexError'
+
+
 def test_pivot():
 
     table1 = (('region', 'gender', 'style', 'units'),
@@ -383,6 +473,53 @@ def test_pivot_empty():
     ieq(expect2, table2)
 
 
+def test_pivot_missing():
+
+    table1 = (('region', 'gender', 'units'),
+              ('east', 'boy', 12),
+              ('west', 'girl', 6),
+              ('east', 'boy', 14))
+
+    table2 = pivot(table1, 'region', 'gender', 'units', sum, missing=0)
+    expect2 = (('region', 'boy', 'girl'),
+               ('east', 26, 0),
+               ('west', 0, 6))
+    ieq(expect2, table2)
+    ieq(expect2, table2)
+
+
+def test_hashpivot():
+
+    table1 = (('region', 'gender', 'style', 'units'),
+              ('west', 'girl', 'fancy', 1),
+              ('east', 'boy', 'tee', 12),
+              ('west', 'boy', 'golf', 15),
+              ('east', 'girl', 'fancy', 18),
+              ('east', 'boy', 'golf', 14),
+              ('west', 'girl', 'tee', 6),
+              ('east', 'boy', 'fancy', 7),
+              ('east', 'girl', 'tee', 3),
+              ('west', 'boy', 'fancy', 8),
+              ('east', 'girl', 'golf', 8),
+              ('west', 'boy', 'tee', 12),
+              ('west', 'girl', 'golf', 16))
+
+    for f1, f2 in (('region', 'gender'), ('gender', 'style')):
+        for aggfun in (sum, list):
+            expect = pivot(table1, f1, f2, 'units', aggfun)
+            actual = hashpivot(table1, f1, f2, 'units', aggfun)
+            ieq(expect, actual)
+            ieq(expect, actual)
+
+
+def test_hashpivot_empty():
+
+    table1 = (('region', 'gender', 'style', 'units'),)
+    table2 = hashpivot(table1, 'region', 'gender', 'units', sum)
+    expect2 = (('region',),)
+    ieq(expect2, table2)
+
+
 def test_flatten():
 
     table1 = (('foo', 'bar', 'baz'),
@@ -1,12 +1,15 @@
 from __future__ import absolute_import, print_function, division
 
 
+from collections import Counter
 from datetime import datetime
+from functools import partial
 
 
-from petl.test.helpers import ieq
+from petl.test.helpers import ieq, eq_
 from petl.transform.setops import complement, intersection, diff, \
-    recordcomplement, recorddiff, hashcomplement, hashintersection
+    recordcomplement, recorddiff, hashcomplement, hashintersection, hashdiff, \
+    snapshotdiff
 
 
 def _test_complement_1(complement_impl):
@@ -187,6 +190,37 @@ def test_diff():
     ieq(aminusb, subtracted)
 
 
+def test_hashdiff():
+
+    tablea = (('foo', 'bar', 'baz'),
+              ('A', 1, True),
+              ('C', 7, False),
+              ('B', 2, False),
+              ('C', 9, True))
+
+    tableb = (('x', 'y', 'z'),
+              ('B', 2, False),
+              ('A', 9, False),
+              ('B', 3, True),
+              ('C', 9, True))
+
+    aminusb = (('foo', 'bar', 'baz'),
+               ('A', 1, True),
+               ('C', 7, False))
+
+    bminusa = (('x', 'y', 'z'),
+               ('A', 9, False),
+               ('B', 3, True))
+
+    for digest in False, True:
+        added, subtracted = hashdiff(tablea, tableb, digest=digest)
+        ieq(bminusa, added)
+        ieq(aminusb, subtracted)
+    added, subtracted = diff(tablea, tableb, digest=True)
+    ieq(bminusa, added)
+    ieq(aminusb, subtracted)
+
+
 def test_recordcomplement_1():
 
     table1 = (('foo', 'bar'),
@@ -429,3 +463,216 @@ def test_hashcomplement():
 
 def test_hashintersection():
     _test_intersection(hashintersection)
+
+
+def test_hashcomplement_digest():
+    _test_complement(partial(hashcomplement, digest=True))
+    _test_complement(partial(hashcomplement, digest=repr))
+
+
+def test_hashintersection_digest():
+    _test_intersection(partial(hashintersection, digest=True))
+    _test_intersection(partial(hashintersection, digest=repr))
+
+
+def test_hashcomplement_digest_duplicates():
+
+    table1 = (('foo', 'bar'),
+              ('A', 1),
+              ('A', 1),
+              ('B', 2),
+              ('A', 1))
+    table2 = (('foo', 'bar'),
+              ('A', 1),
+              ('A', 1))
+    expectation = (('foo', 'bar'),
+                   ('B', 2),
+                   ('A', 1))
+    ieq(expectation, hashcomplement(table1, table2, digest=True))
+    expectation = (('foo', 'bar'),
+                   ('B', 2))
+    ieq(expectation, hashcomplement(table1, table2, strict=True,
+                                    digest=True))
+
+
+def test_hashcomplement_digest_equality():
+    from datetime import timedelta, timezone
+    from decimal import Decimal
+    # rows which compare equal have the same digest, whatever their types
+    tz = timezone(timedelta(hours=2))
+    table1 = (('foo', 'bar'),
+              (1, 'a'),
+              (1, 'b'),
+              (0.5, {'x': 1, 'y': [2]}),
+              (datetime(2020, 1, 1, 12, tzinfo=tz), None),
+              (3, 'c'))
+    table2 = (('foo', 'bar'),
+              (1.0, 'a'),
+              (True, 'b'),
+              (Decimal('0.5'), {'y': [2.0], 'x': 1}),
+              (datetime(2020, 1, 1, 10, tzinfo=timezone.utc), None),
+              ('3', 'c'))
+    ieq((('foo', 'bar'), (3, 'c')),
+        hashcomplement(table1, table2, digest=True))
+    ieq(table1[:-1], hashintersection(table1, table2, digest=True))
+    # values are kept apart where they differ by length or container type
+    table3 = (('foo', 'bar'),
+              ('ab', 'c'),
+              ((1,), None))
+    table4 = (('foo', 'bar'),
+              ('a', 'bc'),
+              ([1], None))
+    ieq(table3, hashcomplement(table3, table4, digest=True))
+
+
+def test_snapshotdiff():
+    import os
+    import tempfile
+    from petl.util.vis import look
+    state_path = os.path.join(tempfile.mkdtemp(), 'state.p')
+
+    table1 = (('id', 'name', 'qty'),
+              (1, 'apple', 5),
+              (2, 'pear', 3),
+              (3, 'plum', 8))
+    expect1 = (('id', 'name', 'qty', 'change'),
+               (1, 'apple', 5, 'inserted'),
+               (2, 'pear', 3, 'inserted'),
+               (3, 'plum', 8, 'inserted'))
+    ieq(expect1, snapshotdiff(table1, 'id', state_path))
+    # nothing changed
+    ieq(expect1[:1], snapshotdiff(table1, 'id', state_path))
+
+    table2 = (('id', 'name', 'qty'),
+              (4, 'kiwi', 1),
+              (2, 'pear', 4),
+              (1, 'apple', 5))
+    actual = snapshotdiff(table2, 'id', state_path, changefield='op')
+    # incomplete iteration does not advance the state
+    look(actual, limit=1)
+    expect2 = (('id', 'name', 'qty', 'op'),
+               (4, 'kiwi', 1, 'inserted'),
+               (2, 'pear', 4, 'updated'),
+               (3, None, None, 'deleted'))
+    ieq(expect2, actual)
+    ieq(expect2[:1], actual)
+    assert os.listdir(os.path.dirname(state_path)) == ['state.p']
+
+
+def test_snapshotdiff_compound_key():
+    import os
+    import tempfile
+    state_path = os.path.join(tempfile.mkdtemp(), 'state.p')
+
+    table1 = (('a', 'b', 'c'),
+              ('x', 1, True),
+              ('x', 2, False))
+    table2 = (('a', 'b', 'c'),
+              ('x', 1, False))
+    snapshotdiff(table1, ('a', 'b'), state_path).nrows()
+    expect = (('a', 'b', 'c', 'change'),
+              ('x', 1, False, 'updated'),
+              ('x', 2, '', 'deleted'))
+    ieq(expect, snapshotdiff(table2, ('a', 'b'), state_path, missing=''))
+
+
+def test_complement_strategies():
+    for strategy in 'hash', 'partition', 'auto':
+        _test_complement(partial(complement, strategy=strategy))
+    # force the partitioned path
+    _test_complement(partial(complement, strategy='auto', buffersize=1))
+
+
+def test_intersection_strategies():
+    for strategy in 'hash', 'partition', 'auto':
+        _test_intersection(partial(intersection, strategy=strategy))
+    _test_intersection(partial(intersection, strategy='auto', buffersize=1))
+
+
+def test_complement_strategy_auto():
+    from petl.transform.setops import _choosestrategy
+    table = (('foo',), (1,), (2,), (3,))
+    small = (('foo',), (1,))
+    eq_('sort', _choosestrategy(table, table, True, 1))
+    eq_('hash', _choosestrategy(table, table, False, 3))
+    eq_('partition', _choosestrategy(table, table, False, 2))
+    # the smaller table is held in memory
+    eq_('hash', _choosestrategy(table, small, False, 3))
+    eq_('hashleft', _choosestrategy(small, table, False, 3))
+    eq_('hashleft', _choosestrategy(small, table, False, 2))
+
+
+def test_setops_strategy_auto_unbounded():
+    import petl.config as config
+    from petl.transform.setops import _choosestrategy
+    table = (('foo',), (1,), (2,), (3,))
+    small = (('foo',), (2,))
+    saved = config.hash_buffersize
+    config.hash_buffersize = None
+    try:
+        eq_('hash', _choosestrategy(small, table, False, None))
+        ieq((('foo',), (1,), (3,)), complement(table, small, strategy='auto'))
+        ieq((('foo',), (2,)), intersection(table, small, strategy='auto'))
+    finally:
+        config.hash_buffersize = saved
+
+
+def test_setops_strategy_hashleft():
+    from petl.transform.setops import iterhashleftsetop
+    a = (('foo', 'bar'), ('B', 2), ('A', 1), ('B', 2), ('C', 7), ('B', 2))
+    b = (('x', 'y'), ('B', 2), ('D', 1), ('B', 2), ('C', 7), ('C', 7))
+    for strict in False, True:
+        for intersect in False, True:
+            expect = (intersection(a, b, strategy='hash') if intersect
+                      else complement(a, b, strict=strict, strategy='hash'))
+            ieq(expect, iterhashleftsetop(a, b, strict, intersect))
+
+
+def test_setops_strategy_auto_cached():
+    counts = Counter()
+
+    class Counted(object):
+        def __init__(self, name, rows):
+            self.name = name
+            self.rows = rows
+
+        def __iter__(self):
+            counts[self.name] += 1
+            return iter(self.rows)
+
+    a = Counted('a', (('foo',), (1,), (2,), (3,)))
+    b = Counted('b', (('foo',), (2,)))
+    table = complement(a, b, strategy='auto', buffersize=5)
+    ieq((('foo',), (1,), (3,)), table)
+    ieq((('foo',), (1,), (3,)), table)
+    # each table counted once, then iterated once per pass
+    eq_(3, counts['a'])
+    eq_(3, counts['b'])
+
+
+def test_diff_strategies():
+
+    tablea = (('foo', 'bar', 'baz'),
+              ('C', 7, False),
+              ('A', 1, True),
+              ('B', 2, False),
+              ('C', 9, True))
+
+    tableb = (('x', 'y', 'z'),
+              ('B', 3, True),
+              ('B', 2, False),
+              ('A', 9, False),
+              ('C', 9, True))
+
+    aminusb = (('foo', 'bar', 'baz'),
+               ('C', 7, False),
+               ('A', 1, True))
+
+    bminusa = (('x', 'y', 'z'),
+               ('B', 3, True),
+               ('A', 9, False))
+
+    for strategy in 'hash', 'partition':
+        added, subtracted = diff(tablea, tableb, strategy=strategy)
+        ieq(bminusa, added)
+        ieq(aminusb, subtracted)
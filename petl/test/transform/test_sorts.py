@@ -255,6 +255,30 @@ def test_sort_buffered_independent():
     eq_(expectation[2], next(it1))
 
 
+def test_sort_spill_codec():
+    import petl.config as config
+    from petl.io.sources import GzipSource
+
+    table = (('foo', 'bar'),
+             ('C', 2),
+             ('A', 9),
+             ('A', 6),
+             ('F', 1),
+             ('D', 10))
+    expectation = sort(table, 'bar')
+    spill_codec = config.spill_codec
+    try:
+        config.spill_codec = GzipSource
+        result = sort(table, 'bar', buffersize=2)
+        ieq(expectation, result)
+        ieq(expectation, result)  # from file cache
+        for f in result._filecache:
+            with open(f.name, 'rb') as o:
+                eq_(b'\x1f\x8b', o.read(2))
+    finally:
+        config.spill_codec = spill_codec
+
+
 def _get_names(l):
     return [x.name for x in l]
 
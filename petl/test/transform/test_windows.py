@@ -0,0 +1,155 @@
+from __future__ import absolute_import, print_function, division
+
+
+import math
+
+import pytest
+
+
+from petl.errors import ArgumentError
+from petl.test.helpers import ieq, eq_
+from petl.transform.windows import window, rownumber, rank, denserank, \
+    lag, lead, cumsum, rollingsum, rollingmean
+
+
+def test_window():
+
+    table1 = (('cust', 'day', 'amt'),
+              ('a', 2, 10),
+              ('b', 1, 3),
+              ('a', 1, 5),
+              ('a', 3, 7),
+              ('b', 2, 4))
+
+    table2 = window(table1, 'cust', 'day',
+                    [('rn', rownumber()),
+                     ('prev', lag('amt')),
+                     ('next', lead('amt')),
+                     ('cum', cumsum('amt')),
+                     ('sum2', rollingsum('amt', 2))])
+    expect2 = (('cust', 'day', 'amt', 'rn', 'prev', 'next', 'cum', 'sum2'),
+               ('a', 1, 5, 1, None, 10, 5, 5),
+               ('a', 2, 10, 2, 5, 7, 15, 15),
+               ('a', 3, 7, 3, 10, None, 22, 17),
+               ('b', 1, 3, 1, None, 4, 3, 3),
+               ('b', 2, 4, 2, 3, None, 7, 7))
+    ieq(expect2, table2)
+    ieq(expect2, table2)  # verify can iterate twice
+
+
+def test_window_rank():
+
+    table1 = (('foo', 'bar'),
+              ('a', 3),
+              ('a', 1),
+              ('a', 1),
+              ('a', 2),
+              ('b', 5))
+
+    table2 = window(table1, 'foo', 'bar',
+                    [('rank', rank()), ('denserank', denserank())])
+    expect2 = (('foo', 'bar', 'rank', 'denserank'),
+               ('a', 1, 1, 1),
+               ('a', 1, 1, 1),
+               ('a', 2, 3, 2),
+               ('a', 3, 4, 3),
+               ('b', 5, 1, 1))
+    ieq(expect2, table2)
+
+
+def test_window_offsets():
+
+    table1 = (('foo', 'bar'),
+              (1, 'a'),
+              (2, 'b'),
+              (3, 'c'),
+              (4, 'd'))
+
+    # no partition and no order, input order is kept
+    table2 = window(table1, functions=[('lag2', lag('bar', 2, default='-')),
+                                       ('lead3', lead('bar', 3))])
+    expect2 = (('foo', 'bar', 'lag2', 'lead3'),
+               (1, 'a', '-', 'd'),
+               (2, 'b', '-', None),
+               (3, 'c', 'a', None),
+               (4, 'd', 'b', None))
+    ieq(expect2, table2)
+
+
+def test_window_rollingmean():
+
+    table1 = (('foo', 'bar'),
+              ('a', 2),
+              ('a', None),
+              ('a', 4),
+              ('a', 6),
+              ('b',))
+
+    table2 = window(table1, 'foo', functions=[('ma', rollingmean('bar', 2))],
+                    presorted=True)
+    expect2 = (('foo', 'bar', 'ma'),
+               ('a', 2, 2.0),
+               ('a', None, 2.0),
+               ('a', 4, 4.0),
+               ('a', 6, 5.0),
+               ('b', None))
+    ieq(expect2, table2)
+
+
+def test_window_rollingsum_float():
+
+    values = [1e16, 1.0, -1e16, 0.1, 3, None, 0.7] * 50 + [1, 2, 3, 4]
+    table1 = [('foo',)] + [(v,) for v in values]
+    table2 = window(table1, functions=[('rs', rollingsum('foo', 3))])
+    expect2 = [('foo', 'rs')]
+    for i, v in enumerate(values):
+        frame = [x for x in values[max(i - 2, 0):i + 1] if x is not None]
+        # sums are exact, then rounded once
+        expect2.append((v, math.fsum(frame) if any(isinstance(x, float)
+                                                   for x in frame)
+                        else sum(frame)))
+    ieq(expect2, table2)
+    # once only ints remain, the total is an int again
+    eq_(9, list(table2)[-1][1])
+    assert isinstance(list(table2)[-1][1], int)
+
+
+def test_window_rollingsum_nonfinite():
+
+    inf = float('inf')
+    values = [1.0, inf, 2.0, -inf, 3.0, 4.0, 5.0, 0.5]
+    table1 = [('foo',)] + [(v,) for v in values]
+    table2 = window(table1, functions=[('rs', rollingsum('foo', 3))])
+    actual = [row[1] for row in table2.data()]
+    eq_([1.0, inf, inf], actual[:3])
+    assert math.isnan(actual[3])
+    eq_([-inf, -inf, 12.0, 9.5], actual[4:])
+
+
+def test_window_empty():
+
+    table1 = (('foo', 'bar'),)
+    table2 = window(table1, 'foo', 'bar', [('rn', rownumber())])
+    expect2 = (('foo', 'bar', 'rn'),)
+    ieq(expect2, table2)
+    # no header
+    ieq([], window([], functions=[('rn', rownumber())]))
+
+
+def test_window_functions_copied():
+
+    functions = {'rn': rownumber()}
+    table1 = window((('foo',), ('a',)), functions=functions)
+    table1['lag'] = lag('foo')
+    eq_(['rn'], list(functions))
+    ieq((('foo', 'rn', 'lag'), ('a', 1, None)), table1)
+
+
+def test_window_invalid():
+
+    table1 = (('foo', 'bar'),
+              ('a', 1))
+    with pytest.raises(ArgumentError):
+        list(window(table1, 'foo', functions={'x': len}))
+    with pytest.raises(ArgumentError):
+        lag('bar', 0)
@@ -5,7 +5,7 @@ from petl.errors import ArgumentError
 from petl.test.helpers import ieq, eq_
 from petl.compat import next
 from petl.util.base import header, fieldnames, data, dicts, records, \
-    namedtuples, itervalues, values, rowgroupby
+    namedtuples, itervalues, values, rowgroupby, Table
 
 
 def test_header():
@@ -45,6 +45,50 @@ def test_fieldnames():
     eq_(expect, actual)
 
 
+def test_header_probe():
+    import petl as etl
+
+    class CountingTable(Table):
+
+        def __init__(self, rows):
+            self.rows = rows
+            self.opened = 0
+
+        def __iter__(self):
+            self.opened += 1
+            return iter(self.rows)
+
+        def _header(self):
+            return self.rows[0]
+
+    source = CountingTable([('foo', 'bar', 'baz'), ('a', 1, True)])
+    views = [
+        etl.cut(source, 'baz', 'foo'),
+        etl.cutout(source, 'bar'),
+        etl.rename(source, 'foo', 'quux'),
+        etl.addfield(source, 'spong', 42, index=1),
+        etl.addrownumbers(source),
+        etl.movefield(source, 'baz', 0),
+        etl.cat(source, [('bar', 'eggs')]),
+        etl.select(source, 'foo', lambda v: v == 'a'),
+        etl.convert(source, 'foo', str.upper),
+        etl.sort(source, 'foo'),
+        etl.head(source, 1),
+        etl.tail(source, 1),
+        etl.prefixheader(source, 'x_'),
+        etl.sortheader(etl.extendheader(source, ['aaa'])),
+        etl.setheader(source, ['x', 'y', 'z']),
+    ]
+    for view in views:
+        source.opened = 0
+        actual = header(view)
+        eq_(0, source.opened)
+        eq_(tuple(next(iter(view))), actual)
+
+    # views over plain sequences fall back to iterating the source
+    eq_(('bar',), header(etl.cut([('foo', 'bar'), ('a', 1)], 'bar')))
+
+
 def test_data():
     table = (('foo', 'bar'), ('a', 1), ('b', 2))
     actual = data(table)
@@ -2,6 +2,7 @@ from __future__ import absolute_import, print_function, division
 
 
 from petl.compat import PY2
+from petl.util.base import Table
 from petl.test.helpers import ieq, eq_
 from petl.util.counting import valuecount, valuecounter, valuecounts, \
     rowlengths, typecounts, parsecounts, stringpatterns, nrows
@@ -14,6 +15,34 @@ def test_nrows():
     eq_(expect, actual)
 
 
+def test_nrows_probe():
+    import petl as etl
+
+    class CountedTable(Table):
+
+        def __iter__(self):
+            raise AssertionError('should not be iterated')
+
+        def _nrows(self):
+            return 5
+
+    source = CountedTable()
+    eq_(5, nrows(source))
+    eq_(5, nrows(etl.cut(source, 'foo')))
+    eq_(5, nrows(etl.convert(source, 'foo', int)))
+    eq_(5, nrows(etl.addfield(etl.rename(source, 'foo', 'bar'), 'baz', 1)))
+    eq_(10, nrows(etl.cat(source, source)))
+    eq_(3, nrows(etl.tail(source, 3)))
+    eq_(2, nrows(etl.rowslice(source, 1, None, 2)))
+    eq_(4, nrows(etl.wrap([('foo',), (1,), (2,), (3,), (4,)])))
+    eq_(0, nrows([]))
+
+    # views which may drop rows, or must see values, iterate their source
+    table = (('foo',), ('a',), ('b',))
+    eq_(1, nrows(etl.select(table, 'foo', lambda v: v == 'a')))
+    eq_(2, nrows(etl.head(table, 5)))
+
+
 def test_valuecount():
 
     table = (('foo', 'bar'), ('a', 1), ('b', 2), ('b', 7))
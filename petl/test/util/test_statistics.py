@@ -1,8 +1,9 @@
 from __future__ import absolute_import, print_function, division
 
 
-from petl.test.helpers import eq_
-from petl.util.statistics import stats
+from petl.test.helpers import eq_, ieq
+from petl.util.base import values
+from petl.util.statistics import stats, fieldstats
 
 
 def test_stats():
@@ -23,3 +24,55 @@ def test_stats():
     eq_(2.0, result.mean)
     eq_(2/3, result.pvariance)
     eq_((2/3)**.5, result.pstdev)
+
+
+def test_fieldstats():
+
+    table = (('foo', 'bar', 'baz'),
+             ('A', 1, 2),
+             ('B', '2', '3.4'),
+             ('B', '3', '7.8', True),
+             ('D', 'xyz', 9.0),
+             ('E', None))
+
+    result = fieldstats(table, 'bar', 'baz')
+    expect = (('field',) + stats(table, 'bar')._fields,
+              ('bar',) + tuple(stats(table, 'bar')),
+              ('baz',) + tuple(stats(table, 'baz')))
+    ieq(expect, result)
+    ieq(expect, result)
+
+
+def test_fieldstats_all():
+
+    table = (('foo', 'bar', 'baz'),
+             ('A', 1, 2),
+             ('B', '2', '3.4'))
+
+    # field 'foo' has no numeric values so is omitted
+    result = fieldstats(table)
+    eq_(('bar', 'baz'), tuple(values(result, 'field')))
+
+
+def test_fieldstats_key():
+
+    table = (('foo', 'bar'),
+             ('A', 1),
+             ('B', 2),
+             ('A', 3),
+             ('B', 'x'))
+
+    result = fieldstats(table, 'bar', key='foo')
+    expect = (('foo', 'field') + stats(table, 'bar')._fields,
+              ('A', 'bar') + tuple(stats([('bar',), (1,), (3,)], 'bar')),
+              ('B', 'bar') + tuple(stats([('bar',), (2,), ('x',)], 'bar')))
+    ieq(expect, result)
+
+
+def test_fieldstats_empty():
+
+    table = (('foo', 'bar'),)
+    result = fieldstats(table, 'bar')
+    expect = (('field',) + stats(table, 'bar')._fields,
+              ('bar',) + tuple(stats(table, 'bar')))
+    ieq(expect, result)
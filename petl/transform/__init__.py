@@ -28,7 +28,9 @@ from petl.transform.hashjoins import hashjoin, hashleftjoin, hashrightjoin, \
 
 from petl.transform.reductions import rowreduce, mergeduplicates,\
     aggregate, groupcountdistinctvalues, groupselectfirst, groupselectmax, \
-    groupselectmin, merge, fold, Conflict, groupselectlast
+    groupselectmin, merge, fold, Conflict, groupselectlast, \
+    hashgroupselectfirst, hashgroupselectlast, hashgroupselectmin, \
+    hashgroupselectmax, hashmergeduplicates
 
 from petl.transform.fills import filldown, fillright, fillleft
 
@@ -36,17 +38,18 @@ from petl.transform.regex import capture, split, search, searchcomplement, \
     sub, splitdown
 
 from petl.transform.reshape import melt, recast, transpose, pivot, flatten, \
-    unflatten
+    unflatten, hashpivot, hashrecast
 
 from petl.transform.maps import fieldmap, rowmap, rowmapmany, rowgroupmap
 
 from petl.transform.unpacks import unpack, unpackdict
 
 from petl.transform.dedup import duplicates, unique, distinct, conflicts, \
-    isunique
+    isunique, hashduplicates, hashunique, hashdistinct, hashconflicts
 
 from petl.transform.setops import complement, intersection, \
-    recordcomplement, diff, recorddiff, hashintersection, hashcomplement
+    recordcomplement, diff, recorddiff, hashintersection, hashcomplement, \
+    hashdiff, snapshotdiff
 
 from petl.transform.intervals import intervaljoin, intervalleftjoin, \
     intervaljoinvalues, intervalantijoin, intervallookup, intervallookupone, \
@@ -55,3 +58,6 @@ from petl.transform.intervals import intervaljoin, intervalleftjoin, \
     facetintervalrecordlookupone, collapsedintervals
 
 from petl.transform.validation import validate
+
+from petl.transform.windows import window, WindowFunction, rownumber, rank, \
+    denserank, lag, lead, cumsum, rollingsum, rollingmean
@@ -9,7 +9,8 @@ from petl.compat import izip, izip_longest, next, string_types, text_type
 
 
 # internal dependencies
-from petl.util.base import asindices, rowgetter, Record, Table
+from petl.util.base import asindices, rowgetter, Record, Table, header
+from petl.util.counting import nrows
 
 
 import logging
@@ -124,14 +125,41 @@ class CutView(Table):
     def __iter__(self):
         return itercut(self.source, self.spec, self.missing)
 
+    def _header(self):
+        hdr = header(self.source)
+        return rowgetter(*asindices(hdr, tuple(self.spec)))(hdr)
+
+    def _nrows(self):
+        return nrows(self.source)
+
 
 def itercut(source, spec, missing=None):
-    it = iter(source)
     spec = tuple(spec)  # make sure no-one can change midstream
 
     # convert field selection into field indices
+    def select(hdr):
+        return asindices(hdr, spec)
+
+    return _itercut(source, select, missing)
+
+
+def _itercut(source, select, missing):
+    # some sources can build rows holding just the selected fields, rather
+    # than building full rows to be cut down afterwards
+    itercut = getattr(source, '_itercut', None)
+    if itercut is not None:
+        it = itercut(select, missing)
+        if it is not None:
+            return it
+    return itercutrows(iter(source), select, missing)
+
+
+def itercutrows(it, select, missing=None):
+    """Cut the rows of `it`, where `select` is a function which is given the
+    header and returns the indices of the fields to keep."""
+
     hdr = next(it)
-    indices = asindices(hdr, spec)
+    indices = select(hdr)
 
     # define a function to transform each row in the source data
     # according to the field selection
@@ -196,30 +224,24 @@ class CutOutView(Table):
     def __iter__(self):
         return itercutout(self.source, self.spec, self.missing)
 
+    def _header(self):
+        hdr = header(self.source)
+        indicesout = asindices(hdr, tuple(self.spec))
+        return tuple(f for i, f in enumerate(hdr) if i not in indicesout)
+
+    def _nrows(self):
+        return nrows(self.source)
+
 
 def itercutout(source, spec, missing=None):
-    it = iter(source)
     spec = tuple(spec)  # make sure no-one can change midstream
 
     # convert field selection into field indices
-    hdr = next(it)
-    indicesout = asindices(hdr, spec)
-    indices = [i for i in range(len(hdr)) if i not in indicesout]
+    def select(hdr):
+        indicesout = asindices(hdr, spec)
+        return [i for i in range(len(hdr)) if i not in indicesout]
 
-    # define a function to transform each row in the source data
-    # according to the field selection
-    transform = rowgetter(*indices)
-
-    # yield the transformed header
-    yield transform(hdr)
-
-    # construct the transformed data
-    for row in it:
-        try:
-            yield transform(row)
-        except IndexError:
-            # row is short, let's be kind and fill in any missing fields
-            yield tuple(row[i] if i < len(row) else missing for i in indices)
+    return _itercut(source, select, missing)
 
 
 def cat(*tables, **kwargs):
@@ -337,19 +359,32 @@ class CatView(Table):
     def __iter__(self):
         return itercat(self.sources, self.missing, self.header)
 
+    def _header(self):
+        if self.header is not None:
+            return tuple(self.header)
+        return tuple(_catheader([header(t) for t in self.sources]))
+
+    def _nrows(self):
+        return sum(nrows(t) for t in self.sources)
+
+
+def _catheader(hdrs):
+    # determine output fields by gathering all fields found in the sources
+    outhdr = list(hdrs[0])
+    for hdr in hdrs[1:]:
+        for h in hdr:
+            if h not in outhdr:
+                # add any new fields as we find them
+                outhdr.append(h)
+    return outhdr
+
 
 def itercat(sources, missing, header):
     its = [iter(t) for t in sources]
     hdrs = [list(next(it)) for it in its]
 
     if header is None:
-        # determine output fields by gathering all fields found in the sources
-        outhdr = list(hdrs[0])
-        for hdr in hdrs[1:]:
-            for h in hdr:
-                if h not in outhdr:
-                    # add any new fields as we find them
-                    outhdr.append(h)
+        outhdr = _catheader(hdrs)
     else:
         # predetermined output fields
         outhdr = header
@@ -448,6 +483,12 @@ class StackView(Table):
     def __iter__(self):
         return iterstack(self.sources, self.missing, self.trim, self.pad)
 
+    def _header(self):
+        return header(self.sources[0])
+
+    def _nrows(self):
+        return sum(nrows(t) for t in self.sources)
+
 
 def iterstack(sources, missing, trim, pad):
     its = [iter(t) for t in sources]
@@ -523,6 +564,15 @@ class AddFieldView(Table):
     def __iter__(self):
         return iteraddfield(self.source, self.field, self.value, self.index)
 
+    def _header(self):
+        outhdr = list(header(self.source))
+        index = len(outhdr) if self.index is None else self.index
+        outhdr.insert(index, self.field)
+        return tuple(outhdr)
+
+    def _nrows(self):
+        return nrows(self.source)
+
 
 def iteraddfield(source, field, value, index):
     it = iter(source)
@@ -612,6 +662,9 @@ class AddFieldsView(Table):
     def __iter__(self):
         return iteraddfields(self.source, self.field_defs)
 
+    def _nrows(self):
+        return nrows(self.source)
+
 
 def iteraddfields(source, field_defs):
     it = iter(source)
@@ -724,9 +777,32 @@ class RowSliceView(Table):
     def __iter__(self):
         return iterrowslice(self.source, self.sliceargs)
 
+    def _header(self):
+        return header(self.source)
+
+    def _nrows(self):
+        # only worth counting the source if the slice runs to its end
+        s = slice(*self.sliceargs)
+        if s.stop is not None:
+            return None
+        return len(range(*s.indices(nrows(self.source))))
+
 
 def iterrowslice(source, sliceargs):
-    it = iter(source)
+    start = sliceargs[0] if len(sliceargs) > 1 else None
+    stop = sliceargs[1] if len(sliceargs) > 1 else None
+    it = None
+    # N.B., leave a negative stop to islice, which rejects it
+    if start and start > 0 and (stop is None or stop >= 0):
+        # some sources can seek directly to a given row
+        iterfrom = getattr(source, '_iterfrom', None)
+        if iterfrom is not None:
+            it = iterfrom(start)
+    if it is None:
+        it = iter(source)
+    else:
+        sliceargs = (0, None if stop is None else max(stop - start, 0)) + \
+            tuple(sliceargs[2:])
     try:
         yield tuple(next(it))  # fields
     except StopIteration:
@@ -823,8 +899,22 @@ class TailView(Table):
     def __iter__(self):
         return itertail(self.source, self.n)
 
+    def _header(self):
+        return header(self.source)
+
+    def _nrows(self):
+        return min(max(self.n, 0), nrows(self.source))
+
 
 def itertail(source, n):
+    # some sources can seek directly to the last rows
+    iterfrom = getattr(source, '_iterfrom', None)
+    if iterfrom is not None and n > 0:
+        it = iterfrom(-n)
+        if it is not None:
+            for row in it:
+                yield tuple(row)
+            return
     it = iter(source)
     yield tuple(next(it))  # fields
     cache = deque()
@@ -911,8 +1001,7 @@ class MoveFieldView(Table):
 
         # determine output fields
         hdr = next(it)
-        outhdr = [f for f in hdr if f != self.field]
-        outhdr.insert(self.index, self.field)
+        outhdr = self._outhdr(hdr)
         yield tuple(outhdr)
 
         # define a function to transform each row in the source data
@@ -930,6 +1019,17 @@ class MoveFieldView(Table):
                 yield tuple(row[i] if i < len(row) else self.missing
                             for i in indices)
 
+    def _outhdr(self, hdr):
+        outhdr = [f for f in hdr if f != self.field]
+        outhdr.insert(self.index, self.field)
+        return outhdr
+
+    def _header(self):
+        return tuple(self._outhdr(header(self.table)))
+
+    def _nrows(self):
+        return nrows(self.table)
+
 
 def annex(*tables, **kwargs):
     """
@@ -974,6 +1074,9 @@ class AnnexView(Table):
     def __iter__(self):
         return iterannex(self.tables, self.missing)
 
+    def _nrows(self):
+        return max(nrows(t) for t in self.tables)
+
 
 def iterannex(tables, missing):
     its = [iter(t) for t in tables]
@@ -1039,6 +1142,12 @@ class AddRowNumbersView(Table):
     def __iter__(self):
         return iteraddrownumbers(self.table, self.start, self.step, self.field)
 
+    def _header(self):
+        return (self.field,) + header(self.table)
+
+    def _nrows(self):
+        return nrows(self.table)
+
 
 def iteraddrownumbers(table, start, step, field):
     it = iter(table)
@@ -1094,6 +1203,12 @@ class AddColumnView(Table):
         return iteraddcolumn(self._table, self._field, self._col,
                              self._index, self._missing)
 
+    def _header(self):
+        outhdr = list(header(self._table))
+        index = len(outhdr) if self._index is None else self._index
+        outhdr.insert(index, self._field)
+        return tuple(outhdr)
+
 
 def iteraddcolumn(table, field, col, index, missing):
     it = iter(table)
@@ -1,13 +1,18 @@
 from __future__ import absolute_import, print_function, division
 
 
+from itertools import islice, chain
+
+
 from petl.compat import next, integer_types, string_types, text_type
 
 
 import petl.config as config
 from petl.errors import ArgumentError, FieldSelectionError
-from petl.util.base import Table, expr, fieldnames, Record
-from petl.util.parsers import numparser
+from petl.util.base import Table, expr, fieldnames, header, Record
+from petl.util.counting import nrows
+from petl.util.parsers import numparser, dateparser, datetimeparser, \
+    boolparser
 
 
 def convert(table, *args, **kwargs):
@@ -345,6 +350,15 @@ class FieldConvertView(Table):
         return iterfieldconvert(self.source, self.converters, self.failonerror,
                                 self.errorvalue, self.where, self.pass_row)
 
+    def _header(self):
+        return header(self.source)
+
+    def _nrows(self):
+        if self.failonerror and self.failonerror != 'inline':
+            # conversion errors must be raised, so values have to be seen
+            return None
+        return nrows(self.source)
+
     def __setitem__(self, key, value):
         self.converters[key] = value
 
@@ -358,43 +372,7 @@ def iterfieldconvert(source, converters, failonerror, errorvalue, where,
     flds = list(map(text_type, hdr))
     yield tuple(hdr)  # these are not modified
 
-    # build converter functions
-    converter_functions = dict()
-    for k, c in converters.items():
-
-        # turn field names into row indices
-        if not isinstance(k, integer_types):
-            try:
-                k = flds.index(k)
-            except ValueError:  # not in list
-                raise FieldSelectionError(k)
-        assert isinstance(k, int), 'expected integer, found %r' % k
-
-        # is converter a function?
-        if callable(c):
-            converter_functions[k] = c
-
-        # is converter a method name?
-        elif isinstance(c, string_types):
-            converter_functions[k] = methodcaller(c)
-
-        # is converter a method name with arguments?
-        elif isinstance(c, (tuple, list)) and isinstance(c[0], string_types):
-            methnm = c[0]
-            methargs = c[1:]
-            converter_functions[k] = methodcaller(methnm, *methargs)
-
-        # is converter a dictionary?
-        elif isinstance(c, dict):
-            converter_functions[k] = dictconverter(c)
-
-        # is it something else?
-        elif c is None:
-            pass  # ignore
-        else:
-            raise ArgumentError(
-                'unexpected converter specification on field %r: %r' % (k, c)
-            )
+    converter_functions = getconverterfunctions(flds, converters)
 
     # define a function to transform a value
     def transform_value(i, v, *args):
@@ -448,6 +426,159 @@ def iterfieldconvert(source, converters, failonerror, errorvalue, where,
                 yield row
 
 
+def iterconvertrows(it, converters, failonerror=None, errorvalue=None,
+                    raw=False):
+    """Convert values in the rows of `it` as :func:`convert`, given a dict of
+    converter specifications, or 'infer' to infer conversion functions from
+    a sample of rows via :func:`inferconverters`. If `raw`, rows are
+    converted in place where they are lists, and yielded as lists."""
+
+    if failonerror is None:
+        failonerror = config.failonerror
+    hdr = tuple(next(it))
+    yield hdr
+    if converters == 'infer':
+        sample = list(islice(it, config.infer_sample))
+        converter_functions = inferconverters(sample)
+        it = chain(sample, it)
+    else:
+        converter_functions = getconverterfunctions(list(map(text_type, hdr)),
+                                                    converters)
+    items = sorted(converter_functions.items())
+    if not items:
+        for row in it:
+            yield row if raw else tuple(row)
+        return
+    positions = dict((i, n) for n, (i, _) in enumerate(items))
+
+    # if all fields have the same conversion function, rows of full length
+    # can be converted in a single call to map
+    fused = None
+    if len(items) == len(hdr) and \
+            all(f is items[0][1] for _, f in items):
+        fused = items[0][1]
+
+    def onerror(e):
+        if failonerror == 'inline':
+            return e
+        elif failonerror:
+            raise e
+        else:
+            return errorvalue
+
+    def convertfrom(row, n):
+        # convert value by value from the `n`th conversion function
+        for i, f in items[n:]:
+            if i < len(row):
+                try:
+                    row[i] = f(row[i])
+                except Exception as e:
+                    row[i] = onerror(e)
+        return row
+
+    width = len(hdr)
+    for row in it:
+        if fused is not None and len(row) == width:
+            try:
+                row = list(map(fused, row)) if raw else tuple(map(fused, row))
+            except Exception:
+                row = convertfrom(list(row), 0)
+                if not raw:
+                    row = tuple(row)
+            yield row
+            continue
+        if type(row) is not list:
+            row = list(row)
+        try:
+            for i, f in items:
+                row[i] = f(row[i])
+        except Exception as e:
+            # N.B., `i` is the field which failed, which may be missing
+            # from a short row
+            if i < len(row):
+                row[i] = onerror(e)
+            row = convertfrom(row, positions[i] + 1)
+        yield row if raw else tuple(row)
+
+
+def inferconverters(rows):
+    """Return a dict mapping field indices to conversion functions for up
+    to `petl.config.infer_sample` of the given data rows, choosing for each
+    field the first of :func:`int`, :func:`float`, an ISO date or datetime
+    parser, or a true/false parser which accepts all non-empty values
+    sampled. Fields for which none do are left unconverted."""
+
+    rows = list(islice(rows, config.infer_sample))
+    ncols = max([len(row) for row in rows] + [0])
+    converter_functions = dict()
+    for i in range(ncols):
+        values = set(row[i] for row in rows
+                     if i < len(row) and row[i] != '')
+        if not values:
+            continue
+        for f in _inferable:
+            try:
+                for v in values:
+                    f(v)
+            except Exception:
+                continue
+            converter_functions[i] = f
+            break
+    return converter_functions
+
+
+_inferable = (int, float,
+              dateparser('%Y-%m-%d'),
+              datetimeparser('%Y-%m-%dT%H:%M:%S'),
+              datetimeparser('%Y-%m-%d %H:%M:%S'),
+              boolparser(true_strings=('true',), false_strings=('false',)))
+
+
+def getconverterfunctions(flds, converters):
+    """Return a dict mapping field indices to conversion functions, given
+    the field names and a dict of converter specifications as accepted by
+    :func:`convert`."""
+
+    converter_functions = dict()
+    for k, c in converters.items():
+
+        # turn field names into row indices
+        if not isinstance(k, integer_types):
+            try:
+                k = flds.index(k)
+            except ValueError:  # not in list
+                raise FieldSelectionError(k)
+        assert isinstance(k, int), 'expected integer, found %r' % k
+
+        # is converter a function?
+        if callable(c):
+            converter_functions[k] = c
+
+        # is converter a method name?
+        elif isinstance(c, string_types):
+            converter_functions[k] = methodcaller(c)
+
+        # is converter a method name with arguments?
+        elif isinstance(c, (tuple, list)) and isinstance(c[0], string_types):
+            methnm = c[0]
+            methargs = c[1:]
+            converter_functions[k] = methodcaller(methnm, *methargs)
+
+        # is converter a dictionary?
+        elif isinstance(c, dict):
+            converter_functions[k] = dictconverter(c)
+
+        # is it something else?
+        elif c is None:
+            pass  # ignore
+        else:
+            raise ArgumentError(
+                'unexpected converter specification on field %r: %r' % (k, c)
+            )
+
+    return converter_functions
+
+
 def methodcaller(nm, *args):
     return lambda v: getattr(v, nm)(*args)
 
@@ -1,12 +1,14 @@
 from __future__ import absolute_import, print_function, division
 
 
+import itertools
 import operator
+from collections import OrderedDict
 from petl.compat import text_type
 
 
 from petl.util.base import Table, asindices, itervalues
-from petl.transform.sorts import sort
+from petl.transform.sorts import sort, _iterhashspill, _hashbuffersize
 
 
 def duplicates(table, key=None, presorted=False, buffersize=None, tempdir=None, 
@@ -481,3 +483,469 @@ def isunique(table, field):
 
 
 Table.isunique = isunique
+
+
+def hashduplicates(table, key=None, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of :func:`petl.transform.dedup.duplicates`,
+    where occurrences of each key are counted in a hash table rather than
+    sorting the table. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar', 'baz'],
+        ...           ['A', 1, 2.0],
+        ...           ['B', 2, 3.4],
+        ...           ['D', 6, 9.3],
+        ...           ['B', 3, 7.8],
+        ...           ['B', 2, 12.3],
+        ...           ['E', None, 1.3],
+        ...           ['D', 4, 14.5]]
+        >>> table2 = etl.hashduplicates(table1, 'foo')
+        >>> table2
+        +-----+-----+------+
+        | foo | bar | baz  |
+        +=====+=====+======+
+        | 'B' |   2 |  3.4 |
+        +-----+-----+------+
+        | 'D' |   6 |  9.3 |
+        +-----+-----+------+
+        | 'B' |   3 |  7.8 |
+        +-----+-----+------+
+        | 'B' |   2 | 12.3 |
+        +-----+-----+------+
+        | 'D' |   4 | 14.5 |
+        +-----+-----+------+
+
+    The same rows are selected as by :func:`petl.transform.dedup.duplicates`,
+    but in the order they appear in the input table. The table is read twice,
+    once to count keys and once to select rows.
+
+    If the number of distinct keys exceeds `buffersize`, rows are instead
+    partitioned by key into temporary files in `tempdir`, and each partition
+    is processed in turn, after being split again if it holds more than
+    `buffersize` keys. If `buffersize` is `None`, the value of
+    `petl.config.hash_buffersize` will be used. If that is also `None`, all
+    keys are held in memory.
+
+    """
+
+    return HashDuplicatesView(table, key=key, buffersize=buffersize,
+                              tempdir=tempdir)
+
+
+Table.hashduplicates = hashduplicates
+
+
+class HashDuplicatesView(Table):
+
+    def __init__(self, source, key=None, buffersize=None, tempdir=None):
+        self.source = source
+        self.key = key
+        self.buffersize = _hashbuffersize(buffersize)
+        self.tempdir = tempdir
+
+    def __iter__(self):
+        return iterhashcount(self.source, self.key, lambda n: n > 1,
+                             self.buffersize, self.tempdir)
+
+
+def hashunique(table, key=None, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of :func:`petl.transform.dedup.unique`, where
+    occurrences of each key are counted in a hash table rather than sorting
+    the table. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar', 'baz'],
+        ...           ['A', 1, 2],
+        ...           ['B', '2', '3.4'],
+        ...           ['D', 'xyz', 9.0],
+        ...           ['F', 7, 2.3],
+        ...           ['B', u'3', u'7.8'],
+        ...           ['E', None, None],
+        ...           ['D', 4, 12.3]]
+        >>> table2 = etl.hashunique(table1, 'foo')
+        >>> table2
+        +-----+------+------+
+        | foo | bar  | baz  |
+        +=====+======+======+
+        | 'A' |    1 |    2 |
+        +-----+------+------+
+        | 'F' |    7 |  2.3 |
+        +-----+------+------+
+        | 'E' | None | None |
+        +-----+------+------+
+
+    The same rows are selected as by :func:`petl.transform.dedup.unique`,
+    but in the order they appear in the input table. See
+    :func:`petl.transform.dedup.hashduplicates` for a discussion of the
+    `buffersize` and `tempdir` arguments.
+
+    """
+
+    return HashUniqueView(table, key=key, buffersize=buffersize,
+                          tempdir=tempdir)
+
+
+Table.hashunique = hashunique
+
+
+class HashUniqueView(Table):
+
+    def __init__(self, source, key=None, buffersize=None, tempdir=None):
+        self.source = source
+        self.key = key
+        self.buffersize = _hashbuffersize(buffersize)
+        self.tempdir = tempdir
+
+    def __iter__(self):
+        return iterhashcount(self.source, self.key, lambda n: n == 1,
+                             self.buffersize, self.tempdir)
+
+
+def _keygetter(hdr, key):
+    if key is None:
+        indices = range(len(hdr))
+    else:
+        indices = asindices(hdr, key)
+    # N.B., this may raise an exception on short rows, depending on
+    # the field selection
+    return operator.itemgetter(*indices)
+
+
+def iterhashcount(source, key, select, buffersize, tempdir):
+    it = iter(source)
+    hdr = next(it)
+    yield tuple(hdr)
+    getkey = _keygetter(hdr, key)
+
+    # first pass - count keys, unless there are too many
+    counts = dict()
+    spill = False
+    for row in it:
+        k = getkey(row)
+        counts[k] = counts.get(k, 0) + 1
+        if buffersize is not None and len(counts) > buffersize:
+            spill = True
+            break
+
+    it = itertools.islice(source, 1, None)
+    if not spill:
+        # second pass - select rows
+        for row in it:
+            if select(counts[getkey(row)]):
+                yield tuple(row)
+
+    else:
+        del counts
+
+        def process(reopen):
+            pcounts = dict()
+            for _, k, _ in reopen():
+                pcounts[k] = pcounts.get(k, 0) + 1
+            for seq, k, row in reopen():
+                if select(pcounts[k]):
+                    yield seq, tuple(row)
+
+        records = ((seq, getkey(row), row) for seq, row in enumerate(it))
+        for row in _iterhashspill(records, process, tempdir, buffersize):
+            yield row
+
+
+def hashconflicts(table, key, missing=None, include=None, exclude=None,
+                  buffersize=None, tempdir=None):
+    """
+    Alternative implementation of :func:`petl.transform.dedup.conflicts`,
+    where rows are grouped by key in a hash table rather than sorting the
+    table. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar', 'baz'],
+        ...           ['A', 1, 2.7],
+        ...           ['B', 2, None],
+        ...           ['D', 3, 9.4],
+        ...           ['B', None, 7.8],
+        ...           ['E', None],
+        ...           ['D', 3, 12.3],
+        ...           ['A', 2, None]]
+        >>> table2 = etl.hashconflicts(table1, 'foo')
+        >>> table2
+        +-----+-----+------+
+        | foo | bar | baz  |
+        +=====+=====+======+
+        | 'A' |   1 |  2.7 |
+        +-----+-----+------+
+        | 'D' |   3 |  9.4 |
+        +-----+-----+------+
+        | 'D' |   3 | 12.3 |
+        +-----+-----+------+
+        | 'A' |   2 | None |
+        +-----+-----+------+
+
+    Unlike :func:`petl.transform.dedup.conflicts`, which compares each row
+    with its neighbour in sorted order, all rows sharing a key are selected
+    if any two of them have different non-missing values in some field.
+    Rows are output in the order they appear in the input table. The
+    `missing`, `include` and `exclude` arguments have the same meaning as
+    for :func:`petl.transform.dedup.conflicts`. See
+    :func:`petl.transform.dedup.hashduplicates` for a discussion of the
+    `buffersize` and `tempdir` arguments.
+
+    """
+
+    return HashConflictsView(table, key, missing=missing, include=include,
+                             exclude=exclude, buffersize=buffersize,
+                             tempdir=tempdir)
+
+
+Table.hashconflicts = hashconflicts
+
+
+class HashConflictsView(Table):
+
+    def __init__(self, source, key, missing=None, include=None, exclude=None,
+                 buffersize=None, tempdir=None):
+        self.source = source
+        self.key = key
+        self.missing = missing
+        self.include = include
+        self.exclude = exclude
+        self.buffersize = _hashbuffersize(buffersize)
+        self.tempdir = tempdir
+
+    def __iter__(self):
+        return iterhashconflicts(self.source, self.key, self.missing,
+                                 self.include, self.exclude, self.buffersize,
+                                 self.tempdir)
+
+
+def iterhashconflicts(source, key, missing, include, exclude, buffersize,
+                      tempdir):
+
+    # normalise arguments
+    if exclude and not isinstance(exclude, (list, tuple)):
+        exclude = (exclude,)
+    if include and not isinstance(include, (list, tuple)):
+        include = (include,)
+
+    # exclude overrides include
+    if include and exclude:
+        include = None
+
+    it = iter(source)
+    hdr = next(it)
+    flds = list(map(text_type, hdr))
+    yield tuple(hdr)
+    getkey = _keygetter(hdr, key)
+
+    # indices of fields to compare
+    indices = [i for i, f in enumerate(flds)
+               if (exclude and f not in exclude)
+               or (include and f in include)
+               or (not exclude and not include)]
+
+    def update(state, row):
+        # state holds the first non-missing value seen for each field, and
+        # whether a conflicting value has been seen
+        if state is None:
+            return [list(row), False]
+        values = state[0]
+        for i in indices:
+            if i >= len(row):
+                break
+            if i >= len(values):
+                values.append(row[i])
+                continue
+            x, y = values[i], row[i]
+            if x == missing:
+                values[i] = y
+            elif y != missing and x != y:
+                state[1] = True
+        return state
+
+    # first pass - find conflicting keys, unless there are too many keys
+    states = dict()
+    spill = False
+    for row in it:
+        k = getkey(row)
+        states[k] = update(states.get(k), row)
+        if buffersize is not None and len(states) > buffersize:
+            spill = True
+            break
+
+    it = itertools.islice(source, 1, None)
+    if not spill:
+        conflicting = set(k for k, state in states.items() if state[1])
+        del states
+        # second pass - select rows
+        for row in it:
+            if getkey(row) in conflicting:
+                yield tuple(row)
+
+    else:
+        del states
+
+        def process(reopen):
+            pstates = dict()
+            for _, k, row in reopen():
+                pstates[k] = update(pstates.get(k), row)
+            for seq, k, row in reopen():
+                if pstates[k][1]:
+                    yield seq, tuple(row)
+
+        records = ((seq, getkey(row), row) for seq, row in enumerate(it))
+        for row in _iterhashspill(records, process, tempdir, buffersize):
+            yield row
+
+
+def hashdistinct(table, key=None, count=None, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of :func:`petl.transform.dedup.distinct`,
+    where keys already seen are remembered in a hash table rather than
+    sorting the table, so rows are output in order of first appearance.
+    E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar'],
+        ...           ['C', 2],
+        ...           ['A', 1],
+        ...           ['C', 2],
+        ...           ['B', 3],
+        ...           ['A', 1]]
+        >>> etl.hashdistinct(table1)
+        +-----+-----+
+        | foo | bar |
+        +=====+=====+
+        | 'C' |   2 |
+        +-----+-----+
+        | 'A' |   1 |
+        +-----+-----+
+        | 'B' |   3 |
+        +-----+-----+
+
+        >>> etl.hashdistinct(table1, count='n')
+        +-----+-----+---+
+        | foo | bar | n |
+        +=====+=====+===+
+        | 'C' |   2 | 2 |
+        +-----+-----+---+
+        | 'A' |   1 | 2 |
+        +-----+-----+---+
+        | 'B' |   3 | 1 |
+        +-----+-----+---+
+
+    The `key` and `count` arguments have the same meaning as for
+    :func:`petl.transform.dedup.distinct`. Without `count`, rows are output
+    as the table is read; with `count`, the first row for each key is held
+    in memory until the table has been read.
+
+    If the number of distinct keys exceeds `buffersize`, the remaining rows
+    are partitioned by key into temporary files in `tempdir`, and each
+    partition is processed in turn, after being split again if it holds
+    more than `buffersize` keys. If `buffersize` is `None`, the value of
+    `petl.config.hash_buffersize` will be used. If that is also `None`, all
+    keys are held in memory.
+
+    """
+
+    return HashDistinctView(table, key=key, count=count,
+                            buffersize=buffersize, tempdir=tempdir)
+
+
+Table.hashdistinct = hashdistinct
+
+
+class HashDistinctView(Table):
+
+    def __init__(self, source, key=None, count=None, buffersize=None,
+                 tempdir=None):
+        self.source = source
+        self.key = key
+        self.count = count
+        self.buffersize = _hashbuffersize(buffersize)
+        self.tempdir = tempdir
+
+    def __iter__(self):
+        if self.count:
+            return iterhashdistinctcount(self.source, self.key, self.count,
+                                         self.buffersize, self.tempdir)
+        else:
+            return iterhashdistinct(self.source, self.key, self.buffersize,
+                                    self.tempdir)
+
+
+def iterhashdistinct(source, key, buffersize, tempdir):
+    it = iter(source)
+    hdr = next(it)
+    yield tuple(hdr)
+    getkey = _keygetter(hdr, key)
+
+    seen = set()
+    for seq, row in enumerate(it):
+        k = getkey(row)
+        if k in seen:
+            continue
+        if buffersize is not None and len(seen) >= buffersize:
+            # too many keys, partition the remaining rows, together with the
+            # keys already seen, which are marked with a negative seq
+            seeds = ((-1, s, None) for s in seen)
+            rest = ((i, getkey(r), r) for i, r in enumerate(it, seq + 1))
+            records = itertools.chain(seeds, [(seq, k, row)], rest)
+
+            def process(reopen):
+                pseen = set()
+                for pseq, pk, prow in reopen():
+                    if pk not in pseen:
+                        pseen.add(pk)
+                        if pseq >= 0:
+                            yield pseq, tuple(prow)
+
+            for outrow in _iterhashspill(records, process, tempdir,
+                                         buffersize):
+                yield outrow
+            return
+        seen.add(k)
+        yield tuple(row)
+
+
+def iterhashdistinctcount(source, key, count, buffersize, tempdir):
+    it = iter(source)
+    hdr = next(it)
+    yield tuple(hdr) + (count,)
+    getkey = _keygetter(hdr, key)
+
+    # first row and number of rows for each key, in order of first appearance
+    firsts = OrderedDict()
+    spill = False
+    for row in it:
+        k = getkey(row)
+        if k in firsts:
+            firsts[k][1] += 1
+        elif buffersize is not None and len(firsts) >= buffersize:
+            spill = True
+            break
+        else:
+            firsts[k] = [row, 1]
+
+    if not spill:
+        for row, n in firsts.values():
+            yield tuple(row) + (n,)
+
+    else:
+        del firsts
+
+        def process(reopen):
+            pfirsts = OrderedDict()
+            for seq, k, row in reopen():
+                if k in pfirsts:
+                    pfirsts[k][2] += 1
+                else:
+                    pfirsts[k] = [seq, row, 1]
+            for seq, row, n in pfirsts.values():
+                yield seq, tuple(row) + (n,)
+
+        it = itertools.islice(source, 1, None)
+        records = ((seq, getkey(row), row) for seq, row in enumerate(it))
+        for outrow in _iterhashspill(records, process, tempdir,
+                                     buffersize):
+            yield outrow
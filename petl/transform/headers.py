@@ -6,7 +6,8 @@ from petl.compat import next, text_type
 from petl.errors import FieldSelectionError
 
 
-from petl.util.base import Table, asindices, rowgetter
+from petl.util.base import Table, asindices, rowgetter, header
+from petl.util.counting import nrows
 
 
 def rename(table, *args, **kwargs):
@@ -73,6 +74,12 @@ class RenameView(Table):
     def __iter__(self):
         return iterrename(self.source, self.spec, self.strict)
 
+    def _header(self):
+        return _renameheader(header(self.source), self.spec, self.strict)
+
+    def _nrows(self):
+        return nrows(self.source)
+
     def __setitem__(self, key, value):
         self.spec[key] = value
 
@@ -80,6 +87,12 @@ class RenameView(Table):
 def iterrename(source, spec, strict):
     it = iter(source)
     hdr = next(it)
+    yield _renameheader(hdr, spec, strict)
+    for row in it:
+        yield tuple(row)
+
+
+def _renameheader(hdr, spec, strict):
     flds = list(map(text_type, hdr))
     if strict:
         for x in spec:
@@ -92,9 +105,7 @@ def iterrename(source, spec, strict):
               else spec[f] if f in spec
               else f
               for i, f in enumerate(flds)]
-    yield tuple(outhdr)
-    for row in it:
-        yield tuple(row)
+    return tuple(outhdr)
 
 
 def setheader(table, header):
@@ -135,6 +146,12 @@ class SetHeaderView(Table):
     def __iter__(self):
         return itersetheader(self.source, self.header)
 
+    def _header(self):
+        return tuple(self.header)
+
+    def _nrows(self):
+        return nrows(self.source)
+
 
 def itersetheader(source, header):
     it = iter(source)
@@ -182,6 +199,12 @@ class ExtendHeaderView(Table):
     def __iter__(self):
         return iterextendheader(self.source, self.fields)
 
+    def _header(self):
+        return header(self.source) + tuple(self.fields)
+
+    def _nrows(self):
+        return nrows(self.source)
+
 
 def iterextendheader(source, fields):
     it = iter(source)
@@ -239,6 +262,9 @@ class PushHeaderView(Table):
     def __iter__(self):
         return iterpushheader(self.source, self.header)
 
+    def _header(self):
+        return tuple(self.header)
+
 
 def iterpushheader(source, header):
     it = iter(source)
@@ -314,6 +340,13 @@ class PrefixHeaderView(Table):
         for row in it:
             yield row
 
+    def _header(self):
+        return tuple((text_type(self.prefix) + text_type(f))
+                     for f in header(self.table))
+
+    def _nrows(self):
+        return nrows(self.table)
+
 
 def suffixheader(table, suffix):
     """Suffix all fields in the table header."""
@@ -338,6 +371,13 @@ class SuffixHeaderView(Table):
         for row in it:
             yield row
 
+    def _header(self):
+        return tuple((text_type(f) + text_type(self.suffix))
+                     for f in header(self.table))
+
+    def _nrows(self):
+        return nrows(self.table)
+
 
 def sortheader(table, reverse=False, missing=None):
     """Re-order columns so the header is sorted.
@@ -378,3 +418,9 @@ class SortHeaderView(Table):
                 # row is short, let's be kind and fill in any missing fields
                 yield tuple(row[i] if i < len(row) else missing
                             for i in indices)
+
+    def _header(self):
+        return tuple(sorted(header(self.table)))
+
+    def _nrows(self):
+        return nrows(self.table)
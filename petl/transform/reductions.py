@@ -7,11 +7,13 @@ from collections import OrderedDict
 from petl.compat import next, string_types, reduce, text_type
 
 
+from petl.comparison import comparable_itemgetter
 from petl.errors import ArgumentError
-from petl.util.base import Table, iterpeek, rowgroupby
+from petl.util.base import Table, iterpeek, rowgroupby, asindices, Record
 from petl.util.base import values
 from petl.util.counting import nrows
-from petl.transform.sorts import sort, mergesort
+from petl.transform.sorts import sort, mergesort, _iterhashspill, \
+    _hashbuffersize
 from petl.transform.basics import cut
 from petl.transform.dedup import distinct
 
@@ -429,6 +431,7 @@ def groupselectfirst(table, key, presorted=False, buffersize=None,
         +-----+-----+-------+
 
     See also :func:`petl.transform.reductions.groupselectlast`,
+    :func:`petl.transform.reductions.hashgroupselectfirst`,
     :func:`petl.transform.dedup.distinct`.
 
     """
@@ -467,6 +470,7 @@ def groupselectlast(table, key, presorted=False, buffersize=None,
         +-----+-----+-------+
 
     See also :func:`petl.transform.reductions.groupselectfirst`,
+    :func:`petl.transform.reductions.hashgroupselectlast`,
     :func:`petl.transform.dedup.distinct`.
 
     .. versionadded:: 1.1.0
@@ -551,7 +555,8 @@ def mergeduplicates(table, key, missing=None, presorted=False, buffersize=None,
     `buffersize`, `tempdir` and `cache` arguments under the
     :func:`petl.transform.sorts.sort` function.
 
-    See also :func:`petl.transform.dedup.conflicts`.
+    See also :func:`petl.transform.dedup.conflicts` and
+    :func:`petl.transform.reductions.hashmergeduplicates`.
 
     """
 
@@ -614,6 +619,309 @@ def itermergeduplicates(table, key, missing):
         yield tuple(outrow)
 
 
+def hashgroupselectfirst(table, key, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of
+    :func:`petl.transform.reductions.groupselectfirst`, where the first row
+    for each key is kept in a hash table rather than sorting the table.
+    E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar', 'baz'],
+        ...           ['A', 1, True],
+        ...           ['C', 7, False],
+        ...           ['B', 2, False],
+        ...           ['C', 9, True]]
+        >>> table2 = etl.hashgroupselectfirst(table1, key='foo')
+        >>> table2
+        +-----+-----+-------+
+        | foo | bar | baz   |
+        +=====+=====+=======+
+        | 'A' |   1 | True  |
+        +-----+-----+-------+
+        | 'C' |   7 | False |
+        +-----+-----+-------+
+        | 'B' |   2 | False |
+        +-----+-----+-------+
+
+    The table is read once, and memory use is proportional to the number of
+    distinct keys. Rows are output in order of the first appearance of each
+    key.
+
+    If the number of distinct keys exceeds `buffersize`, the table is
+    instead partitioned by key into temporary files in `tempdir`, and each
+    partition is processed in turn, after being split again if it holds
+    more than `buffersize` keys. If `buffersize` is `None`, the value of
+    `petl.config.hash_buffersize` will be used. If that is also `None`, all
+    keys are held in memory.
+
+    """
+
+    def prepare(hdr):
+        return hdr, _selectrow, _keepcurrent, _outputrow
+
+    return HashGroupReduceView(table, key, prepare, buffersize=buffersize,
+                               tempdir=tempdir)
+
+
+Table.hashgroupselectfirst = hashgroupselectfirst
+
+
+def hashgroupselectlast(table, key, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of
+    :func:`petl.transform.reductions.groupselectlast`, where the last row
+    for each key is kept in a hash table rather than sorting the table.
+    E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar', 'baz'],
+        ...           ['A', 1, True],
+        ...           ['C', 7, False],
+        ...           ['B', 2, False],
+        ...           ['C', 9, True]]
+        >>> table2 = etl.hashgroupselectlast(table1, key='foo')
+        >>> table2
+        +-----+-----+-------+
+        | foo | bar | baz   |
+        +=====+=====+=======+
+        | 'A' |   1 | True  |
+        +-----+-----+-------+
+        | 'C' |   9 | True  |
+        +-----+-----+-------+
+        | 'B' |   2 | False |
+        +-----+-----+-------+
+
+    See :func:`petl.transform.reductions.hashgroupselectfirst` for a
+    discussion of output order and the `buffersize` and `tempdir` arguments.
+
+    """
+
+    def prepare(hdr):
+        return hdr, _selectrow, _keepnew, _outputrow
+
+    return HashGroupReduceView(table, key, prepare, buffersize=buffersize,
+                               tempdir=tempdir)
+
+
+Table.hashgroupselectlast = hashgroupselectlast
+
+
+def hashgroupselectmin(table, key, value, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of
+    :func:`petl.transform.reductions.groupselectmin`, where the row with the
+    minimum of the `value` field for each key is kept in a hash table,
+    rather than sorting the table by value and then by key. If several rows
+    have the same (minimum) value, the first is returned. See
+    :func:`petl.transform.reductions.hashgroupselectfirst` for a discussion
+    of output order and the `buffersize` and `tempdir` arguments.
+
+    """
+
+    def prepare(hdr):
+        return hdr, _selectrow, _keepextreme(hdr, value, False), _outputrow
+
+    return HashGroupReduceView(table, key, prepare, buffersize=buffersize,
+                               tempdir=tempdir)
+
+
+Table.hashgroupselectmin = hashgroupselectmin
+
+
+def hashgroupselectmax(table, key, value, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of
+    :func:`petl.transform.reductions.groupselectmax`, where the row with the
+    maximum of the `value` field for each key is kept in a hash table,
+    rather than sorting the table by value and then by key. If several rows
+    have the same (maximum) value, the first is returned. See
+    :func:`petl.transform.reductions.hashgroupselectfirst` for a discussion
+    of output order and the `buffersize` and `tempdir` arguments.
+
+    """
+
+    def prepare(hdr):
+        return hdr, _selectrow, _keepextreme(hdr, value, True), _outputrow
+
+    return HashGroupReduceView(table, key, prepare, buffersize=buffersize,
+                               tempdir=tempdir)
+
+
+Table.hashgroupselectmax = hashgroupselectmax
+
+
+def _selectrow(row):
+    return row
+
+
+def _keepcurrent(current, row):
+    return current
+
+
+def _keepnew(current, row):
+    return row
+
+
+def _keepextreme(hdr, value, greatest):
+    getvalue = comparable_itemgetter(*asindices(hdr, value))
+    if greatest:
+        return lambda current, row: \
+            row if getvalue(row) > getvalue(current) else current
+    else:
+        return lambda current, row: \
+            row if getvalue(row) < getvalue(current) else current
+
+
+def _outputrow(k, row):
+    return tuple(row)
+
+
+def hashmergeduplicates(table, key, missing=None, buffersize=None,
+                        tempdir=None):
+    """
+    Alternative implementation of
+    :func:`petl.transform.reductions.mergeduplicates`, where the set of
+    values for each key is kept in a hash table rather than sorting the
+    table. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['foo', 'bar', 'baz'],
+        ...           ['A', 1, 2.7],
+        ...           ['B', 2, None],
+        ...           ['D', 3, 9.4],
+        ...           ['B', None, 7.8],
+        ...           ['E', None, 42.],
+        ...           ['D', 3, 12.3],
+        ...           ['A', 2, None]]
+        >>> table2 = etl.hashmergeduplicates(table1, 'foo')
+        >>> table2
+        +-----+------------------+-----------------------+
+        | foo | bar              | baz                   |
+        +=====+==================+=======================+
+        | 'A' | Conflict({1, 2}) |                   2.7 |
+        +-----+------------------+-----------------------+
+        | 'B' |                2 |                   7.8 |
+        +-----+------------------+-----------------------+
+        | 'D' |                3 | Conflict({9.4, 12.3}) |
+        +-----+------------------+-----------------------+
+        | 'E' | None             |                  42.0 |
+        +-----+------------------+-----------------------+
+
+    See :func:`petl.transform.reductions.hashgroupselectfirst` for a
+    discussion of output order and the `buffersize` and `tempdir` arguments.
+
+    """
+
+    def prepare(hdr):
+        flds = list(map(text_type, hdr))
+        if isinstance(key, string_types):
+            outhdr = [key]
+            keyflds = {key}
+        else:
+            outhdr = list(key)
+            keyflds = set(key)
+        valflds = [f for f in flds if f not in keyflds]
+        valfldidxs = [flds.index(f) for f in valflds]
+        outhdr.extend(valflds)
+
+        def update(vals, row):
+            for s, i in zip(vals, valfldidxs):
+                if len(row) > i and row[i] != missing:
+                    s.add(row[i])
+            return vals
+
+        def init(row):
+            return update([set() for _ in valfldidxs], row)
+
+        def output(k, vals):
+            if isinstance(key, string_types):
+                outrow = [k]
+            else:
+                outrow = list(k)
+            outrow.extend(s.pop() if len(s) == 1
+                          else missing if len(s) == 0
+                          else Conflict(s)
+                          for s in vals)
+            return tuple(outrow)
+
+        return outhdr, init, update, output
+
+    return HashGroupReduceView(table, key, prepare, buffersize=buffersize,
+                               tempdir=tempdir)
+
+
+Table.hashmergeduplicates = hashmergeduplicates
+
+
+class HashGroupReduceView(Table):
+
+    def __init__(self, source, key, prepare, buffersize=None, tempdir=None):
+        self.source = source
+        self.key = key
+        self.prepare = prepare
+        self.buffersize = _hashbuffersize(buffersize)
+        self.tempdir = tempdir
+
+    def __iter__(self):
+        return iterhashgroupreduce(self.source, self.key, self.prepare,
+                                   self.buffersize, self.tempdir)
+
+
+def iterhashgroupreduce(source, key, prepare, buffersize, tempdir):
+    # prepare is called with the header and returns the output header and
+    # three functions, to initialise the state for a key from its first row,
+    # to update the state with each subsequent row, and to generate the
+    # output row for a key from its final state
+    it = iter(source)
+    hdr = next(it)
+    outhdr, init, update, output = prepare(hdr)
+    yield tuple(outhdr)
+
+    if callable(key):
+        flds = list(map(text_type, hdr))
+        getkey = lambda row: key(Record(row, flds))
+    else:
+        getkey = operator.itemgetter(*asindices(hdr, key))
+
+    # single pass - keep state for each key in order of first appearance,
+    # unless there are too many keys
+    states = OrderedDict()
+    spill = False
+    for row in it:
+        k = getkey(row)
+        if k in states:
+            states[k] = update(states[k], row)
+        elif buffersize is not None and len(states) >= buffersize:
+            spill = True
+            break
+        else:
+            states[k] = init(row)
+
+    if not spill:
+        for k, state in states.items():
+            yield output(k, state)
+
+    else:
+        del states
+
+        def process(reopen):
+            pstates = OrderedDict()
+            for seq, k, row in reopen():
+                if k in pstates:
+                    pstates[k][1] = update(pstates[k][1], row)
+                else:
+                    pstates[k] = [seq, init(row)]
+            for k, (seq, state) in pstates.items():
+                yield seq, output(k, state)
+
+        it = itertools.islice(source, 1, None)
+        records = ((seq, getkey(row), row) for seq, row in enumerate(it))
+        for outrow in _iterhashspill(records, process, tempdir,
+                                     buffersize):
+            yield outrow
+
+
 def merge(*tables, **kwargs):
     """
     Convenience function to combine multiple tables (via
@@ -4,13 +4,13 @@ from __future__ import absolute_import, print_function, division
 import itertools
 import collections
 import operator
-from petl.compat import next, text_type
+from petl.compat import next, text_type, izip
 
 
-from petl.comparison import comparable_itemgetter
-from petl.util.base import Table, rowgetter, values, itervalues, \
-    header, data, asindices
-from petl.transform.sorts import sort
+import petl.config as config
+from petl.comparison import comparable_itemgetter, Comparable
+from petl.util.base import Table, rowgetter, values, data, asindices
+from petl.transform.sorts import sort, _dumpchunk, _iterchunk, _mergesorted
 
 
 def melt(table, key=None, variables=None, variablefield='variable',
@@ -258,7 +258,8 @@ def recast(table, key=None, variablefield='variable', valuefield='value',
     time to reshape the data and recast variables as fields. How many rows are
     scanned in the first pass is determined by the `samplesize` argument.
 
-    See also :func:`petl.transform.reshape.melt`.
+    See also :func:`petl.transform.reshape.melt` and
+    :func:`petl.transform.reshape.hashrecast`.
 
     """
 
@@ -295,53 +296,12 @@ class RecastView(Table):
 def iterrecast(source, key, variablefield, valuefield,
                samplesize, reducers, missing):
 
-    # TODO only make one pass through the data
+    # N.B., see iterhashrecast for an implementation making one pass
 
     it = iter(source)
     hdr = next(it)
-    flds = list(map(text_type, hdr))
-
-    # normalise some stuff
-    keyfields = key
-    variablefields = variablefield  # N.B., could be more than one
-
-    # normalise key fields
-    if keyfields and not isinstance(keyfields, (list, tuple)):
-        keyfields = (keyfields,)
-
-    # normalise variable fields
-    if variablefields:
-        if isinstance(variablefields, dict):
-            pass  # handle this later
-        elif not isinstance(variablefields, (list, tuple)):
-            variablefields = (variablefields,)
-
-    # infer key fields
-    if not keyfields:
-        # assume keyfields is fields not in variables
-        keyfields = [f for f in flds
-                     if f not in variablefields and f != valuefield]
-
-    # infer key fields
-    if not variablefields:
-        # assume variables are fields not in keyfields
-        variablefields = [f for f in flds
-                          if f not in keyfields and f != valuefield]
-
-    # sanity checks
-    assert valuefield in flds, 'invalid value field: %s' % valuefield
-    assert valuefield not in keyfields, 'value field cannot be keyfields'
-    assert valuefield not in variablefields, \
-        'value field cannot be variable field'
-    for f in keyfields:
-        assert f in flds, 'invalid keyfields field: %s' % f
-    for f in variablefields:
-        assert f in flds, 'invalid variable field: %s' % f
-
-    # we'll need these later
-    valueindex = flds.index(valuefield)
-    keyindices = [flds.index(f) for f in keyfields]
-    variableindices = [flds.index(f) for f in variablefields]
+    keyfields, variablefields, keyindices, variableindices, valueindex = \
+        _recastfields(hdr, key, variablefield, valuefield)
 
     # determine the actual variable names to be cast as fields
     if isinstance(variablefields, dict):
@@ -402,7 +362,237 @@ def iterrecast(source, key, variablefield, valuefield,
         yield tuple(out_row)
 
 
-def transpose(table):
+def hashrecast(table, key=None, variablefield='variable', valuefield='value',
+               reducers=None, missing=None, buffersize=None, tempdir=None):
+    """
+    Alternative implementation of :func:`petl.transform.reshape.recast`,
+    which makes a single pass through the table, grouping values by key in a
+    hash table and discovering variables along the way. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['id', 'variable', 'value'],
+        ...           [3, 'age', 16],
+        ...           [1, 'gender', 'F'],
+        ...           [2, 'gender', 'M'],
+        ...           [2, 'age', 17],
+        ...           [1, 'age', 12],
+        ...           [3, 'gender', 'M'],
+        ...           [3, 'height', 1.5]]
+        >>> table2 = etl.hashrecast(table1)
+        >>> table2
+        +----+-----+--------+--------+
+        | id | age | gender | height |
+        +====+=====+========+========+
+        |  1 |  12 | 'F'    | None   |
+        +----+-----+--------+--------+
+        |  2 |  17 | 'M'    | None   |
+        +----+-----+--------+--------+
+        |  3 |  16 | 'M'    |    1.5 |
+        +----+-----+--------+--------+
+
+    The arguments have the same meaning as for
+    :func:`petl.transform.reshape.recast`, and rows are output in the same
+    order, sorted by key. Unlike :func:`petl.transform.reshape.recast`, every
+    row is used to discover variables, so there is no `samplesize` argument,
+    and the table does not need to be sorted.
+
+    If the number of distinct keys held in memory exceeds `buffersize`, the
+    groups collected so far are sorted by key and written to a temporary
+    file in `tempdir`, and the temporary files are merged when output is
+    generated. If `buffersize` is `None`, the value of
+    `petl.config.hash_buffersize` will be used. If that is also `None`, all
+    groups are held in memory.
+
+    """
+
+    return HashRecastView(table, key=key, variablefield=variablefield,
+                          valuefield=valuefield, reducers=reducers,
+                          missing=missing, buffersize=buffersize,
+                          tempdir=tempdir)
+
+
+Table.hashrecast = hashrecast
+
+
+class HashRecastView(Table):
+
+    def __init__(self, source, key=None, variablefield='variable',
+                 valuefield='value', reducers=None, missing=None,
+                 buffersize=None, tempdir=None):
+        self.source = source
+        self.key = key
+        self.variablefield = variablefield
+        self.valuefield = valuefield
+        if reducers is None:
+            self.reducers = dict()
+        else:
+            self.reducers = reducers
+        self.missing = missing
+        if buffersize is None:
+            self.buffersize = config.hash_buffersize
+        else:
+            self.buffersize = buffersize
+        self.tempdir = tempdir
+
+    def __iter__(self):
+        return iterhashrecast(self.source, self.key, self.variablefield,
+                              self.valuefield, self.reducers, self.missing,
+                              self.buffersize, self.tempdir)
+
+
+def iterhashrecast(source, key, variablefield, valuefield, reducers,
+                   missing, buffersize, tempdir):
+    it = iter(source)
+    hdr = next(it)
+    keyfields, variablefields, keyindices, variableindices, valueindex = \
+        _recastfields(hdr, key, variablefield, valuefield)
+    getkey = operator.itemgetter(*keyindices)
+    variableslots = list(enumerate(variableindices))
+
+    # determine whether variables need to be discovered
+    if isinstance(variablefields, dict):
+        # user supplied dictionary
+        variables = variablefields
+        discover = False
+    else:
+        variables = dict((f, set()) for f in variablefields)
+        discover = True
+    discovered = [variables[f] for f in variablefields]
+
+    # single pass - group values by key then by (variable field, variable),
+    # spilling sorted runs of groups to disk if there are too many keys
+    groups = dict()
+    chunkfiles = list()
+    for row in it:
+        k = getkey(row)
+        if k in groups:
+            group = groups[k]
+        else:
+            if buffersize is not None and len(groups) >= buffersize:
+                chunkfiles.append(_dumpchunk(_sortedgroups(groups),
+                                             tempdir))
+                groups = dict()
+            group = groups[k] = dict()
+        v = row[valueindex]
+        for j, i in variableslots:
+            variable = row[i]
+            if discover:
+                discovered[j].add(variable)
+            slot = (j, variable)
+            if slot in group:
+                group[slot].append(v)
+            else:
+                group[slot] = [v]
+
+    if discover:
+        for f in variablefields:
+            # turn from sets to sorted lists
+            variables[f] = sorted(variables[f])
+
+    # determine the output fields
+    outhdr = list(keyfields)
+    for f in variablefields:
+        outhdr.extend(variables[f])
+    yield tuple(outhdr)
+
+    # merge groups with the same key across sorted runs, preserving the
+    # order in which values were read
+    if chunkfiles:
+        runs = [_iterchunk(f.name, f.codec) for f in chunkfiles]
+        runs.append(_sortedgroups(groups))
+        merged = _mergesorted(lambda item: Comparable(item[0]), False, *runs)
+        grouped = itertools.groupby(merged, key=operator.itemgetter(0))
+        items = ((k, _mergegroups(g for _, g in kgroups))
+                 for k, kgroups in grouped)
+    else:
+        items = _sortedgroups(groups)
+
+    slots = [(j, variable) for j, f in enumerate(variablefields)
+             for variable in variables[f]]
+    for k, group in items:
+        if len(keyfields) > 1:
+            out_row = list(k)
+        else:
+            out_row = [k]
+        for slot in slots:
+            vals = group.get(slot, None)
+            if not vals:
+                val = missing
+            elif len(vals) == 1:
+                val = vals[0]
+            else:
+                variable = slot[1]
+                if variable in reducers:
+                    redu = reducers[variable]
+                else:
+                    redu = list  # list all values
+                val = redu(vals)
+            out_row.append(val)
+        yield tuple(out_row)
+
+
+def _sortedgroups(groups):
+    return [(k, groups[k]) for k in sorted(groups, key=Comparable)]
+
+
+def _mergegroups(groups):
+    merged = dict()
+    for group in groups:
+        for slot, vals in group.items():
+            if slot in merged:
+                merged[slot].extend(vals)
+            else:
+                merged[slot] = vals
+    return merged
+
+
+def _recastfields(hdr, key, variablefield, valuefield):
+    flds = list(map(text_type, hdr))
+    # normalise some stuff
+    keyfields = key
+    variablefields = variablefield  # N.B., could be more than one
+
+    # normalise key fields
+    if keyfields and not isinstance(keyfields, (list, tuple)):
+        keyfields = (keyfields,)
+
+    # normalise variable fields
+    if variablefields:
+        if isinstance(variablefields, dict):
+            pass  # handle this later
+        elif not isinstance(variablefields, (list, tuple)):
+            variablefields = (variablefields,)
+
+    # infer key fields
+    if not keyfields:
+        # assume keyfields is fields not in variables
+        keyfields = [f for f in flds
+                     if f not in variablefields and f != valuefield]
+
+    # infer key fields
+    if not variablefields:
+        # assume variables are fields not in keyfields
+        variablefields = [f for f in flds
+                          if f not in keyfields and f != valuefield]
+
+    # sanity checks
+    assert valuefield in flds, 'invalid value field: %s' % valuefield
+    assert valuefield not in keyfields, 'value field cannot be keyfields'
+    assert valuefield not in variablefields, \
+        'value field cannot be variable field'
+    for f in keyfields:
+        assert f in flds, 'invalid keyfields field: %s' % f
+    for f in variablefields:
+        assert f in flds, 'invalid variable field: %s' % f
+
+    # we'll need these later
+    valueindex = flds.index(valuefield)
+    keyindices = [flds.index(f) for f in keyfields]
+    variableindices = [flds.index(f) for f in variablefields]
+    return keyfields, variablefields, keyindices, variableindices, valueindex
+
+
+def transpose(table, buffersize=None, tempdir=None):
     """
     Transpose rows into columns. E.g.::
 
@@ -421,11 +611,18 @@ def transpose(table):
         | 'colour' | 'blue' | 'red' | 'purple' | 'yellow' | 'orange' |
         +----------+--------+-------+----------+----------+----------+
 
+    The source table is read once. Up to `buffersize` rows are held in
+    memory; for larger tables, the columns of each `buffersize` rows are
+    written to a temporary file in `tempdir`, and the transposed rows are
+    then assembled from these fragments one at a time. If `buffersize` is
+    None, the value of `petl.config.sort_buffersize` is used; if that is
+    also None, the whole table is held in memory.
+
     See also :func:`petl.transform.reshape.recast`.
 
     """
 
-    return TransposeView(table)
+    return TransposeView(table, buffersize=buffersize, tempdir=tempdir)
 
 
 Table.transpose = transpose
@@ -433,18 +630,52 @@ Table.transpose = transpose
 
 class TransposeView(Table):
 
-    def __init__(self, source):
+    def __init__(self, source, buffersize=None, tempdir=None):
         self.source = source
+        if buffersize is None:
+            self.buffersize = config.sort_buffersize
+        else:
+            self.buffersize = buffersize
+        self.tempdir = tempdir
 
     def __iter__(self):
-        return itertranspose(self.source)
+        return itertranspose(self.source, self.buffersize, self.tempdir)
+
 
+def _columns(rows, n):
+    # N.B., zip would silently truncate short rows
+    for row in rows:
+        if len(row) < n:
+            raise IndexError('row too short to transpose: %r' % (row,))
+    return itertools.islice(izip(*rows), n)
+
+
+def itertranspose(source, buffersize=None, tempdir=None):
+    it = iter(source)
+    hdr = tuple(next(it))
+    n = len(hdr)
 
-def itertranspose(source):
-    hdr = header(source)
-    its = [iter(source) for _ in hdr]
-    for i in range(len(hdr)):
-        yield tuple(row[i] for row in its[i])
+    # read rows into memory, spilling column fragments as the buffer fills
+    chunks = list()
+    buf = list()
+    for row in it:
+        buf.append(tuple(row))
+        if buffersize is not None and len(buf) >= buffersize:
+            chunks.append(_dumpchunk(_columns(buf, n), tempdir))
+            buf = list()
+
+    # each chunk file holds one fragment per column, in column order
+    fragments = [_iterchunk(f.name, f.codec) for f in chunks]
+    if buf:
+        tails = _columns(buf, n)
+    else:
+        tails = itertools.repeat((), n)
+    for v, tail in izip(hdr, tails):
+        outrow = [v]
+        for frag in fragments:
+            outrow.extend(next(frag))
+        outrow.extend(tail)
+        yield tuple(outrow)
 
 
 def pivot(table, f1, f2, f3, aggfun, missing=None,
@@ -496,7 +727,15 @@ def pivot(table, f1, f2, f3, aggfun, missing=None,
         | 'girl' |    19 |   24 |   9 |
         +--------+-------+------+-----+
 
-    See also :func:`petl.transform.reshape.recast`.
+    The table is sorted by `f1` and `f2` then read once, with values
+    aggregated group by group. If `presorted` is True, it is assumed that the
+    data are already sorted by the given fields, and the `buffersize`,
+    `tempdir` and `cache` arguments are ignored. Otherwise, the data are
+    sorted, see also the discussion of the `buffersize`, `tempdir` and
+    `cache` arguments under the :func:`petl.transform.sorts.sort` function.
+
+    See also :func:`petl.transform.reshape.recast` and
+    :func:`petl.transform.reshape.hashpivot`.
 
     """
 
@@ -527,29 +766,125 @@ class PivotView(Table):
 
 
 def iterpivot(source, f1, f2, f3, aggfun, missing):
+    it = iter(source)
+    hdr = next(it)
+    flds = list(map(text_type, hdr))
+    f1i = flds.index(f1)
+    f2i = flds.index(f2)
+    f3i = flds.index(f3)
+
+    # single pass - aggregate each group as it is read, collecting output
+    # fields along the way
+    f2vals = set()
+    groups = list()
+    for v1, v1rows in itertools.groupby(it, key=operator.itemgetter(f1i)):
+        aggvals = dict()
+        for v2, v12rows in itertools.groupby(v1rows,
+                                             key=operator.itemgetter(f2i)):
+            aggvals[v2] = aggfun([row[f3i] for row in v12rows])
+            f2vals.add(v2)
+        groups.append((v1, aggvals))
+
+    for row in _iterpivotoutput(f1, f2vals, groups, missing):
+        yield row
 
-    # first pass - collect fields
-    f2vals = set(itervalues(source, f2))  # TODO only make one pass
+
+def _iterpivotoutput(f1, f2vals, groups, missing):
     f2vals = list(f2vals)
     f2vals.sort()
     outhdr = [f1]
     outhdr.extend(f2vals)
     yield tuple(outhdr)
+    for v1, aggvals in groups:
+        outrow = [v1]
+        outrow.extend(aggvals.get(v2, missing) for v2 in f2vals)
+        yield tuple(outrow)
+
+
+def hashpivot(table, f1, f2, f3, aggfun, missing=None):
+    """
+    Alternative implementation of :func:`petl.transform.reshape.pivot`, where
+    values are collected in memory in a hash table keyed by the `f1` and `f2`
+    values in a single pass through the table, rather than sorting the table
+    first. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['region', 'gender', 'style', 'units'],
+        ...           ['west', 'girl', 'golf', 16],
+        ...           ['east', 'boy', 'tee', 12],
+        ...           ['west', 'boy', 'tee', 12],
+        ...           ['east', 'girl', 'tee', 3],
+        ...           ['east', 'boy', 'golf', 14],
+        ...           ['west', 'girl', 'tee', 6],
+        ...           ['west', 'boy', 'golf', 15],
+        ...           ['east', 'girl', 'golf', 8]]
+        >>> table2 = etl.hashpivot(table1, 'region', 'gender', 'units', sum)
+        >>> table2
+        +--------+-----+------+
+        | region | boy | girl |
+        +========+=====+======+
+        | 'east' |  26 |   11 |
+        +--------+-----+------+
+        | 'west' |  27 |   22 |
+        +--------+-----+------+
+
+    The output is the same as for :func:`petl.transform.reshape.pivot`, but
+    the table need not be sorted. All values under `f3` are held in memory
+    until the table has been read, so this is suited to cases where the
+    data fit comfortably in memory.
+
+    """
+
+    return HashPivotView(table, f1, f2, f3, aggfun, missing=missing)
+
+
+Table.hashpivot = hashpivot
+
+
+class HashPivotView(Table):
+
+    def __init__(self, source, f1, f2, f3, aggfun, missing=None):
+        self.source = source
+        self.f1, self.f2, self.f3 = f1, f2, f3
+        self.aggfun = aggfun
+        self.missing = missing
+
+    def __iter__(self):
+        return iterhashpivot(self.source, self.f1, self.f2, self.f3,
+                             self.aggfun, self.missing)
+
 
-    # second pass - generate output
+def iterhashpivot(source, f1, f2, f3, aggfun, missing):
     it = iter(source)
     hdr = next(it)
     flds = list(map(text_type, hdr))
     f1i = flds.index(f1)
     f2i = flds.index(f2)
     f3i = flds.index(f3)
-    for v1, v1rows in itertools.groupby(it, key=operator.itemgetter(f1i)):
-        outrow = [v1] + [missing] * len(f2vals)
-        for v2, v12rows in itertools.groupby(v1rows,
-                                             key=operator.itemgetter(f2i)):
-            aggval = aggfun([row[f3i] for row in v12rows])
-            outrow[1 + f2vals.index(v2)] = aggval
-        yield tuple(outrow)
+
+    # single pass - collect values by f1 then f2
+    f2vals = set()
+    lkp = dict()
+    for row in it:
+        v1, v2 = row[f1i], row[f2i]
+        f2vals.add(v2)
+        if v1 in lkp:
+            v1vals = lkp[v1]
+        else:
+            v1vals = lkp[v1] = dict()
+        if v2 in v1vals:
+            v1vals[v2].append(row[f3i])
+        else:
+            v1vals[v2] = [row[f3i]]
+
+    # output groups in the same order as the sorted implementation
+    groups = list()
+    for v1 in sorted(lkp, key=Comparable):
+        aggvals = dict((v2, aggfun(vals)) for v2, vals in lkp[v1].items())
+        groups.append((v1, aggvals))
+
+    for row in _iterpivotoutput(f1, f2vals, groups, missing):
+        yield row
 
 
 def flatten(table):
@@ -7,7 +7,7 @@ from petl.comparison import Comparable
 
 
 from petl.errors import ArgumentError
-from petl.util.base import asindices, expr, Table, values, Record
+from petl.util.base import asindices, expr, Table, values, Record, header
 
 
 def select(table, *args, **kwargs):
@@ -95,6 +95,9 @@ class RowSelectView(Table):
         return iterrowselect(self.source, self.where, self.missing,
                              self.complement)
 
+    def _header(self):
+        return header(self.source)
+
 
 class FieldSelectView(Table):
 
@@ -109,6 +112,9 @@ class FieldSelectView(Table):
         return iterfieldselect(self.source, self.field, self.where,
                                self.complement, self.missing)
 
+    def _header(self):
+        return header(self.source)
+
 
 def iterfieldselect(source, field, where, complement, missing):
     it = iter(source)
@@ -418,6 +424,9 @@ class SelectUsingContextView(Table):
     def __iter__(self):
         return iterselectusingcontext(self.table, self.query)
 
+    def _header(self):
+        return header(self.table)
+
 
 def iterselectusingcontext(table, query):
     it = iter(table)
@@ -1,15 +1,24 @@
 from __future__ import absolute_import, print_function, division
 
+import os
+import datetime
+import hashlib
+import itertools
+import numbers
+import struct
 from collections import Counter
-from petl.compat import next
+from fractions import Fraction
+from tempfile import NamedTemporaryFile
+from petl.compat import next, text_type, pickle, PY2
 from petl.comparison import Comparable
-from petl.util.base import header, Table
-from petl.transform.sorts import sort
+from petl.errors import ArgumentError
+from petl.util.base import header, Table, asindices, rowgetter
+from petl.transform.sorts import sort, _iterhashspill, _hashbuffersize
 from petl.transform.basics import cut
 
 
 def complement(a, b, presorted=False, buffersize=None, tempdir=None,
-               cache=True, strict=False):
+               cache=True, strict=False, strategy='sort'):
     """
     Return rows in `a` that are not in `b`. E.g.::
 
@@ -93,31 +102,125 @@ def complement(a, b, presorted=False, buffersize=None, tempdir=None,
     If `strict` is `True` then strict set-like behaviour is used, i.e., 
     only rows in `a` not found in `b` are returned.
 
+    The `strategy` argument selects how the complement is computed:
+
+    - ``'sort'`` (the default) sorts both tables, then merges them, as
+      described above;
+    - ``'hash'`` holds the rows of `b` in memory, as
+      :func:`petl.transform.setops.hashcomplement`;
+    - ``'partition'`` distributes the rows of both tables between temporary
+      files in `tempdir` by hash, then processes each pair of partitions in
+      memory, so that only a fraction of `b` is held in memory at once;
+    - ``'auto'`` uses sort-merge if `presorted` is True, otherwise counts
+      the rows of both tables up to `buffersize`, and holds whichever is
+      the smaller in memory if it fits, or uses the partitioned hash if
+      neither does, or holds `b` in memory without counting if there is
+      no limit. The choice is made when the view is first iterated, and
+      kept for later iterations.
+
+    With the sort strategy, `buffersize` is the number of rows sorted in
+    memory at a time, as for :func:`petl.transform.sorts.sort`, defaulting
+    to :data:`petl.config.sort_buffersize`. With the other strategies, it is
+    the most rows held in memory by ``'auto'`` before partitioning, and the
+    most distinct rows in a partition before it is split again, defaulting
+    to :data:`petl.config.hash_buffersize`; if that is also None, there is
+    no limit.
+
+    With the hash strategies, rows are returned in the order of `a`, rather
+    than sorted.
+
     """
 
     return ComplementView(a, b, presorted=presorted, buffersize=buffersize,
-                          tempdir=tempdir, cache=cache, strict=strict)
+                          tempdir=tempdir, cache=cache, strict=strict,
+                          strategy=strategy)
 
 
 Table.complement = complement
 
 
-class ComplementView(Table):
+class _SetOpView(Table):
 
     def __init__(self, a, b, presorted=False, buffersize=None, tempdir=None,
-                 cache=True, strict=False):
+                 cache=True, strategy='sort'):
+        if strategy not in _strategies:
+            raise ArgumentError('expected strategy in %r, found %r'
+                                % (_strategies, strategy))
+        self.a = a
+        self.b = b
         if presorted:
-            self.a = a
-            self.b = b
+            self.sorteda = a
+            self.sortedb = b
         else:
-            self.a = sort(a, buffersize=buffersize, tempdir=tempdir,
-                          cache=cache)
-            self.b = sort(b, buffersize=buffersize, tempdir=tempdir,
-                          cache=cache)
+            self.sorteda = sort(a, buffersize=buffersize, tempdir=tempdir,
+                                cache=cache)
+            self.sortedb = sort(b, buffersize=buffersize, tempdir=tempdir,
+                                cache=cache)
+        self.presorted = presorted
+        self.buffersize = buffersize
+        self.tempdir = tempdir
+        self.strategy = strategy
+        self._chosen = None
+
+    def _strategy(self):
+        if self.strategy == 'auto':
+            # counting rows may be costly, so only choose once
+            if self._chosen is None:
+                self._chosen = _choosestrategy(self.a, self.b, self.presorted,
+                                               self.buffersize)
+            return self._chosen
+        return self.strategy
+
+
+_strategies = ('sort', 'hash', 'partition', 'auto')
+
+
+def _choosestrategy(a, b, presorted, buffersize):
+    # return 'hash' to hold b in memory, 'hashleft' to hold a in memory,
+    # or otherwise 'sort' or 'partition'
+    if presorted:
+        return 'sort'
+    limit = _hashbuffersize(buffersize)
+    if limit is None:
+        # no limit on memory, so no need to count
+        return 'hash'
+    nb = _countupto(b, limit)
+    # a need only be counted far enough to tell if it is the smaller
+    na = _countupto(a, min(nb, limit))
+    if na < nb:
+        return 'hashleft'
+    elif nb <= limit:
+        return 'hash'
+    return 'partition'
+
+
+def _countupto(table, limit):
+    # count data rows, up to one more than limit
+    return sum(1 for _ in itertools.islice(table, 1, limit + 2))
+
+
+class ComplementView(_SetOpView):
+
+    def __init__(self, a, b, presorted=False, buffersize=None, tempdir=None,
+                 cache=True, strict=False, strategy='sort'):
+        super(ComplementView, self).__init__(a, b, presorted=presorted,
+                                             buffersize=buffersize,
+                                             tempdir=tempdir, cache=cache,
+                                             strategy=strategy)
         self.strict = strict
 
     def __iter__(self):
-        return itercomplement(self.a, self.b, self.strict)
+        strategy = self._strategy()
+        if strategy == 'sort':
+            return itercomplement(self.sorteda, self.sortedb, self.strict)
+        elif strategy == 'hash':
+            return iterhashcomplement(self.a, self.b, self.strict)
+        elif strategy == 'hashleft':
+            return iterhashleftsetop(self.a, self.b, self.strict, False)
+        else:
+            return iterpartitionsetop(self.a, self.b, self.strict, False,
+                                      self.tempdir,
+                                      _hashbuffersize(self.buffersize))
 
 
 def itercomplement(ta, tb, strict):
@@ -225,7 +328,7 @@ Table.recordcomplement = recordcomplement
 
 
 def diff(a, b, presorted=False, buffersize=None, tempdir=None, cache=True,
-         strict=False):
+         strict=False, strategy='sort', digest=False):
     """
     Find the difference between rows in two tables. Returns a pair of tables.
     E.g.::
@@ -271,19 +374,35 @@ def diff(a, b, presorted=False, buffersize=None, tempdir=None, cache=True,
     `buffersize`, `tempdir` and `cache` arguments under the
     :func:`petl.transform.sorts.sort` function.
 
+    If `digest` is set, the difference is found as by
+    :func:`petl.transform.setops.hashdiff` instead, without sorting, holding
+    in memory only a fixed-size digest of each row of the table being
+    subtracted, which suits tables with wide rows; `presorted`,
+    `buffersize`, `tempdir`, `cache` and `strategy` are then ignored. See
+    :func:`petl.transform.setops.hashcomplement` for the values `digest`
+    may take.
+
     .. versionchanged:: 1.1.0
 
     If `strict` is `True` then strict set-like behaviour is used.
 
+    The `strategy` argument is passed through to each complement, see
+    :func:`petl.transform.setops.complement`.
+
     """
 
-    if not presorted:
+    if digest:
+        return hashdiff(a, b, strict=strict, digest=digest)
+    if strategy == 'sort' and not presorted:
         a = sort(a)
         b = sort(b)
-    added = complement(b, a, presorted=True, buffersize=buffersize,
-                       tempdir=tempdir, cache=cache, strict=strict)
-    subtracted = complement(a, b, presorted=True, buffersize=buffersize,
-                            tempdir=tempdir, cache=cache, strict=strict)
+        presorted = True
+    added = complement(b, a, presorted=presorted, buffersize=buffersize,
+                       tempdir=tempdir, cache=cache, strict=strict,
+                       strategy=strategy)
+    subtracted = complement(a, b, presorted=presorted, buffersize=buffersize,
+                            tempdir=tempdir, cache=cache, strict=strict,
+                            strategy=strategy)
     return added, subtracted
 
 
@@ -348,7 +467,7 @@ Table.recorddiff = recorddiff
 
 
 def intersection(a, b, presorted=False, buffersize=None, tempdir=None,
-                 cache=True):
+                 cache=True, strategy='sort'):
     """
     Return rows in `a` that are also in `b`. E.g.::
 
@@ -379,30 +498,34 @@ def intersection(a, b, presorted=False, buffersize=None, tempdir=None,
     `buffersize`, `tempdir` and `cache` arguments under the
     :func:`petl.transform.sorts.sort` function.
 
+    The `strategy` argument selects between sort-merge, in-memory hash and
+    partitioned hash implementations, see
+    :func:`petl.transform.setops.complement`, also for what `buffersize`
+    means under each.
+
     """
 
     return IntersectionView(a, b, presorted=presorted, buffersize=buffersize,
-                            tempdir=tempdir, cache=cache)
+                            tempdir=tempdir, cache=cache, strategy=strategy)
 
 
 Table.intersection = intersection
 
 
-class IntersectionView(Table):
-
-    def __init__(self, a, b, presorted=False, buffersize=None, tempdir=None,
-                 cache=True):
-        if presorted:
-            self.a = a
-            self.b = b
-        else:
-            self.a = sort(a, buffersize=buffersize, tempdir=tempdir,
-                          cache=cache)
-            self.b = sort(b, buffersize=buffersize, tempdir=tempdir,
-                          cache=cache)
+class IntersectionView(_SetOpView):
 
     def __iter__(self):
-        return iterintersection(self.a, self.b)
+        strategy = self._strategy()
+        if strategy == 'sort':
+            return iterintersection(self.sorteda, self.sortedb)
+        elif strategy == 'hash':
+            return iterhashintersection(self.a, self.b)
+        elif strategy == 'hashleft':
+            return iterhashleftsetop(self.a, self.b, False, True)
+        else:
+            return iterpartitionsetop(self.a, self.b, False, True,
+                                      self.tempdir,
+                                      _hashbuffersize(self.buffersize))
 
 
 def iterintersection(a, b):
@@ -427,7 +550,69 @@ def iterintersection(a, b):
         pass
 
 
-def hashcomplement(a, b, strict=False):
+def iterpartitionsetop(a, b, strict, intersect, tempdir, buffersize=None):
+    ita = iter(a)
+    ahdr = next(ita)
+    yield tuple(ahdr)
+    itb = iter(b)
+    next(itb)  # discard b header, assume same as a
+
+    # rows of b are tagged with seq -1, and are written to each partition
+    # ahead of the rows of a
+    records = itertools.chain(
+        ((-1, tuple(row), None) for row in itb),
+        ((seq, tuple(row), None) for seq, row in enumerate(ita))
+    )
+
+    def process(reopen):
+        # N.B., need to account for possibility of duplicate rows
+        bcnt = Counter()
+        for seq, t, _ in reopen():
+            if seq < 0:
+                bcnt[t] += 1
+            elif bcnt[t] > 0:
+                if intersect:
+                    yield seq, t
+                    bcnt[t] -= 1
+                elif not strict:
+                    bcnt[t] -= 1
+            elif not intersect:
+                yield seq, t
+
+    for row in _iterhashspill(records, process, tempdir, buffersize):
+        yield row
+
+
+def iterhashleftsetop(a, b, strict, intersect):
+    ita = iter(a)
+    ahdr = next(ita)
+    yield tuple(ahdr)
+    itb = iter(b)
+    next(itb)  # discard b header, assume same as a
+
+    # hold the rows of a in memory, rather than b, and count how many of
+    # each are matched by rows of b
+    arows = [tuple(row) for row in ita]
+    acnt = Counter(arows)
+    matched = Counter()
+    for br in itb:
+        t = tuple(br)
+        if acnt[t] > matched[t]:
+            matched[t] += 1
+
+    # then select rows in the order of a, as the other strategies do
+    for t in arows:
+        if matched[t] > 0:
+            if intersect:
+                yield t
+                matched[t] -= 1
+            elif not strict:
+                matched[t] -= 1
+        elif not intersect:
+            yield t
+
+
+def hashcomplement(a, b, strict=False, digest=False):
     """
     Alternative implementation of :func:`petl.transform.setops.complement`,
     where the complement is executed by constructing an in-memory set for all
@@ -442,26 +627,147 @@ def hashcomplement(a, b, strict=False):
     If `strict` is `True` then strict set-like behaviour is used, i.e., 
     only rows in `a` not found in `b` are returned.
 
+    If `digest` is `True`, a fixed-size (128-bit) digest of each row in the
+    right hand table is held in memory instead of the row itself, which
+    greatly reduces memory use where rows are wide. Rows are digested via
+    an encoding under which values which compare equal are encoded the same
+    (e.g., ``1``, ``1.0`` and ``True``), for `None`, numbers, strings,
+    bytes, dates and times, and tuples, lists, dicts and sets of them; other
+    values are encoded via their type and :func:`repr`. A function mapping a
+    row tuple to any hashable value may also be given as `digest`.
+
     """
 
-    return HashComplementView(a, b, strict=strict)
+    return HashComplementView(a, b, strict=strict, digest=digest)
 
 
 Table.hashcomplement = hashcomplement
 
 
+try:
+    _blake2b = hashlib.blake2b
+except AttributeError:
+    # Python < 3.6
+    def _rowdigest(row):
+        return hashlib.md5(_rowbytes(row)).digest()
+else:
+    def _rowdigest(row):
+        return _blake2b(_rowbytes(row), digest_size=16).digest()
+
+
+def _rowbytes(row):
+    # encode the row such that rows which compare equal are encoded the same,
+    # so that digests agree with ==
+    out = list()
+    _encodevalue(row, out)
+    return b''.join(out)
+
+
+def _encodeitem(out, tag, data):
+    # tag and length prefix, so that the encoding of a sequence of values is
+    # unambiguous
+    out.append(tag)
+    out.append(struct.pack('<I', len(data)))
+    out.append(data)
+
+
+def _encodevalue(v, out):
+    if v is None:
+        out.append(b'N')
+    elif isinstance(v, (tuple, list)):
+        # N.B., tuples and lists never compare equal
+        out.append(b'T' if isinstance(v, tuple) else b'L')
+        out.append(struct.pack('<I', len(v)))
+        for x in v:
+            _encodevalue(x, out)
+    elif isinstance(v, text_type):
+        _encodeitem(out, b'S', v.encode('utf-8', 'surrogatepass'))
+    elif isinstance(v, bytes):
+        if PY2:
+            # str compares equal to unicode where it is ASCII
+            try:
+                _encodeitem(out, b'S', v.decode('ascii').encode('utf-8'))
+                return
+            except UnicodeDecodeError:
+                pass
+        _encodeitem(out, b'B', v)
+    elif isinstance(v, numbers.Number):
+        _encodenumber(v, out)
+    elif isinstance(v, dict):
+        # N.B., equal dicts may differ in order of items
+        _encodeunordered(b'D', [_rowbytes(item) for item in v.items()], out)
+    elif isinstance(v, (set, frozenset)):
+        _encodeunordered(b'E', [_rowbytes(x) for x in v], out)
+    elif isinstance(v, datetime.datetime):
+        if v.utcoffset() is not None:
+            # aware datetimes compare equal at the same instant
+            v = (v - v.utcoffset()).replace(tzinfo=None)
+            _encodeitem(out, b'Z', v.isoformat().encode('ascii'))
+        else:
+            _encodeitem(out, b'd', v.isoformat().encode('ascii'))
+    elif isinstance(v, (datetime.date, datetime.time, datetime.timedelta)):
+        _encodeitem(out, type(v).__name__.encode('ascii'),
+                    text_type(v).encode('ascii'))
+    else:
+        # no canonical encoding is known, so fall back to the type and repr
+        _encodeitem(out, b'R', text_type('%s.%s:%r' % (
+            type(v).__module__, type(v).__name__, v)).encode('utf-8'))
+
+
+def _encodenumber(v, out):
+    # numbers of different types compare equal where their values are equal,
+    # so encode the exact value as a fraction
+    if isinstance(v, numbers.Complex) and not isinstance(v, numbers.Real):
+        if v.imag:
+            _encodeitem(out, b'C', text_type(repr(complex(v))).encode('ascii'))
+            return
+        v = v.real
+    try:
+        f = Fraction(v)
+    except (ValueError, OverflowError, TypeError):
+        # infinite or nan
+        _encodeitem(out, b'F', text_type(repr(float(v))).encode('ascii'))
+    else:
+        _encodeitem(out, b'Q', text_type('%s/%s' % (
+            f.numerator, f.denominator)).encode('ascii'))
+
+
+def _encodeunordered(tag, items, out):
+    items.sort()
+    out.append(tag)
+    out.append(struct.pack('<I', len(items)))
+    for item in items:
+        _encodeitem(out, b'I', item)
+
+
+def _digester(digest):
+    if digest is True:
+        return _rowdigest
+    elif digest:
+        return digest
+    else:
+        return None
+
+
+def _countrows(it, getdigest):
+    if getdigest is None:
+        return Counter(tuple(row) for row in it)
+    return Counter(getdigest(tuple(row)) for row in it)
+
+
 class HashComplementView(Table):
 
-    def __init__(self, a, b, strict=False):
+    def __init__(self, a, b, strict=False, digest=False):
         self.a = a
         self.b = b
         self.strict = strict
+        self.digest = digest
 
     def __iter__(self):
-        return iterhashcomplement(self.a, self.b, self.strict)
+        return iterhashcomplement(self.a, self.b, self.strict, self.digest)
 
 
-def iterhashcomplement(a, b, strict):
+def iterhashcomplement(a, b, strict, digest=False):
     ita = iter(a)
     ahdr = next(ita)
     yield tuple(ahdr)
@@ -469,17 +775,19 @@ def iterhashcomplement(a, b, strict):
     next(itb)  # discard b header, assume same as a
 
     # N.B., need to account for possibility of duplicate rows
-    bcnt = Counter(tuple(row) for row in itb)
+    getdigest = _digester(digest)
+    bcnt = _countrows(itb, getdigest)
     for ar in ita:
         t = tuple(ar)
-        if bcnt[t] > 0:
+        d = t if getdigest is None else getdigest(t)
+        if bcnt[d] > 0:
             if not strict:
-                bcnt[t] -= 1
+                bcnt[d] -= 1
         else:
             yield t
 
 
-def hashintersection(a, b):
+def hashintersection(a, b, digest=False):
     """
     Alternative implementation of
     :func:`petl.transform.setops.intersection`, where the intersection
@@ -489,9 +797,12 @@ def hashintersection(a, b):
     May be faster and/or more resource efficient where the right table is small
     and the left table is large.
 
+    See :func:`petl.transform.setops.hashcomplement` for a discussion of the
+    `digest` argument.
+
     """
 
-    return HashIntersectionView(a, b)
+    return HashIntersectionView(a, b, digest=digest)
 
 
 Table.hashintersection = hashintersection
@@ -499,15 +810,16 @@ Table.hashintersection = hashintersection
 
 class HashIntersectionView(Table):
 
-    def __init__(self, a, b):
+    def __init__(self, a, b, digest=False):
         self.a = a
         self.b = b
+        self.digest = digest
 
     def __iter__(self):
-        return iterhashintersection(self.a, self.b)
+        return iterhashintersection(self.a, self.b, self.digest)
 
 
-def iterhashintersection(a, b):
+def iterhashintersection(a, b, digest=False):
     ita = iter(a)
     ahdr = next(ita)
     yield tuple(ahdr)
@@ -515,9 +827,185 @@ def iterhashintersection(a, b):
     next(itb)  # discard b header, assume same as a
 
     # N.B., need to account for possibility of duplicate rows
-    bcnt = Counter(tuple(row) for row in itb)
+    getdigest = _digester(digest)
+    bcnt = _countrows(itb, getdigest)
     for ar in ita:
         t = tuple(ar)
-        if bcnt[t] > 0:
+        d = t if getdigest is None else getdigest(t)
+        if bcnt[d] > 0:
             yield t
-            bcnt[t] -= 1
+            bcnt[d] -= 1
+
+
+def hashdiff(a, b, strict=False, digest=False):
+    """
+    Alternative implementation of :func:`petl.transform.setops.diff`, where
+    each of the two complements is computed via
+    :func:`petl.transform.setops.hashcomplement` rather than by sorting both
+    tables. E.g.::
+
+        >>> import petl as etl
+        >>> a = [['foo', 'bar', 'baz'],
+        ...      ['A', 1, True],
+        ...      ['C', 7, False],
+        ...      ['B', 2, False],
+        ...      ['C', 9, True]]
+        >>> b = [['x', 'y', 'z'],
+        ...      ['B', 2, False],
+        ...      ['A', 9, False],
+        ...      ['B', 3, True],
+        ...      ['C', 9, True]]
+        >>> added, subtracted = etl.hashdiff(a, b, digest=True)
+        >>> # rows in b not in a
+        ... added
+        +-----+---+-------+
+        | x   | y | z     |
+        +=====+===+=======+
+        | 'A' | 9 | False |
+        +-----+---+-------+
+        | 'B' | 3 | True  |
+        +-----+---+-------+
+
+        >>> # rows in a not in b
+        ... subtracted
+        +-----+-----+-------+
+        | foo | bar | baz   |
+        +=====+=====+=======+
+        | 'A' |   1 | True  |
+        +-----+-----+-------+
+        | 'C' |   7 | False |
+        +-----+-----+-------+
+
+    Unlike :func:`petl.transform.setops.diff`, rows are returned in the
+    order they appear in their source table. With `digest` set, only a
+    fixed-size digest of each row of the table being subtracted is held in
+    memory, see :func:`petl.transform.setops.hashcomplement`.
+
+    """
+
+    return (hashcomplement(b, a, strict=strict, digest=digest),
+            hashcomplement(a, b, strict=strict, digest=digest))
+
+
+Table.hashdiff = hashdiff
+
+
+def snapshotdiff(table, key, state_path, changefield='change', missing=None):
+    """
+    Find rows inserted, updated or deleted since a previous snapshot of a
+    table, given a persisted index of row digests by key. E.g.::
+
+        >>> import os
+        >>> import tempfile
+        >>> import petl as etl
+        >>> state_path = os.path.join(tempfile.mkdtemp(), 'state.p')
+        >>> yesterday = [['id', 'name', 'qty'],
+        ...              [1, 'apple', 5],
+        ...              [2, 'pear', 3],
+        ...              [3, 'plum', 8]]
+        >>> etl.snapshotdiff(yesterday, 'id', state_path).nrows()
+        3
+        >>> today = [['id', 'name', 'qty'],
+        ...          [1, 'apple', 5],
+        ...          [2, 'pear', 4],
+        ...          [4, 'kiwi', 1]]
+        >>> etl.snapshotdiff(today, 'id', state_path)
+        +----+--------+------+------------+
+        | id | name   | qty  | change     |
+        +====+========+======+============+
+        |  2 | 'pear' |    4 | 'updated'  |
+        +----+--------+------+------------+
+        |  4 | 'kiwi' |    1 | 'inserted' |
+        +----+--------+------+------------+
+        |  3 | None   | None | 'deleted'  |
+        +----+--------+------+------------+
+
+    The index held at `state_path` maps the `key` of each row to a
+    fixed-size digest of the row (see
+    :func:`petl.transform.setops.hashcomplement`). If no file exists at
+    `state_path`, every row is reported as inserted. The table is streamed
+    once; inserted and updated rows are returned in input order, with
+    `changefield` added, followed by a row for each deleted key, in which
+    fields other than the key are set to `missing`. Unchanged rows are
+    not returned. Keys are assumed to be unique within the table.
+
+    The index for the current table is written alongside the previous one
+    as the table is streamed, and replaces it only once iteration over the
+    result has completed, so an incomplete iteration (e.g., via
+    :func:`petl.util.vis.look`) leaves the state untouched, but a
+    completed iteration advances it, after which iterating again reports
+    changes relative to the current table.
+
+    """
+
+    return SnapshotDiffView(table, key, state_path, changefield=changefield,
+                            missing=missing)
+
+
+Table.snapshotdiff = snapshotdiff
+
+
+class SnapshotDiffView(Table):
+
+    def __init__(self, source, key, state_path, changefield='change',
+                 missing=None):
+        self.source = source
+        self.key = key
+        self.state_path = state_path
+        self.changefield = changefield
+        self.missing = missing
+
+    def __iter__(self):
+        return itersnapshotdiff(self.source, self.key, self.state_path,
+                                self.changefield, self.missing)
+
+
+def _loadsnapshot(path):
+    # state file holds a sequence of pickled (key, digest) pairs
+    digests = dict()
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    k, d = pickle.load(f)
+                except EOFError:
+                    break
+                digests[k] = d
+    return digests
+
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+def itersnapshotdiff(source, key, state_path, changefield, missing):
+    it = iter(source)
+    hdr = next(it)
+    yield tuple(hdr) + (changefield,)
+
+    indices = asindices(hdr, key)
+    getkey = rowgetter(*indices)
+    previous = _loadsnapshot(state_path)
+
+    statedir = os.path.dirname(os.path.abspath(state_path))
+    f = NamedTemporaryFile(dir=statedir, delete=False, mode='wb')
+    try:
+        with f:
+            for row in it:
+                t = tuple(row)
+                k = getkey(t)
+                d = _rowdigest(t)
+                pickle.dump((k, d), f, protocol=-1)
+                prev = previous.pop(k, None)
+                if prev is None:
+                    yield t + ('inserted',)
+                elif prev != d:
+                    yield t + ('updated',)
+            for k in previous:
+                outrow = [missing] * len(hdr)
+                for i, v in zip(indices, k):
+                    outrow[i] = v
+                yield tuple(outrow) + ('deleted',)
+        _replace(f.name, state_path)
+    finally:
+        if os.path.exists(f.name):
+            os.unlink(f.name)
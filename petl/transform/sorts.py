@@ -8,12 +8,13 @@ import itertools
 import logging
 from collections import namedtuple
 import operator
+from functools import partial
 from petl.compat import pickle, next, text_type
 
 
 import petl.config as config
 from petl.comparison import comparable_itemgetter
-from petl.util.base import Table, asindices
+from petl.util.base import Table, asindices, header
 
 
 logger = logging.getLogger(__name__)
@@ -102,6 +103,13 @@ def sort(table, key=None, reverse=False, buffersize=None, tempdir=None,
     If `petl.config.sort_buffersize` is set to `None`, this forces
     all sorting to be done entirely in memory.
 
+    Temporary files are written uncompressed, unless
+    `petl.config.spill_codec` is set to a source class which takes a file
+    name, e.g., :class:`petl.io.sources.ZstdSource` or
+    :class:`petl.io.sources.LZ4Source` (or a :func:`functools.partial` of
+    one, to set other arguments), trading CPU time for less disk I/O. The
+    same applies to other functions which spill to temporary files.
+
     By default the results of the sort will be cached, and so a second pass over
     the sorted table will yield rows from the cache and will not repeat the
     sort operation. To turn off caching, set the `cache` argument to `False`.
@@ -115,10 +123,17 @@ def sort(table, key=None, reverse=False, buffersize=None, tempdir=None,
 Table.sort = sort
 
 
-def _iterchunk(fn):
+def _openchunk(fn, mode, codec=None):
+    # open a temporary chunk file, via the source class `codec` if given
+    if codec is None:
+        return open(fn, mode)
+    return codec(fn).open(mode)
+
+
+def _iterchunk(fn, codec=None):
     # reopen so iterators from file cache are independent
     debug('iterchunk, opening %s' % fn)
-    with open(fn, 'rb') as f:
+    with _openchunk(fn, 'rb', codec) as f:
         try:
             while True:
                 yield pickle.load(f)
@@ -253,6 +268,16 @@ class SortView(Table):
         else:
             return self._iternocache(source, key, reverse)
 
+    def _header(self):
+        if self.cache and self._hdrcache is not None:
+            return tuple(self._hdrcache)
+        return header(self.source)
+
+    def _nrows(self):
+        if self.cache and self._memcache is not None:
+            return len(self._memcache)
+        return None
+
     def _iterfrommemcache(self):
         debug('iterate from memory cache')
         yield tuple(self._hdrcache)
@@ -266,7 +291,7 @@ class SortView(Table):
         filenames = list(map(operator.attrgetter('name'), filecache))
         debug('iterate from file cache: %r', filenames)
         yield tuple(self._hdrcache)
-        chunkiters = [_iterchunk(fn) for fn in filenames]
+        chunkiters = [_iterchunk(f.name, f.codec) for f in filecache]
         rows = _mergesorted(self._getkey, self.reverse, *chunkiters)
         try:
             for row in rows:
@@ -325,19 +350,7 @@ class SortView(Table):
             while rows:
 
                 # dump the chunk
-                with NamedTemporaryFile(dir=self.tempdir, delete=False,
-                                        mode='wb') as f:
-                    # N.B., we **don't** want the file to be deleted on close,
-                    # but we **do** want the file to be deleted when self
-                    # is garbage collected, or when the program exits. When
-                    # all references to the wrapper are gone, the file should
-                    # get deleted.
-                    wrapper = _NamedTempFileDeleteOnGC(f.name)
-                    debug('created temporary chunk file %s' % f.name)
-                    for row in rows:
-                        pickle.dump(row, f, protocol=-1)
-                    f.flush()
-                    chunkfiles.append(wrapper)
+                chunkfiles.append(_dumpchunk(rows, self.tempdir))
 
                 # grab the next chunk
                 rows = list(itertools.islice(it, 0, self.buffersize))
@@ -349,15 +362,125 @@ class SortView(Table):
                 self._filecache = chunkfiles
                 self._getkey = getkey
 
-            chunkiters = [_iterchunk(f.name) for f in chunkfiles]
+            chunkiters = [_iterchunk(f.name, f.codec) for f in chunkfiles]
             for row in _mergesorted(getkey, reverse, *chunkiters):
                 yield tuple(row)
 
 
+def _tempchunk(tempdir=None):
+    # create an empty temporary chunk file, to be written via _openchunk with
+    # the codec given by petl.config.spill_codec at the time
+    with NamedTemporaryFile(dir=tempdir, delete=False, mode='wb') as f:
+        # N.B., we **don't** want the file to be deleted on close, but we
+        # **do** want the file to be deleted when the returned wrapper is
+        # garbage collected, or when the program exits. When all references
+        # to the wrapper are gone, the file should get deleted.
+        wrapper = _NamedTempFileDeleteOnGC(f.name, config.spill_codec)
+    debug('created temporary chunk file %s' % f.name)
+    return wrapper
+
+
+def _dumpchunk(items, tempdir=None):
+    # write items to a temporary chunk file, to be read back via _iterchunk
+    wrapper = _tempchunk(tempdir)
+    with _openchunk(wrapper.name, 'wb', wrapper.codec) as f:
+        for item in items:
+            pickle.dump(item, f, protocol=-1)
+    return wrapper
+
+
+def _dumppartitions(items, getpartition, npartitions, tempdir=None):
+    # distribute items between `npartitions` temporary chunk files, according
+    # to the partition number returned by `getpartition` for each item
+    wrappers = [_tempchunk(tempdir) for _ in range(npartitions)]
+    openers = [_openchunk(w.name, 'wb', w.codec) for w in wrappers]
+    files = list()
+    try:
+        for opener in openers:
+            files.append(opener.__enter__())
+        for item in items:
+            pickle.dump(item, files[getpartition(item)], protocol=-1)
+    finally:
+        for opener in openers[:len(files)]:
+            opener.__exit__(None, None, None)
+    return wrappers
+
+
+# number of partitions used when hash-based operations spill to disk
+_hashpartitions = 16
+
+# most times a partition is split again, in case keys keep colliding
+_hashdepth = 8
+
+
+def _iterhashspill(records, process, tempdir=None, buffersize=None):
+    # records are (seq, key, row) triples, which are distributed between
+    # partition files by hashing the key; process is called with a function
+    # to (re)open each partition and must generate (seq, outrow) pairs in
+    # order of seq; output rows are then merged back into order of seq. If
+    # buffersize is given, partitions with more distinct keys than that are
+    # split again before being processed
+    outs = list(_processpartitions(records, process, tempdir, buffersize, 0))
+    chunkiters = [_iterchunk(f.name, f.codec) for f in outs]
+    for _, outrow in _mergesorted(operator.itemgetter(0), False,
+                                  *chunkiters):
+        yield outrow
+
+
+def _processpartitions(records, process, tempdir, buffersize, depth):
+    # yield chunk files of the output of process for each partition, in
+    # order of seq within each file
+    parts = _dumppartitions(records,
+                            lambda rec: _partition(rec[1], depth),
+                            _hashpartitions, tempdir)
+    while parts:
+        part = parts.pop(0)
+        reopen = partial(_iterchunk, part.name, part.codec)
+        if buffersize is not None and depth < _hashdepth \
+                and _countkeys(reopen(), buffersize) > buffersize:
+            for out in _processpartitions(reopen(), process, tempdir,
+                                          buffersize, depth + 1):
+                yield out
+        else:
+            yield _dumpchunk(process(reopen), tempdir)
+        del part  # partition file is deleted when no longer referenced
+
+
+def _partition(k, depth):
+    # mix the hash of the key with the depth (via the splitmix64 finalizer),
+    # so that keys which share a partition at one depth are split between
+    # partitions at the next, even where hashes of keys follow a pattern,
+    # e.g., for small ints
+    z = (hash(k) + depth * 0x9e3779b97f4a7c15) & 0xffffffffffffffff
+    z = ((z ^ (z >> 30)) * 0xbf58476d1ce4e5b9) & 0xffffffffffffffff
+    z = ((z ^ (z >> 27)) * 0x94d049bb133111eb) & 0xffffffffffffffff
+    return (z ^ (z >> 31)) % _hashpartitions
+
+
+def _countkeys(records, limit):
+    # count distinct keys, stopping once there are more than limit
+    keys = set()
+    try:
+        for _, k, _ in records:
+            keys.add(k)
+            if len(keys) > limit:
+                break
+    finally:
+        records.close()
+    return len(keys)
+
+
+def _hashbuffersize(buffersize):
+    if buffersize is None:
+        return config.hash_buffersize
+    return buffersize
+
+
 class _NamedTempFileDeleteOnGC(object):
 
-    def __init__(self, name):
+    def __init__(self, name, codec=None):
         self.name = name
+        self.codec = codec
 
     def delete(self, unlink=os.unlink, log=logger.debug):
         name = self.name
@@ -0,0 +1,525 @@
+from __future__ import absolute_import, print_function, division
+
+
+import itertools
+import math
+import numbers
+import operator
+from collections import deque, OrderedDict
+
+
+from petl.compat import next
+from petl.errors import ArgumentError
+from petl.util.base import Table, asindices
+from petl.transform.sorts import sort
+
+
+def window(table, partition_by=None, order_by=None, functions=None,
+           presorted=False, buffersize=None, tempdir=None, cache=True,
+           missing=None):
+    """
+    Add fields computed by window functions over partitions of rows. E.g.::
+
+        >>> import petl as etl
+        >>> table1 = [['cust', 'day', 'amt'],
+        ...           ['a', 2, 10],
+        ...           ['b', 1, 3],
+        ...           ['a', 1, 5],
+        ...           ['a', 3, 10],
+        ...           ['b', 2, 4]]
+        >>> from collections import OrderedDict
+        >>> functions = OrderedDict()
+        >>> functions['rn'] = etl.rownumber()
+        >>> functions['prev'] = etl.lag('amt')
+        >>> functions['next'] = etl.lead('amt')
+        >>> functions['cum'] = etl.cumsum('amt')
+        >>> functions['ma2'] = etl.rollingmean('amt', 2)
+        >>> table2 = etl.window(table1, 'cust', 'day', functions)
+        >>> table2
+        +------+-----+-----+----+------+------+-----+------+
+        | cust | day | amt | rn | prev | next | cum | ma2  |
+        +======+=====+=====+====+======+======+=====+======+
+        | 'a'  |   1 |   5 |  1 | None |   10 |   5 |  5.0 |
+        +------+-----+-----+----+------+------+-----+------+
+        | 'a'  |   2 |  10 |  2 |    5 |   10 |  15 |  7.5 |
+        +------+-----+-----+----+------+------+-----+------+
+        | 'a'  |   3 |  10 |  3 |   10 | None |  25 | 10.0 |
+        +------+-----+-----+----+------+------+-----+------+
+        | 'b'  |   1 |   3 |  1 | None |    4 |   3 |  3.0 |
+        +------+-----+-----+----+------+------+-----+------+
+        | 'b'  |   2 |   4 |  2 |    3 | None |   7 |  3.5 |
+        +------+-----+-----+----+------+------+-----+------+
+
+    The `partition_by` and `order_by` arguments are field specifications
+    (a field name or index, or a list of them). Either may be None, in which
+    case the whole table is a single partition, or rows within a partition
+    are taken in their input order, respectively.
+
+    The `functions` argument maps output field names to window functions,
+    and may be a dict or a list of (name, function) pairs. Window functions
+    available are :func:`rownumber`, :func:`rank`, :func:`denserank`,
+    :func:`lag`, :func:`lead`, :func:`cumsum`, :func:`rollingsum` and
+    :func:`rollingmean`; see also :class:`WindowFunction` for writing
+    custom ones.
+
+    Output is computed in a single streaming pass over the rows of each
+    partition, holding in memory only as many rows as are needed by the
+    widest frame (e.g., the offset of a :func:`lead` or the size of a rolling
+    window).
+
+    If `presorted` is True, it is assumed that the data are already sorted by
+    the partition and order fields, and the `buffersize`, `tempdir` and
+    `cache` arguments are ignored. Otherwise, the data are sorted, see also
+    the discussion of the `buffersize`, `tempdir` and `cache` arguments under
+    the :func:`petl.transform.sorts.sort` function.
+
+    Values missing from short rows are taken as `missing`.
+
+    """
+
+    return WindowView(table, partition_by=partition_by, order_by=order_by,
+                      functions=functions, presorted=presorted,
+                      buffersize=buffersize, tempdir=tempdir, cache=cache,
+                      missing=missing)
+
+
+Table.window = window
+
+
+def _asfieldlist(spec):
+    if spec is None:
+        return []
+    elif isinstance(spec, (list, tuple)):
+        return list(spec)
+    else:
+        return [spec]
+
+
+class WindowView(Table):
+
+    def __init__(self, source, partition_by=None, order_by=None,
+                 functions=None, presorted=False, buffersize=None,
+                 tempdir=None, cache=True, missing=None):
+        sortkey = _asfieldlist(partition_by) + _asfieldlist(order_by)
+        if presorted or not sortkey:
+            self.source = source
+        else:
+            self.source = sort(source, key=sortkey, buffersize=buffersize,
+                               tempdir=tempdir, cache=cache)
+        self.partition_by = partition_by
+        self.order_by = order_by
+        if functions is None:
+            self.functions = OrderedDict()
+        elif isinstance(functions, (list, tuple)):
+            self.functions = OrderedDict(functions)
+        elif isinstance(functions, dict):
+            # take a copy, as functions may be added via __setitem__
+            self.functions = OrderedDict(functions.items())
+        else:
+            raise ArgumentError(
+                'expected functions is None, list, tuple or dict, found %r'
+                % functions
+            )
+        self.missing = missing
+
+    def __iter__(self):
+        return iterwindow(self.source, self.partition_by, self.order_by,
+                          self.functions, self.missing)
+
+    def __setitem__(self, key, value):
+        self.functions[key] = value
+
+
+def iterwindow(source, partition_by, order_by, functions, missing):
+    functions = OrderedDict(functions.items())  # take a copy
+    it = iter(source)
+    try:
+        hdr = next(it)
+    except StopIteration:
+        return
+    for outfld, f in functions.items():
+        if not isinstance(f, WindowFunction):
+            raise ArgumentError('invalid window function: %r, %r'
+                                % (outfld, f))
+    yield tuple(hdr) + tuple(functions)
+
+    starts = [f.prepare(hdr, missing) for f in functions.values()]
+    lookahead = max([f.lookahead for f in functions.values()] + [0])
+
+    pfields = _asfieldlist(partition_by)
+    if pfields:
+        getpartition = _keygetter(hdr, pfields, missing)
+        partitions = (rows for _, rows in itertools.groupby(it, getpartition))
+    else:
+        partitions = [it]
+
+    ofields = _asfieldlist(order_by)
+    if ofields:
+        getorder = _keygetter(hdr, ofields, missing)
+    else:
+        getorder = lambda row: None
+
+    for rows in partitions:
+        steps = [start() for start in starts]
+        # buffer holds the current row followed by up to `lookahead` rows
+        buf = deque(itertools.islice(rows, lookahead + 1))
+        while buf:
+            row = buf.popleft()
+            okey = getorder(row)
+            outrow = tuple(row)
+            for step in steps:
+                outrow += (step(row, okey, buf),)
+            yield outrow
+            for nxt in itertools.islice(rows, 1):
+                buf.append(nxt)
+
+
+def _keygetter(hdr, fields, missing):
+    indices = asindices(hdr, fields)
+    getter = operator.itemgetter(*indices)
+
+    def getkey(row):
+        try:
+            return getter(row)
+        except IndexError:
+            vals = tuple(row[i] if i < len(row) else missing
+                         for i in indices)
+            return vals[0] if len(vals) == 1 else vals
+
+    return getkey
+
+
+def _valuegetter(hdr, field, missing):
+    index = asindices(hdr, field)[0]
+
+    def getvalue(row):
+        try:
+            return row[index]
+        except IndexError:
+            return missing
+
+    return getvalue
+
+
+class WindowFunction(object):
+    """
+    Base class for functions computed by :func:`window`. Subclasses set
+    `lookahead` to the number of rows following the current row they need
+    to see, and implement :meth:`prepare`, which is given the table header
+    and returns a callable invoked at the start of each partition. That
+    callable returns a step function, ``step(row, okey, ahead)``, which is
+    called for each row in the partition in order, with the value of the
+    order key and a sequence of up to `lookahead` following rows, and returns
+    the output value for the row.
+
+    """
+
+    lookahead = 0
+
+    def prepare(self, hdr, missing=None):
+        raise NotImplementedError
+
+
+class _RowNumber(WindowFunction):
+
+    def prepare(self, hdr, missing=None):
+
+        def start():
+            counter = itertools.count(1)
+            return lambda row, okey, ahead: next(counter)
+
+        return start
+
+
+def rownumber():
+    """
+    Window function numbering rows within a partition, starting from 1. See
+    :func:`window`.
+
+    """
+
+    return _RowNumber()
+
+
+class _Rank(WindowFunction):
+
+    def __init__(self, dense):
+        self.dense = dense
+
+    def prepare(self, hdr, missing=None):
+        dense = self.dense
+
+        def start():
+            # previous order key, current rank, rows seen
+            state = [None, 0, 0]
+
+            def step(row, okey, ahead):
+                state[2] += 1
+                if state[2] == 1 or okey != state[0]:
+                    state[1] = state[1] + 1 if dense else state[2]
+                    state[0] = okey
+                return state[1]
+
+            return step
+
+        return start
+
+
+def rank():
+    """
+    Window function ranking rows within a partition by the order key, with
+    gaps after ties (1, 1, 3, ...). See :func:`window`.
+
+    """
+
+    return _Rank(dense=False)
+
+
+def denserank():
+    """
+    Window function ranking rows within a partition by the order key,
+    without gaps after ties (1, 1, 2, ...). See :func:`window`.
+
+    """
+
+    return _Rank(dense=True)
+
+
+class _Lag(WindowFunction):
+
+    def __init__(self, field, offset, default):
+        if offset < 1:
+            raise ArgumentError('offset must be at least 1, found %r'
+                                % offset)
+        self.field = field
+        self.offset = offset
+        self.default = default
+
+    def prepare(self, hdr, missing=None):
+        getvalue = _valuegetter(hdr, self.field, missing)
+        offset = self.offset
+        default = self.default
+
+        def start():
+            prev = deque(maxlen=offset)
+
+            def step(row, okey, ahead):
+                v = prev[0] if len(prev) == offset else default
+                prev.append(getvalue(row))
+                return v
+
+            return step
+
+        return start
+
+
+def lag(field, offset=1, default=None):
+    """
+    Window function returning the value of `field` from the row `offset`
+    rows before the current row in the same partition, or `default` if there
+    is no such row. See :func:`window`.
+
+    """
+
+    return _Lag(field, offset, default)
+
+
+class _Lead(WindowFunction):
+
+    def __init__(self, field, offset, default):
+        if offset < 1:
+            raise ArgumentError('offset must be at least 1, found %r'
+                                % offset)
+        self.field = field
+        self.lookahead = offset
+        self.default = default
+
+    def prepare(self, hdr, missing=None):
+        getvalue = _valuegetter(hdr, self.field, missing)
+        offset = self.lookahead
+        default = self.default
+
+        def start():
+
+            def step(row, okey, ahead):
+                if len(ahead) >= offset:
+                    return getvalue(ahead[offset - 1])
+                return default
+
+            return step
+
+        return start
+
+
+def lead(field, offset=1, default=None):
+    """
+    Window function returning the value of `field` from the row `offset`
+    rows after the current row in the same partition, or `default` if there
+    is no such row. See :func:`window`.
+
+    """
+
+    return _Lead(field, offset, default)
+
+
+class _CumSum(WindowFunction):
+
+    def __init__(self, field):
+        self.field = field
+
+    def prepare(self, hdr, missing=None):
+        getvalue = _valuegetter(hdr, self.field, missing)
+
+        def start():
+            total = [0]
+
+            def step(row, okey, ahead):
+                v = getvalue(row)
+                if v is not None:
+                    total[0] += v
+                return total[0]
+
+            return step
+
+        return start
+
+
+def cumsum(field):
+    """
+    Window function returning the running total of `field` from the start of
+    the partition up to and including the current row. None values are
+    skipped. See :func:`window`.
+
+    """
+
+    return _CumSum(field)
+
+
+class _Rolling(WindowFunction):
+
+    def __init__(self, field, size, mean):
+        if size < 1:
+            raise ArgumentError('size must be at least 1, found %r' % size)
+        self.field = field
+        self.size = size
+        self.mean = mean
+
+    def prepare(self, hdr, missing=None):
+        getvalue = _valuegetter(hdr, self.field, missing)
+        size = self.size
+        mean = self.mean
+
+        def start():
+            frame = deque()
+            # running total of values other than floats, and count of
+            # non-None values in the frame
+            state = [0, 0]
+            # floats are summed exactly, as subtracting them as they leave
+            # the frame would accumulate rounding errors
+            floats = _FloatSum()
+
+            def step(row, okey, ahead):
+                v = getvalue(row)
+                frame.append(v)
+                if v is not None:
+                    state[1] += 1
+                    if isinstance(v, float):
+                        floats.add(v)
+                    else:
+                        state[0] += v
+                if len(frame) > size:
+                    old = frame.popleft()
+                    if old is not None:
+                        state[1] -= 1
+                        if isinstance(old, float):
+                            floats.remove(old)
+                        else:
+                            state[0] -= old
+                total = floats.value(state[0])
+                if not mean:
+                    return total
+                elif state[1]:
+                    return total / state[1]
+                return None
+
+            return step
+
+        return start
+
+
+class _FloatSum(object):
+    # exact sum of a changing collection of floats, held as Shewchuk's
+    # non-overlapping partials (as used by math.fsum), so that each float
+    # is added or removed in time proportional to the number of partials,
+    # which is small, rather than to the number of values
+
+    def __init__(self):
+        self.partials = []
+        self.count = 0
+        # counts of nan, inf and -inf values, which can't be held in partials
+        self.special = [0, 0, 0]
+
+    def add(self, x, sign=1):
+        self.count += sign
+        if math.isnan(x):
+            self.special[0] += sign
+        elif math.isinf(x):
+            self.special[1 if x > 0 else 2] += sign
+        else:
+            x *= sign
+            partials = self.partials
+            i = 0
+            for y in partials:
+                if abs(x) < abs(y):
+                    x, y = y, x
+                hi = x + y
+                lo = y - (hi - x)
+                if lo:
+                    partials[i] = lo
+                    i += 1
+                x = hi
+            partials[i:] = [x]
+        if not self.count:
+            del self.partials[:]
+
+    def remove(self, x):
+        self.add(x, -1)
+
+    def value(self, total):
+        # return the correctly rounded sum of the floats plus total, or
+        # total itself if there are no floats
+        if not self.count:
+            return total
+        nan, inf, neginf = self.special
+        if nan or (inf and neginf):
+            return float('nan')
+        elif inf:
+            return float('inf')
+        elif neginf:
+            return float('-inf')
+        elif isinstance(total, numbers.Rational):
+            return math.fsum(self.partials + [total])
+        return total + math.fsum(self.partials)
+
+
+def rollingsum(field, size):
+    """
+    Window function returning the sum of `field` over the current row and
+    up to `size` - 1 preceding rows in the same partition. None values are
+    skipped. See :func:`window`.
+
+    """
+
+    return _Rolling(field, size, mean=False)
+
+
+def rollingmean(field, size):
+    """
+    Window function returning the mean of `field` over the current row and
+    up to `size` - 1 preceding rows in the same partition. None values are
+    skipped, and None is returned if the frame holds no values. See
+    :func:`window`.
+
+    """
+
+    return _Rolling(field, size, mean=True)
@@ -23,7 +23,7 @@ from petl.util.materialise import listoflists, listoftuples, tupleoflists, \
 
 from petl.util.timing import progress, log_progress, clock
 
-from petl.util.statistics import limits, stats
+from petl.util.statistics import limits, stats, fieldstats
 
 from petl.util.misc import typeset, diffheaders, diffvalues, nthword, strjoin, \
     coalesce
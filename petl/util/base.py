@@ -171,6 +171,18 @@ class Table(IterContainer):
         else:
             return super(Table, self).__getitem__(item)
 
+    def _header(self):
+        """Return the header row if it can be determined without iterating
+        over the table, otherwise None. Views override this to compute their
+        header from the header of their source, see :func:`header`."""
+        return None
+
+    def _nrows(self):
+        """Return the number of data rows if it can be determined more cheaply
+        than by iterating over the table, otherwise None, see
+        :func:`petl.util.counting.nrows`."""
+        return None
+
 
 def values(table, *field, **kwargs):
     """
@@ -275,6 +287,13 @@ class TableWrapper(Table):
     def __iter__(self):
         return iter(self.inner)
 
+    def _header(self):
+        return header(self.inner)
+
+    def _nrows(self):
+        from petl.util.counting import nrows
+        return nrows(self.inner)
+
 
 wrap = TableWrapper
 
@@ -332,8 +351,18 @@ def header(table):
     Note that the header row will always be returned as a tuple, regardless
     of what the underlying data are.
 
+    Where a table can determine its header without reading any data (e.g.,
+    a :func:`petl.transform.basics.cut` of a :func:`petl.io.csv.fromcsv`
+    only needs the first line of the file), it does so via its `_header()`
+    method, otherwise the table is iterated as far as the header row.
+
     """
 
+    probe = getattr(table, '_header', None)
+    if callable(probe):
+        hdr = probe()
+        if hdr is not None:
+            return tuple(hdr)
     it = iter(table)
     return tuple(next(it))
 
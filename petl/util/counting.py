@@ -17,8 +17,22 @@ def nrows(table):
         >>> etl.nrows(table)
         2
 
+    Where rows can be counted without iterating over them, they are, e.g.,
+    lists are counted by their length, delimited files by scanning for record
+    boundaries without parsing values, database queries by a ``COUNT(*)``
+    query, and views which neither add nor remove rows (such as
+    :func:`petl.transform.conversions.convert` or
+    :func:`petl.transform.basics.cut`) by counting the rows of their source.
+
     """
 
+    probe = getattr(table, '_nrows', None)
+    if callable(probe):
+        n = probe()
+        if n is not None:
+            return n
+    elif isinstance(table, (list, tuple)):
+        return max(len(table) - 1, 0)
     return sum(1 for _ in data(table))
 
 
@@ -1,10 +1,12 @@
 from __future__ import absolute_import, print_function, division
 
 
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+import operator
 
 
-from petl.util.base import values, Table
+from petl.compat import text_type
+from petl.util.base import values, Table, asindices
 
 
 def limits(table, field):
@@ -62,31 +64,174 @@ def stats(table, field):
 
     """
 
-    _min = None
-    _max = None
-    _sum = 0
-    _mean = 0
-    _var = 0
-    _count = 0
-    _errors = 0
+    acc = _StatsAccumulator()
     for v in values(table, field):
+        acc.add(v)
+    return acc.result()
+
+
+Table.stats = stats
+
+
+class _StatsAccumulator(object):
+    # accumulates the values returned by stats() one value at a time, so
+    # statistics for several fields can be computed in a single pass
+
+    __slots__ = ('min', 'max', 'sum', 'mean', 'var', 'count', 'errors')
+
+    def __init__(self):
+        self.min = None
+        self.max = None
+        self.sum = 0
+        self.mean = 0
+        self.var = 0
+        self.count = 0
+        self.errors = 0
+
+    def add(self, v):
         try:
             v = float(v)
         except (ValueError, TypeError):
-            _errors += 1
+            self.errors += 1
         else:
-            _count += 1
-            if _min is None or v < _min:
-                _min = v
-            if _max is None or v > _max:
-                _max = v
-            _sum += v
-            _mean, _var = onlinestats(v, _count, mean=_mean, variance=_var)
-    _std = _var**.5
-    return _stats(_count, _errors, _sum, _min, _max, _mean, _var, _std)
+            self.count += 1
+            if self.min is None or v < self.min:
+                self.min = v
+            if self.max is None or v > self.max:
+                self.max = v
+            self.sum += v
+            self.mean, self.var = onlinestats(v, self.count, mean=self.mean,
+                                              variance=self.var)
 
+    def result(self):
+        return _stats(self.count, self.errors, self.sum, self.min, self.max,
+                      self.mean, self.var, self.var**.5)
 
-Table.stats = stats
+
+def fieldstats(table, *fields, **kwargs):
+    """
+    Calculate basic descriptive statistics on several fields in a single pass
+    through the table. E.g.::
+
+        >>> import petl as etl
+        >>> table = [['foo', 'bar', 'baz'],
+        ...          ['A', 1, 2],
+        ...          ['B', '2', '3.4'],
+        ...          [u'B', u'3', u'7.8', True],
+        ...          ['D', 'xyz', 9.0],
+        ...          ['E', None]]
+        >>> etl.fieldstats(table, 'bar', 'baz').cut('field', 'count', 'errors', 'min', 'max', 'mean')
+        +-------+-------+--------+-----+-----+------+
+        | field | count | errors | min | max | mean |
+        +=======+=======+========+=====+=====+======+
+        | 'bar' |     3 |      2 | 1.0 | 3.0 |  2.0 |
+        +-------+-------+--------+-----+-----+------+
+        | 'baz' |     4 |      1 | 2.0 | 9.0 | 5.55 |
+        +-------+-------+--------+-----+-----+------+
+
+    If no fields are given, statistics are calculated for every field, and
+    fields without any numeric values are omitted from the output.
+
+    If the `key` keyword argument is given, statistics are calculated
+    separately for each group of rows sharing the same key value, and the
+    key field(s) are prepended to the output. The input does not need to be
+    sorted; groups are output in order of first appearance::
+
+        >>> etl.fieldstats(table, 'bar', key='foo').cut('foo', 'field', 'count', 'sum')
+        +-----+-------+-------+-----+
+        | foo | field | count | sum |
+        +=====+=======+=======+=====+
+        | 'A' | 'bar' |     1 | 1.0 |
+        +-----+-------+-------+-----+
+        | 'B' | 'bar' |     2 | 5.0 |
+        +-----+-------+-------+-----+
+        | 'D' | 'bar' |     0 |   0 |
+        +-----+-------+-------+-----+
+        | 'E' | 'bar' |     0 |   0 |
+        +-----+-------+-------+-----+
+
+    The values in each row of output correspond to those returned by
+    :func:`petl.util.statistics.stats`.
+
+    """
+
+    return FieldStatsView(table, fields, key=kwargs.get('key', None))
+
+
+Table.fieldstats = fieldstats
+
+
+class FieldStatsView(Table):
+
+    def __init__(self, source, fields, key=None):
+        self.source = source
+        self.fields = fields
+        self.key = key
+
+    def __iter__(self):
+        return iterfieldstats(self.source, self.fields, self.key)
+
+
+def iterfieldstats(source, fields, key):
+    it = iter(source)
+    try:
+        hdr = next(it)
+    except StopIteration:
+        hdr = []
+    flds = list(map(text_type, hdr))
+
+    if fields:
+        indices = asindices(hdr, fields)
+    else:
+        indices = list(range(len(hdr)))
+    names = [flds[i] for i in indices]
+
+    if key is None:
+        keyflds = []
+        getkey = None
+    else:
+        kindices = asindices(hdr, key)
+        keyflds = [flds[i] for i in kindices]
+        getkey = operator.itemgetter(*kindices)
+
+    outhdr = tuple(keyflds) + ('field',) + _stats._fields
+    yield outhdr
+
+    # one list of accumulators per group, one accumulator per field
+    groups = OrderedDict()
+    nflds = len(indices)
+    if getkey is None:
+        groups[None] = [_StatsAccumulator() for _ in range(nflds)]
+    for row in it:
+        if getkey is None:
+            k = None
+        else:
+            k = getkey(row)
+        try:
+            accs = groups[k]
+        except KeyError:
+            accs = groups[k] = [_StatsAccumulator() for _ in range(nflds)]
+        for acc, i in zip(accs, indices):
+            try:
+                acc.add(row[i])
+            except IndexError:
+                acc.add(None)
+
+    # when fields are implicit, skip those with no numeric values at all
+    selected = list(range(nflds))
+    if not fields:
+        selected = [j for j in selected
+                    if any(accs[j].count for accs in groups.values())]
+
+    for k, accs in groups.items():
+        if getkey is None:
+            kvals = ()
+        elif len(keyflds) == 1:
+            kvals = (k,)
+        else:
+            kvals = tuple(k)
+        for j in selected:
+            yield kvals + (names[j],) + tuple(accs[j].result())
 
 
 def onlinestats(xi, n, mean=0, variance=0):
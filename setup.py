@@ -24,6 +24,7 @@ setup(
                  'tables>=3.5.2'],
         'http': ['aiohttp>=3.6.2', 'requests'],
         'interval': ['intervaltree>=3.0.2'],
+        'lz4': ['lz4>=2.0.0'],
         'numpy': ['numpy>=1.16.4'],
         'pandas': ['pandas>=0.24.2'],
         'remote': ['fsspec>=0.7.4'],
@@ -32,6 +33,7 @@ setup(
         'xlsx': ['openpyxl>=2.6.2'],
         'xpath': ['lxml>=4.4.0'],
         'whoosh': ['whoosh'],
+        'zstd': ['zstandard>=0.15.0'],
     },
     use_scm_version={
         "version_scheme": "guess-next-dev",